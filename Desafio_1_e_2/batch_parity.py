@@ -0,0 +1,135 @@
+import argparse
+import json
+import math
+import sys
+import time
+
+import numpy as np
+
+from desafio_1 import first_and_second_current, conductor_section, bitola, magnectic_section, \
+    core_geometric_section_1, calculate_a_and_b_geometric_section, core_magnetic_section, \
+    calculate_turns_number_1, dimensions_core, blades_qtd
+from desafio_1_batch import size_transformers, ACESITA_BLADE_THICKNESS
+
+# Verificação de paridade entre size_transformers e a cadeia escalar do modo
+# interativo de primeiro_exame_escolar.py (opção D1), e do ganho de tempo do
+# lote sobre o laço escalar:
+#
+#   python batch_parity.py --n 100000 --speedup-min 50
+#
+# Sorteia especificações (potência, tensões, frequência, cabos longos e as
+# combinações de circuitos válidas), compara campo a campo (floats iguais,
+# ou com tolerância relativa --rtol, e descrições de bitola) e sai com código
+# 1 se houver divergência ou se o ganho ficar abaixo de --speedup-min.
+
+SEED = 20240501
+# Combinações (dois primários, dois secundários) aceitas por magnectic_section
+_CIRCUITS = ((False, False), (True, False), (True, True))
+
+
+def random_specs(n, seed=SEED):
+    rng = np.random.default_rng(seed)
+    circuits = np.array(_CIRCUITS)[rng.integers(0, len(_CIRCUITS), n)]
+    return {
+        'W2': rng.integers(50, 3000, n).astype(float),
+        'V2': rng.choice([12.0, 24.0, 110.0, 127.0, 220.0], n),
+        'V1': rng.choice([110.0, 127.0, 220.0, 380.0], n),
+        'frequency': rng.choice([50.0, 60.0], n),
+        'is_long_cable': rng.random(n) < 0.5,
+        'is_two_primary_circuits': circuits[:, 0],
+        'is_two_secondary_circuits': circuits[:, 1],
+    }
+
+
+def scalar_chain(W2, V2, V1, frequency, is_long_cable, is_two_primary_circuits, is_two_secondary_circuits):
+    # Mesmas chamadas e na mesma ordem de primeiro_exame_escolar.py, que lê inteiros
+    W2, V2, V1, frequency = int(W2), int(V2), int(V1), int(frequency)
+    secondary_current, primary_current = first_and_second_current(W2, V2, V1)
+    W1 = 1.1 * W2
+    primary_section = conductor_section(primary_current, W2)
+    secondary_section = conductor_section(secondary_current, W2)
+    primary_gauge = bitola(primary_section) or [math.nan, ""]
+    secondary_gauge = bitola(secondary_section) or [math.nan, ""]
+    magnetic_section = magnectic_section(W1, frequency, is_long_cable, is_two_primary_circuits,
+                                         is_two_secondary_circuits)
+    geometric_section = core_geometric_section_1(magnetic_section)
+    a = round(math.sqrt(geometric_section))
+    b = round(calculate_a_and_b_geometric_section(geometric_section, a), 1)
+    core_ms = round(core_magnetic_section(a, b), 1)
+    result = {
+        'primary_current': primary_current,
+        'secondary_current': secondary_current,
+        'primary_section': primary_section,
+        'secondary_section': secondary_section,
+        'primary_gauge_section': primary_gauge[0],
+        'primary_gauge': primary_gauge[1],
+        'secondary_gauge_section': secondary_gauge[0],
+        'secondary_gauge': secondary_gauge[1],
+        'magnetic_section': magnetic_section,
+        'geometric_section': geometric_section,
+        'a': a,
+        'b': b,
+        'core_magnetic_section': core_ms,
+        'primary_turns': calculate_turns_number_1(frequency, V1, core_ms),
+        'secondary_turns': calculate_turns_number_1(frequency, V2, core_ms) * 1.1,
+        'blades': blades_qtd(b, ACESITA_BLADE_THICKNESS),
+    }
+    result.update(dimensions_core(a, b, W2)._asdict())
+    return result
+
+
+def check_parity(n=100000, seed=SEED, rtol=0.0):
+    """
+    Compara os dois caminhos em n especificações sorteadas. Retorna um
+    dicionário com as divergências por campo, os tempos (s) e o ganho.
+    """
+    specs = random_specs(n, seed)
+    rows = [dict(zip(specs, values)) for values in zip(*(column.tolist() for column in specs.values()))]
+
+    start = time.perf_counter()
+    expected = [scalar_chain(**row) for row in rows]
+    scalar_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = size_transformers(**specs)
+    batch_time = time.perf_counter() - start
+
+    mismatches = {}
+    for field, values in batch.items():
+        reference = np.array([result[field] for result in expected])
+        if values.dtype.kind in 'US':
+            equal = values == reference
+        else:
+            equal = np.isclose(values, reference.astype(float), rtol=rtol, atol=0.0, equal_nan=True)
+        if not equal.all():
+            first = int(np.flatnonzero(~equal)[0])
+            mismatches[field] = {'count': int((~equal).sum()), 'first': first,
+                                 'batch': values[first].item(), 'scalar': reference[first].item()}
+    return {'n': n, 'mismatches': mismatches, 'scalar_s': scalar_time, 'batch_s': batch_time,
+            'speedup': scalar_time / batch_time}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Paridade e ganho de size_transformers sobre a cadeia escalar")
+    parser.add_argument('--n', type=int, default=100000, help="especificações sorteadas")
+    parser.add_argument('--seed', type=int, default=SEED)
+    parser.add_argument('--rtol', type=float, default=0.0, help="tolerância relativa dos floats (0: iguais)")
+    parser.add_argument('--speedup-min', type=float, default=50.0, help="ganho mínimo exigido (0 desliga)")
+    parser.add_argument('--json', action='store_true', help="resultado em JSON")
+    args = parser.parse_args(argv)
+
+    report = check_parity(args.n, args.seed, args.rtol)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{report['n']} especificações: escalar {report['scalar_s']:.3f} s, lote {report['batch_s']:.4f} s, "
+              f"ganho {report['speedup']:.0f}x")
+        for field, mismatch in report['mismatches'].items():
+            print(f"divergência em {field}: {mismatch}")
+        if not report['mismatches']:
+            print("todos os campos iguais")
+    return 1 if report['mismatches'] or report['speedup'] < args.speedup_min else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
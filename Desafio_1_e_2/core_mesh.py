@@ -0,0 +1,310 @@
+import json
+import os
+from typing import NamedTuple
+
+import numpy as np
+
+from root_instrumentation import instrumentar
+
+# Malhas triangulares do núcleo e dos enrolamentos de generate_transformer
+# (desafio_1_plot.py) sem matplotlib, para muitos projetos (a, b) de uma vez.
+#
+# O núcleo são as mesmas cinco caixas de create_transformer_sections; os
+# enrolamentos são as mesmas hélices do desenho, agora como tubos fechados em
+# volta da linha central. Todos os projetos têm a mesma topologia: vertices é
+# um array (projetos, vértices, 3) e faces um único array (triângulos, 3)
+# compartilhado. A rotação é uma rotação de verdade (matriz ortonormal, regra
+# de Rodrigues), ao contrário de rotate_transformer. Exporta STL binário, OBJ
+# e glTF binário (GLB).
+
+PARTS = ('core', 'primary', 'secondary')
+DEFAULT_COIL_SAMPLES = 200
+DEFAULT_TUBE_SIDES = 8
+DEFAULT_BLOCK_SIZE = 256
+
+# Caixas do núcleo em generate_transformer, (X, Y, Z, H, W, T) = coef_a * a + coef_b * b
+_CORE_BOXES_A = np.array([
+    [0, 0, 0, 0.5, 3, 0],  # base da lamina "E"
+    [0, 2.5, 0, 2, 0.5, 0],  # seção do secundario
+    [0, 1, 0, 2, 1, 0],  # tronco central do transformador
+    [0, 0, 0, 2, 0.5, 0],  # seção do primario
+    [2, 0, 0, 0.5, 3, 0],  # lamina tipo "I" (topo do transformador)
+])
+_CORE_BOXES_B = np.array([[0, 0, 0, 0, 0, 1]] * 5)
+
+# Cantos na ordem de create_transformer_sections e os 12 triângulos de cada
+# caixa, com a normal para fora
+_BOX_CORNERS = np.array([[0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0],
+                         [0, 0, 1], [1, 0, 1], [1, 1, 1], [0, 1, 1]], dtype=float)
+_BOX_TRIANGLES = np.array([[0, 3, 2], [0, 2, 1], [4, 5, 6], [4, 6, 7],
+                           [0, 1, 5], [0, 5, 4], [3, 7, 6], [3, 6, 2],
+                           [0, 4, 7], [0, 7, 3], [1, 2, 6], [1, 6, 5]])
+
+# Hélices de generate_transformer para cada caso (n1 > n2, n2 > n1, iguais),
+# por enrolamento: início e fim de zline em a, deslocamento de z em a, passo
+# angular (coeficientes de a e de b) e deslocamento de x (coeficientes de a,
+# b e do raio b/1.5). O centro em y é sempre b/2.
+_COILS = np.array([
+    [[0.6, 1.2, 0.75, 0, 3, 1.52, 0, 0], [0.5, 1, -0.01, 0, 2, 0, 2.79, -2.5]],
+    [[0.6, 1.2, -0.01, 0, 3, 1.52, 0, 0], [0.5, 1, 1.01, 2, 0, 0, 2.79, -2.5]],
+    [[0.5, 1, 1.01, 2, 0, 1.52, 0, 0], [0.5, 1, 0.01, 2, 0, 1.52, 0, 0]],
+])
+
+
+class TransformerMesh(NamedTuple):
+    vertices: np.ndarray     # (projetos, vértices, 3), em cm
+    faces: np.ndarray        # (triângulos, 3) índices em vertices, comuns a todos os projetos
+    face_parts: np.ndarray   # (triângulos,) índice em PARTS de cada triângulo
+
+
+def rotation_matrix(angle, axis=(0, 0, 1)):
+    """
+    Matriz de rotação (3, 3) de angle radianos em torno de axis; com angle
+    array devolve uma matriz por ângulo, (..., 3, 3).
+    """
+    axis = np.asarray(axis, dtype=float)
+    x, y, z = axis / np.linalg.norm(axis)
+    angle = np.asarray(angle, dtype=float)
+    c, s = np.cos(angle)[..., None, None], np.sin(angle)[..., None, None]
+    cross = np.array([[0, -z, y], [z, 0, -x], [-y, x, 0]])
+    return c * np.eye(3) + s * cross + (1 - c) * np.outer((x, y, z), (x, y, z))
+
+
+def _tube_faces(samples, sides, offset):
+    # Triângulos de um tubo de samples anéis de sides vértices, fechado nas
+    # pontas pelos dois vértices centrais que vêm depois dos anéis
+    ring = np.arange(samples - 1)[:, None] * sides
+    side = np.arange(sides)[None, :]
+    current, following = ring + side, ring + (side + 1) % sides
+    quads = np.stack([current, following, current + sides, following + sides], axis=-1).reshape(-1, 4)
+    wall = np.concatenate([quads[:, [0, 1, 2]], quads[:, [1, 3, 2]]])
+
+    side = np.arange(sides)
+    start, end = samples * sides, samples * sides + 1
+    last = (samples - 1) * sides
+    caps = np.concatenate([
+        np.column_stack([np.full(sides, start), (side + 1) % sides, side]),
+        np.column_stack([np.full(sides, end), last + side, last + (side + 1) % sides]),
+    ])
+    return np.concatenate([wall, caps]) + offset
+
+
+def _coil_vertices(a, b, coils, samples, sides, wire_radius):
+    # Vértices (projetos, samples * sides + 2, 3) dos tubos em volta das
+    # hélices; coils: (projetos, 8) linha de _COILS de cada projeto
+    z_start, z_end, z_shift, k_a, k_b, x_a, x_b, x_r = np.moveaxis(coils, -1, 0)
+    radius = b / 1.5
+    k = k_a * a + k_b * b
+    x_center = x_a * a + x_b * b + x_r * radius
+    y_center = b / 2
+
+    t = np.linspace(0, 1, samples)
+    z = ((z_start + z_shift) * a)[:, None] + ((z_end - z_start) * a)[:, None] * t
+    theta = k[:, None] * z
+    cos, sin = np.cos(theta), np.sin(theta)
+    center = np.stack([radius[:, None] * cos + x_center[:, None],
+                       radius[:, None] * sin + y_center[:, None], z], axis=-1)
+
+    # Referencial de cada ponto: tangente T, normal N (para o eixo da hélice), B = T x N
+    tangent = np.stack([-radius[:, None] * k[:, None] * sin, radius[:, None] * k[:, None] * cos,
+                        np.ones_like(z)], axis=-1)
+    tangent /= np.linalg.norm(tangent, axis=-1, keepdims=True)
+    normal = np.stack([-cos, -sin, np.zeros_like(z)], axis=-1)
+    binormal = np.cross(tangent, normal)
+
+    # Raio do fio padrão (NaN): tubos adjacentes não se tocam, no máximo 1/5 do passo da hélice
+    pitch = np.where(k > 0, 2 * np.pi / np.where(k > 0, k, 1), np.inf)
+    wire_radius = np.where(np.isnan(wire_radius), np.minimum(0.05 * radius, 0.2 * pitch), wire_radius)
+
+    phi = 2 * np.pi * np.arange(sides) / sides
+    offsets = np.cos(phi)[:, None] * normal[:, :, None] + np.sin(phi)[:, None] * binormal[:, :, None]
+    rings = center[:, :, None] + wire_radius[:, None, None, None] * offsets
+    return np.concatenate([rings.reshape(len(a), -1, 3), center[:, [0, -1]]], axis=1)
+
+
+@instrumentar('core_mesh.transformer_meshes')
+def transformer_meshes(a, b, first_tension, second_tension, angle=0.0, axis=(0, 0, 1),
+                       coil_samples=DEFAULT_COIL_SAMPLES, tube_sides=DEFAULT_TUBE_SIDES, wire_radius=None):
+    """
+    Malhas do núcleo e dos dois enrolamentos de generate_transformer para
+    cada projeto, com broadcast entre a, b (cm), first_tension,
+    second_tension (só a comparação entre elas escolhe as hélices, como no
+    desenho), angle (rad, em torno de axis) e wire_radius (cm; padrão
+    proporcional ao raio e ao passo da hélice). Retorna um TransformerMesh
+    com os projetos achatados na primeira dimensão.
+    """
+    a, b, n1, n2, angle, wire_radius = (x.ravel() for x in np.broadcast_arrays(*(
+        np.asarray(x, dtype=float) for x in (a, b, first_tension, second_tension, angle,
+                                             np.nan if wire_radius is None else wire_radius))))
+
+    boxes = a[:, None, None] * _CORE_BOXES_A + b[:, None, None] * _CORE_BOXES_B
+    core = boxes[:, :, None, :3] + boxes[:, :, None, 3:] * _BOX_CORNERS
+    core = core.reshape(len(a), -1, 3)
+
+    case = np.select([n1 > n2, n2 > n1], [0, 1], default=2)
+    primary = _coil_vertices(a, b, _COILS[case, 0], coil_samples, tube_sides, wire_radius)
+    secondary = _coil_vertices(a, b, _COILS[case, 1], coil_samples, tube_sides, wire_radius)
+    vertices = np.concatenate([core, primary, secondary], axis=1)
+    vertices = vertices @ np.swapaxes(rotation_matrix(angle, axis), -1, -2)
+
+    core_faces = (_BOX_TRIANGLES + 8 * np.arange(len(_CORE_BOXES_A))[:, None, None]).reshape(-1, 3)
+    coil_vertex_count = primary.shape[1]
+    faces = np.concatenate([
+        core_faces,
+        _tube_faces(coil_samples, tube_sides, core.shape[1]),
+        _tube_faces(coil_samples, tube_sides, core.shape[1] + coil_vertex_count),
+    ]).astype(np.uint32)
+    coil_face_count = (len(faces) - len(core_faces)) // 2
+    face_parts = np.repeat(np.arange(len(PARTS), dtype=np.uint8),
+                           [len(core_faces), coil_face_count, coil_face_count])
+    return TransformerMesh(vertices, faces, face_parts)
+
+
+STL_TRIANGLE_DTYPE = np.dtype([
+    ('normal', '<f4', (3,)),
+    ('vertices', '<f4', (3, 3)),
+    ('attribute', '<u2'),
+])
+
+
+def stl_bytes(vertices, faces):
+    """
+    STL binário de uma malha: vertices (n, 3) e faces (m, 3).
+    """
+    triangles = vertices[faces]
+    normals = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+    lengths = np.linalg.norm(normals, axis=-1, keepdims=True)
+    records = np.zeros(len(faces), dtype=STL_TRIANGLE_DTYPE)
+    records['normal'] = np.divide(normals, lengths, out=np.zeros_like(normals), where=lengths > 0)
+    records['vertices'] = triangles
+    header = b'core_mesh'.ljust(80, b' ')
+    return header + np.uint32(len(faces)).tobytes() + records.tobytes()
+
+
+def obj_bytes(vertices, faces, face_parts=None):
+    """
+    Wavefront OBJ de uma malha, com um grupo por parte (PARTS) quando
+    face_parts é dado.
+    """
+    # Uma única formatação % por bloco (np.savetxt formata linha a linha)
+    chunks = [('v %.6g %.6g %.6g\n' * len(vertices)) % tuple(vertices.ravel().tolist())]
+    groups = [(None, faces)] if face_parts is None else \
+        [(part, faces[face_parts == index]) for index, part in enumerate(PARTS)]
+    for part, group in groups:
+        if part is not None:
+            chunks.append(f'g {part}\n')
+        chunks.append(('f %d %d %d\n' * len(group)) % tuple((group.astype(np.int64) + 1).ravel().tolist()))
+    return ''.join(chunks).encode('ascii')
+
+
+# Cor de cada parte no glTF (RGBA linear), como no desenho: núcleo cinza, enrolamentos marrons
+_GLTF_COLORS = {'core': (0.5, 0.5, 0.5, 1.0), 'primary': (0.65, 0.16, 0.16, 1.0),
+                'secondary': (0.65, 0.16, 0.16, 1.0)}
+
+
+def _padded(data, fill):
+    return data + fill * (-len(data) % 4)
+
+
+def glb_bytes(vertices, faces, face_parts=None):
+    """
+    glTF binário (GLB) de uma malha: um primitivo por parte (PARTS) com o
+    seu material quando face_parts é dado, senão um único primitivo.
+    """
+    positions = np.ascontiguousarray(vertices, dtype='<f4')
+    if face_parts is None:
+        groups = [('mesh', faces)]
+    else:
+        groups = [(part, faces[face_parts == index]) for index, part in enumerate(PARTS)]
+
+    binary = positions.tobytes()
+    buffer_views = [{'buffer': 0, 'byteOffset': 0, 'byteLength': len(binary), 'target': 34962}]
+    accessors = [{'bufferView': 0, 'componentType': 5126, 'count': len(positions), 'type': 'VEC3',
+                  'min': positions.min(axis=0).tolist(), 'max': positions.max(axis=0).tolist()}]
+    materials, primitives = [], []
+    for part, group in groups:
+        indices = np.ascontiguousarray(group, dtype='<u4').tobytes()
+        buffer_views.append({'buffer': 0, 'byteOffset': len(binary), 'byteLength': len(indices), 'target': 34963})
+        accessors.append({'bufferView': len(buffer_views) - 1, 'componentType': 5125, 'count': group.size,
+                          'type': 'SCALAR'})
+        materials.append({'name': part, 'pbrMetallicRoughness': {
+            'baseColorFactor': list(_GLTF_COLORS.get(part, (0.8, 0.8, 0.8, 1.0))),
+            'metallicFactor': 0.0, 'roughnessFactor': 0.8}})
+        primitives.append({'attributes': {'POSITION': 0}, 'indices': len(accessors) - 1,
+                           'material': len(materials) - 1})
+        binary += indices  # índices uint32: os deslocamentos continuam múltiplos de 4
+
+    gltf = {
+        'asset': {'version': '2.0', 'generator': 'core_mesh'},
+        'scene': 0, 'scenes': [{'nodes': [0]}],
+        # Modelo em cm, glTF em metros
+        'nodes': [{'mesh': 0, 'scale': [0.01, 0.01, 0.01]}],
+        'meshes': [{'primitives': primitives}],
+        'materials': materials, 'accessors': accessors, 'bufferViews': buffer_views,
+        'buffers': [{'byteLength': len(binary)}],
+    }
+    document = _padded(json.dumps(gltf, separators=(',', ':')).encode('utf-8'), b' ')
+    binary = _padded(binary, b'\0')
+    total = 12 + 8 + len(document) + 8 + len(binary)
+    return (np.array([0x46546C67, 2, total], dtype='<u4').tobytes() +
+            np.array([len(document), 0x4E4F534A], dtype='<u4').tobytes() + document +
+            np.array([len(binary), 0x004E4942], dtype='<u4').tobytes() + binary)
+
+
+_WRITERS = {
+    'stl': lambda vertices, faces, face_parts: stl_bytes(vertices, faces),
+    'obj': obj_bytes,
+    'glb': glb_bytes,
+}
+
+
+def mesh_bytes(mesh, index, fmt='stl'):
+    """
+    Arquivo ('stl', 'obj' ou 'glb') do projeto index de um TransformerMesh.
+    """
+    if fmt not in _WRITERS:
+        raise ValueError(f"formato desconhecido: {fmt!r} (use {', '.join(_WRITERS)})")
+    return _WRITERS[fmt](mesh.vertices[index], mesh.faces, mesh.face_parts)
+
+
+@instrumentar('core_mesh.export_meshes')
+def export_meshes(mesh, destinations, fmt=None):
+    """
+    Grava cada projeto de mesh em destinations (um caminho ou arquivo
+    binário aberto por projeto). Sem fmt o formato vem da extensão de cada
+    caminho (.stl, .obj, .glb).
+    """
+    destinations = list(destinations)
+    if len(destinations) != len(mesh.vertices):
+        raise ValueError("destinations deve ter um destino por projeto")
+    for index, destination in enumerate(destinations):
+        if hasattr(destination, 'write'):
+            destination.write(mesh_bytes(mesh, index, fmt or 'stl'))
+            continue
+        destination = os.fspath(destination)
+        data = mesh_bytes(mesh, index, fmt or os.path.splitext(destination)[1][1:].lower())
+        with open(destination, 'wb') as file:
+            file.write(data)
+
+
+def export_catalog(a, b, first_tension, second_tension, directory, fmt='stl', names=None,
+                   block_size=DEFAULT_BLOCK_SIZE, **options):
+    """
+    Gera e grava as malhas de um catálogo inteiro em directory, um arquivo
+    por projeto (names, sem extensão; padrão: o índice do projeto), em
+    blocos de block_size projetos para limitar a memória. options vão para
+    transformer_meshes (angle, axis, coil_samples, ...). Retorna os caminhos
+    gravados.
+    """
+    a, b, first_tension, second_tension = (x.ravel() for x in np.broadcast_arrays(*(
+        np.asarray(x, dtype=float) for x in (a, b, first_tension, second_tension))))
+    names = [str(index) for index in range(a.size)] if names is None else [str(name) for name in names]
+    if len(names) != a.size:
+        raise ValueError("names deve ter um nome por projeto")
+    os.makedirs(directory, exist_ok=True)
+    paths = [os.path.join(directory, f'{name}.{fmt}') for name in names]
+    for start in range(0, a.size, block_size):
+        block = slice(start, start + block_size)
+        mesh = transformer_meshes(a[block], b[block], first_tension[block], second_tension[block], **options)
+        export_meshes(mesh, paths[block], fmt)
+    return paths
@@ -0,0 +1,141 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from desafio_1 import BLADE_TYPES
+from desafio_1_batch import first_and_second_current_batch, conductor_section_batch, \
+    magnectic_section_batch, calculate_turns_number_batch, dimensions_core_batch, \
+    blades_qtd_batch
+
+# Otimização do núcleo: em vez de a = round(sqrt(seção geométrica)), avalia
+# todas as lâminas do catálogo BLADE_TYPES contra uma faixa de empilhamentos b
+# e devolve a fronteira de Pareto massa de ferro x massa de cobre.
+
+IRON_DENSITY = 7.8     # g/cm³ (mesmo valor usado no peso de dimensions_core)
+COPPER_DENSITY = 8.9   # g/cm³
+MAX_WINDOW_FILL = 1 / 3  # seção da janela >= 3x a seção de cobre
+
+DEFAULT_STACK_DEPTHS = np.round(np.arange(1.0, 15.05, 0.1), 1)  # cm
+
+PARETO_DTYPE = np.dtype([
+    ('a', 'f8'),
+    ('b', 'f8'),
+    ('blade', 'U20'),
+    ('blades', 'f8'),
+    ('primary_turns', 'f8'),
+    ('secondary_turns', 'f8'),
+    ('window_fill', 'f8'),
+    ('iron_mass', 'f8'),
+    ('copper_mass', 'f8'),
+    ('total_mass', 'f8'),
+    ('volume', 'f8'),
+])
+
+
+def evaluate_designs(W2, V2, V1, frequency, a, b, max_fill=MAX_WINDOW_FILL, is_long_cable=False,
+                     is_two_primary_circuits=False, is_two_secondary_circuits=False):
+    """
+    Avalia projetos (a, b) para uma especificação, com broadcast entre todos
+    os argumentos. Retorna um dicionário de arrays com espiras, ocupação da
+    janela, massas (g), volume (cm³) e se o projeto é viável.
+    """
+    W2, V2, V1, frequency, a, b = np.broadcast_arrays(*(
+        np.asarray(x, dtype=float) for x in (W2, V2, V1, frequency, a, b)))
+    W1 = 1.1 * W2
+
+    secondary_current, primary_current = first_and_second_current_batch(W2, V2, V1)
+    primary_section = conductor_section_batch(primary_current, W2)      # mm²
+    secondary_section = conductor_section_batch(secondary_current, W2)  # mm²
+
+    required_gs = magnectic_section_batch(W1, frequency, is_long_cable,
+                                          is_two_primary_circuits, is_two_secondary_circuits) * 1.1
+    core_ms = np.round((a * b) / 1.1, 1)
+    n1 = calculate_turns_number_batch(frequency, V1, core_ms)
+    n2 = calculate_turns_number_batch(frequency, V2, core_ms) * 1.1
+
+    dimensions = dimensions_core_batch(a, b, W2)
+    copper_section = n1 * primary_section + n2 * secondary_section  # mm²
+    window_fill = copper_section / dimensions['window_section']
+
+    # Comprimento médio da espira (cm) para lâminas E-I
+    mean_turn = 2 * a + 2 * b + 0.5 * np.pi * a
+    iron_mass = dimensions['volume'] * IRON_DENSITY
+    copper_mass = mean_turn * copper_section / 100 * COPPER_DENSITY
+
+    return {
+        'primary_turns': n1,
+        'secondary_turns': n2,
+        'window_fill': window_fill,
+        'iron_mass': iron_mass,
+        'copper_mass': copper_mass,
+        'volume': dimensions['volume'],
+        'feasible': (a * b >= required_gs) & (window_fill <= max_fill),
+    }
+
+
+def pareto_front(x, y):
+    # Índices dos pontos não dominados (minimizando x e y), ordenados por x
+    order = np.lexsort((y, x))
+    best_y = np.minimum.accumulate(y[order])
+    keep = np.empty(order.shape, dtype=bool)
+    keep[:1] = True
+    keep[1:] = y[order][1:] < best_y[:-1]
+    return order[keep]
+
+
+def optimize_design(W2, V2, V1, frequency, stack_depths=None, max_fill=MAX_WINDOW_FILL,
+                    is_long_cable=False, is_two_primary_circuits=False, is_two_secondary_circuits=False):
+    """
+    Fronteira de Pareto massa de ferro x massa de cobre para uma especificação,
+    varrendo todas as lâminas de BLADE_TYPES contra stack_depths (cm).
+    Retorna um array estruturado PARETO_DTYPE ordenado por massa de ferro;
+    vazio se nenhuma combinação atende a seção magnética e a ocupação máxima.
+    """
+    if stack_depths is None:
+        stack_depths = DEFAULT_STACK_DEPTHS
+    widths = np.array(sorted(BLADE_TYPES), dtype=float)
+    a, b = np.meshgrid(widths, np.asarray(stack_depths, dtype=float), indexing='ij')
+    a, b = a.ravel(), b.ravel()
+
+    designs = evaluate_designs(W2, V2, V1, frequency, a, b, max_fill, is_long_cable,
+                               is_two_primary_circuits, is_two_secondary_circuits)
+    candidates = np.flatnonzero(designs['feasible'])
+    front = candidates[pareto_front(designs['iron_mass'][candidates], designs['copper_mass'][candidates])]
+
+    result = np.empty(front.size, dtype=PARETO_DTYPE)
+    result['a'] = a[front]
+    result['b'] = b[front]
+    result['blade'] = [BLADE_TYPES[width] for width in a[front]]
+    result['blades'] = blades_qtd_batch(b[front])
+    for field in ('primary_turns', 'secondary_turns', 'window_fill', 'iron_mass', 'copper_mass', 'volume'):
+        result[field] = designs[field][front]
+    result['total_mass'] = result['iron_mass'] + result['copper_mass']
+    return result
+
+
+def _optimize_chunk(args):
+    specs, options = args
+    return [optimize_design(*spec, **options) for spec in specs]
+
+
+def optimize_fleet(W2, V2, V1, frequency, processes=None, chunksize=256, **options):
+    """
+    Executa optimize_design para cada especificação (W2, V2, V1, frequency),
+    distribuindo blocos de chunksize especificações entre os núcleos.
+    Retorna uma lista de fronteiras de Pareto na mesma ordem das entradas.
+    Com processes=1 roda no processo atual.
+    """
+    specs = np.column_stack(np.broadcast_arrays(*(
+        np.asarray(x, dtype=float) for x in (W2, V2, V1, frequency)))).reshape(-1, 4)
+    chunks = [(specs[i:i + chunksize].tolist(), options) for i in range(0, len(specs), chunksize)]
+
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if processes == 1 or len(chunks) <= 1:
+        results = map(_optimize_chunk, chunks)
+        return [front for chunk in results for front in chunk]
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        results = executor.map(_optimize_chunk, chunks)
+        return [front for chunk in results for front in chunk]
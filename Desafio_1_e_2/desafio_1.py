@@ -1,8 +1,8 @@
-import pandas as pd
 import numpy as np
 import math
-import matplotlib.pyplot as plt
-from mpl_toolkits.mplot3d.art3d import Poly3DCollection
+from typing import NamedTuple
+
+from root_instrumentation import instrumentar
 
 # Inicializando os parâmetros de entrada, no caso 
 # W2 --> Potência de saída 
@@ -41,22 +41,86 @@ def conductor_section(current,W2):
     else:
         return "Potência fora do range limite recomendado"
 
-def bitola(condutor_section): 
-    conductor_section = {
-    "upper_limit": [53.476, 42.409, 33.362, 26.271, 21.152, 16.774, 13.303, 10.549, 8.366, 6.635, 5.262, 4.173, 3.309, 2.624, 2.081, 1.650, 1.309, 1.038, 0.823, 0.653, 0.518],
-    "lower_limit": [42.409, 33.362, 26.271, 21.152, 16.774, 13.303, 10.549, 8.366, 6.635, 5.262, 4.173, 3.309, 2.624, 2.081, 1.650, 1.309, 1.038, 0.823, 0.653, 0.518, 0.411],
-    "description": ["fio 0", "fio 1", "fio 2", "fio 3", "fio 4", "fio 5", "fio 6", "fio 7", "fio 8", "fio 9", "fio 10", "fio 11", "fio 12", "fio 13", "fio 14", "fio 15", "fio 16", "fio 17", "fio 18", "fio 19", "fio 20"]
+def _gauge_table(areas, descriptions, lower_limit=0.0):
+    # Tabela ordenada por seção crescente para busca binária com np.searchsorted.
+    # Uma seção é atendida pela menor bitola com área >= seção, desde que
+    # seja maior que lower_limit.
+    areas = np.asarray(areas, dtype=float)
+    order = np.argsort(areas)
+    return {
+        "area": areas[order],
+        "description": np.asarray(descriptions)[order],
+        "lower_limit": lower_limit,
     }
-    df = pd.DataFrame(conductor_section)
-    row = df[(df['lower_limit'] < condutor_section) & (df['upper_limit'] >= condutor_section)]
-    if not row.empty:
-        upper_limit = row.iloc[0]['upper_limit']
-        description = row.iloc[0]['description']
-        return [upper_limit, description]
-    else:
+
+
+def _awg_table():
+    # AWG 4/0 (n = -3) até AWG 40: d = 0.127 * 92^((36 - n)/39) mm
+    numbers = np.arange(-3, 41)
+    diameters = 0.127 * 92.0 ** ((36 - numbers) / 39)
+    names = [f"AWG {-n + 1}/0" if n <= 0 else f"AWG {n}" for n in numbers]
+    return _gauge_table(np.pi / 4 * diameters ** 2, names)
+
+
+# Tabelas de bitolas montadas uma única vez na importação do módulo.
+# "fio": tabela original de fios numerados (limites em mm²)
+# "awg": série AWG completa, 4/0 a 40
+# "mm2": seções nominais métricas (IEC 60228)
+WIRE_GAUGE_TABLES = {
+    "fio": _gauge_table(
+        [53.476, 42.409, 33.362, 26.271, 21.152, 16.774, 13.303, 10.549, 8.366, 6.635, 5.262, 4.173, 3.309, 2.624, 2.081, 1.650, 1.309, 1.038, 0.823, 0.653, 0.518],
+        ["fio 0", "fio 1", "fio 2", "fio 3", "fio 4", "fio 5", "fio 6", "fio 7", "fio 8", "fio 9", "fio 10", "fio 11", "fio 12", "fio 13", "fio 14", "fio 15", "fio 16", "fio 17", "fio 18", "fio 19", "fio 20"],
+        lower_limit=0.411),
+    "awg": _awg_table(),
+    "mm2": _gauge_table(
+        [0.5, 0.75, 1, 1.5, 2.5, 4, 6, 10, 16, 25, 35, 50, 70, 95, 120, 150, 185, 240, 300, 400, 500, 630],
+        ["0.5 mm²", "0.75 mm²", "1 mm²", "1.5 mm²", "2.5 mm²", "4 mm²", "6 mm²", "10 mm²", "16 mm²", "25 mm²", "35 mm²", "50 mm²", "70 mm²", "95 mm²", "120 mm²", "150 mm²", "185 mm²", "240 mm²", "300 mm²", "400 mm²", "500 mm²", "630 mm²"]),
+}
+
+
+def wire_gauge_table(standard="fio"):
+    try:
+        return WIRE_GAUGE_TABLES[standard]
+    except KeyError:
+        raise ValueError(f"Padrão de fio desconhecido: {standard!r}. Use um de {sorted(WIRE_GAUGE_TABLES)}") from None
+
+
+def bitola_index(condutor_section, standard="fio"):
+    # Índice da bitola na tabela do padrão escolhido (-1 quando fora da faixa).
+    # Aceita escalar ou array.
+    table = wire_gauge_table(standard)
+    area = table["area"]
+    section = np.asarray(condutor_section, dtype=float)
+    index = np.searchsorted(area, section, side="left")
+    found = (section > table["lower_limit"]) & (index < len(area))
+    return np.where(found, index, -1)
+
+
+@instrumentar('desafio_1.gauge_lookup')
+def gauge_lookup(condutor_section, standard="fio"):
+    # Sempre retorna arrays: (seções das bitolas, descrições), com NaN e ""
+    # nas posições fora da tabela.
+    table = wire_gauge_table(standard)
+    index = bitola_index(condutor_section, standard)
+    found = index >= 0
+    return (np.where(found, table["area"][index], np.nan),
+            np.where(found, table["description"][index], ""))
+
+
+@instrumentar('desafio_1.bitola')
+def bitola(condutor_section, standard="fio"):
+    # Escalar: [seção da bitola, descrição] ou [] se fora da tabela.
+    # Array: mesmo resultado de gauge_lookup.
+    if np.ndim(condutor_section) > 0:
+        return gauge_lookup(condutor_section, standard)
+
+    upper_limit, description = gauge_lookup(condutor_section, standard)
+    if description == "":
         return []
+    return [float(upper_limit), str(description)]
 
 
+@instrumentar('desafio_1.magnectic_section')
 def magnectic_section(potency, frequency,is_long_cable,is_two_primary_circuits=False,is_two_secondary_circuits=False):
     standard_cables = 7.5*(math.sqrt(potency/frequency))
     long_cables = 6.5*(math.sqrt(potency/frequency))
@@ -109,59 +173,50 @@ def calculate_turns_number_1(frequency, tension, core_ms):
 def blades_qtd(b:float,acesita:float):
   return round((b*0.9)/acesita)
 
-def blade_type(a): 
-    if a == 1.5: 
-        return "Lãmina tipo 0"
-    elif a == 2:
-        return "Lãmina tipo 1"
-    elif a == 2.5: 
-        return "Lãmina tipo 2"
-    elif a == 3: 
-        return "Lãmina tipo 3"
-    elif a == 3.5: 
-        return "Lãmina tipo 4"
-    elif a == 4: 
-        return "Lãmina tipo 5"
-    elif a == 5:
-        return "Lâmina tipo 6"
-    else: 
-        return "Lãmina não encontrada"
+# Catálogo de lâminas padronizadas: largura a da perna central (cm) -> tipo
+BLADE_TYPES = {
+    1.5: "Lãmina tipo 0",
+    2: "Lãmina tipo 1",
+    2.5: "Lãmina tipo 2",
+    3: "Lãmina tipo 3",
+    3.5: "Lãmina tipo 4",
+    4: "Lãmina tipo 5",
+    5: "Lâmina tipo 6",
+}
+
+
+def blade_type(a):
+    return BLADE_TYPES.get(a, "Lãmina não encontrada")
     
 
+# Dimensões do núcleo: largura, altura e comprimento em cm, seção da janela
+# em mm², volume em cm³ e peso em g
+class CoreDimensions(NamedTuple):
+    width: float
+    height: float
+    length: float
+    window_section: float
+    volume: float
+    weight: float
+
+
+# Mesmos campos em forma de array estruturado, para lotes de projetos
+CORE_DIMENSIONS_DTYPE = np.dtype([(field, 'f8') for field in CoreDimensions._fields])
+
+
+@instrumentar('desafio_1.dimensions_core')
 def dimensions_core(a,b,second_potency):
+    largura=3*a
     if(second_potency>800):
-        largura=3*a
         altura=4*a
-        comprimento=b
-        seção_janela=(0.5*a*1.5*a)*100  ## mm²
-        volume= ((largura*altura) - (0.5*a*3*a*2))*b*0.9 ## cm³
-        peso = 5.4*(a**2)*7.8
-
-
-        return ("\nA Largura é: "+str(largura)+"cm\n" +
-                "A Altura é: "+str(altura)+"cm\n" +
-                "O Comprimento é: "+str(comprimento)+"cm\n" +
-                "A Seção da janela é: "+str(seção_janela)+"mm²\n"+
-                "O Volume é: "+str(volume)+"cm³\n"
-                "Peso é:" + str(peso)+ 'g')
     else:
-        largura=3*a
         altura=2.5*a
-        print("a", a)
-        print("largura ", largura)
-        print("altura ", altura)
-        comprimento=b
-        seção_janela=(0.5*a*1.5*a)*100  ## mm²
-        volume= ((float(largura)*float(altura)) - (0.5*a*3*a*2))*b*0.9 ## cm
-        peso = 5.4*(a**2)*7.8
+    comprimento=b
+    seção_janela=(0.5*a*1.5*a)*100  ## mm²
+    volume= ((largura*altura) - (0.5*a*3*a*2))*b*0.9 ## cm³
+    peso = 5.4*(a**2)*7.8
 
-
-        return ("\nA Largura é: "+str(largura)+"cm\n" +
-                "A Altura é: "+str(altura)+"cm\n" +
-                "O Comprimento é: "+str(comprimento)+"cm\n" +
-                "A Seção da janela é: "+str(seção_janela)+"mm²\n"+
-                "O Volume é: "+str(volume)+"cm³\n"
-                "Peso é:" + str(peso)+ 'g')
+    return CoreDimensions(largura, altura, comprimento, seção_janela, volume, peso)
 
 
 def create_transformer_sections(x, y, z, dx, dy, dz):
@@ -175,6 +230,8 @@ def create_transformer_sections(x, y, z, dx, dy, dz):
                      [x, y + dy, z + dz]])
 
 
+# Usada só no desenho de generate_transformer; a matriz não é ortonormal (para
+# malhas exportáveis com rotação de verdade, ver core_mesh.rotation_matrix)
 def rotate_transformer(vertices, angle):
     rotation_matrix = np.array([
         [ np.cos(angle), 1,0],
@@ -184,74 +241,13 @@ def rotate_transformer(vertices, angle):
     return np.dot(vertices, rotation_matrix.T)
 
 
-def plot_transformer(ax, vertices, c):
-    faces = [[vertices[j] for j in [0, 1, 5, 4]],
-             [vertices[j] for j in [7, 6, 2, 3]],
-             [vertices[j] for j in [0, 3, 7, 4]],
-             [vertices[j] for j in [1, 2, 6, 5]],
-             [vertices[j] for j in [0, 1, 2, 3]],
-             [vertices[j] for j in [4, 5, 6, 7]]]
-
-    poly3d = Poly3DCollection(faces, linewidths=1, alpha=.35, color=c)
-    ax.add_collection3d(poly3d)
-
-
-def generate_transformer(ax, angle:float, a:float, b:float, first_tension:float, second_tension:float):
-
-    parts = [                     # X, Y, Z, H, W, T
-        create_transformer_sections(0, 0, 0, 0.5*a, 3*a, b),  # base da lamina "E"
-        create_transformer_sections(0, a+1.5*a, 0, 2*a, a*0.5, b),  # seção do secundario
-        create_transformer_sections(0, a, 0, 2*a, a, b),  # tronco central do transformador
-        create_transformer_sections(0, 0, 0, 2*a, a*0.5, b),  # seção do primario
-        create_transformer_sections(2*a, 0, 0, 0.5*a, 3*a, b)   # Seção que compõe a lamina tipo "I" (topo do transformador)
-    ]
-   #cont = 0
-    for part in parts:
-        c = 'gray'
-        #if cont == 1 or cont == 3:
-        #    c = "C" + str(cont) #C1 = Laranja, C2 = Vermelho
-        #cont += 1
-        rotated_part = rotate_transformer(part, angle)
-        plot_transformer(ax, rotated_part, c) # plotar transformador rotacionado
-
-    n1 = first_tension*1.1
-    n2 = second_tension*1.1
-
-    if(n1>n2):
-        #primeiro enrolamento
-        zline = np.linspace(0.6*a, a*1.2, 100)+a*(0.75)
-        xline = np.cos(zline*3*b)
-        yline = np.sin(zline*3*b)
-        ax.plot3D((b/1.5)*xline-(a*(-1.52)), yline*(b/1.5)+(b/2), zline, color='brown')
-
-        #segundo enrolamento
-        zline = np.linspace(a, 0.5*a, 50)-a*(0.01)
-        xline = np.cos(zline*2*b)-2.5
-        yline = np.sin(zline*2*b)
-        ax.plot3D((b/1.5)*xline+(b*2.79), yline*(b/1.5)+(b/2), zline, color='brown')
-
-    elif(n2>n1): #se n2>n1
-        #primeiro enrolamento
-        zline = np.linspace(0.6*a, a*1.2, 100)-a*(0.01)
-        xline = np.cos(zline*3*b)
-        yline = np.sin(zline*3*b)
-        ax.plot3D((b/1.5)*xline-(a*(-1.52)), yline*(b/1.5)+(b/2), zline, color='brown')
-
-        #segundo enrolamento
-        zline = np.linspace(a, 0.5*a, 50)+a*(1.01)
-        xline = np.cos(zline*2*a)-2.5
-        yline = np.sin(zline*2*a)
-        ax.plot3D((b/1.5)*xline+(b*2.79), yline*(b/1.5)+(b/2), zline, color='brown')
+# O desenho 3D (matplotlib) fica em desafio_1_plot e só é importado no
+# primeiro uso, para que o cálculo dependa apenas do NumPy
+_PLOT_NAMES = ('plot_transformer', 'generate_transformer')
 
-    else:
-        #primeiro enrolamento
-        zline = np.linspace(a, 0.5*a, 50)+a*(1.01)
-        xline = np.cos(zline*2*a)
-        yline = np.sin(zline*2*a)
-        ax.plot3D((b/1.5)*xline-(a*(-1.52)), yline*(b/1.5)+(b/2), zline, color='brown')
-
-        #segundo enrolamento
-        zline = np.linspace(a, 0.5*a, 50)+a*(1.01)
-        xline = np.cos(zline*2*a)
-        yline = np.sin(zline*2*a)
-        ax.plot3D((b/1.5)*xline-(a*(-1.52)), yline*(b/1.5)+(b/2), zline-a, color='brown')
\ No newline at end of file
+
+def __getattr__(name):
+    if name in _PLOT_NAMES:
+        import desafio_1_plot
+        return getattr(desafio_1_plot, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,145 @@
+import numpy as np
+
+from desafio_1 import gauge_lookup, CORE_DIMENSIONS_DTYPE
+from root_instrumentation import etapa, instrumentar
+
+# Dimensionamento em lote: mesma cadeia de cálculo de desafio_1.py
+# (first_and_second_current -> conductor_section -> magnectic_section ->
+# core_geometric_section_1 -> a/b -> calculate_turns_number_1 -> blades_qtd ->
+# dimensions_core, com as bitolas via gauge_lookup), mas operando sobre arrays NumPy em uma única passada.
+# W2 --> Potência de saída
+# V2 --> Tensão Secundária
+# V1 --> Tensão Primária
+
+ACESITA_BLADE_THICKNESS = 0.035
+
+# Coeficientes de magnectic_section por combinação de circuitos:
+# (dois primários, dois secundários) -> (cabos padrão, cabos longos, fator de potência)
+_MAGNETIC_SECTION_COEFFICIENTS = {
+    (False, False): (7.5, 6.5, 1.0),
+    (True, False): (7.5, 6.0, 1.25),
+    (True, True): (7.5, 6.0, 1.5),
+}
+
+
+def first_and_second_current_batch(W2, V2, V1):
+    W2 = np.asarray(W2, dtype=float)
+    Is = W2 / V2
+    Ip = (1.1 * W2) / V1
+    return Is, Ip
+
+
+def conductor_section_batch(current, W2):
+    # Em conductor_section a condição `W2 > 500 & W2 <= 1000` é sempre
+    # verdadeira para W2 > 500 (precedência do operador &), então toda
+    # potência acima de 500 VA usa a densidade de 2.5 A/mm².
+    W2 = np.asarray(W2, dtype=float)
+    return np.where(W2 <= 500, current / 3, current / 2.5)
+
+
+def magnectic_section_batch(potency, frequency, is_long_cable=False,
+                            is_two_primary_circuits=False, is_two_secondary_circuits=False):
+    potency, frequency, is_long_cable, two_primary, two_secondary = np.broadcast_arrays(
+        np.asarray(potency, dtype=float), np.asarray(frequency, dtype=float),
+        np.asarray(is_long_cable, dtype=bool), np.asarray(is_two_primary_circuits, dtype=bool),
+        np.asarray(is_two_secondary_circuits, dtype=bool))
+
+    # Combinação inválida (só dois secundários) fica como NaN
+    standard = np.full(potency.shape, np.nan)
+    long = np.full(potency.shape, np.nan)
+    factor = np.full(potency.shape, np.nan)
+    for (primary, secondary), (k_standard, k_long, k_factor) in _MAGNETIC_SECTION_COEFFICIENTS.items():
+        mask = (two_primary == primary) & (two_secondary == secondary)
+        standard[mask] = k_standard
+        long[mask] = k_long
+        factor[mask] = k_factor
+
+    coefficient = np.where(is_long_cable, long, standard)
+    return coefficient * np.sqrt(factor * potency / frequency)
+
+
+def calculate_turns_number_batch(frequency, tension, core_ms):
+    return tension * (np.where(np.asarray(frequency) == 50, 40, 33.5) / core_ms)
+
+
+def blades_qtd_batch(b, acesita=ACESITA_BLADE_THICKNESS):
+    return np.rint((b * 0.9) / acesita)
+
+
+def dimensions_core_batch(a, b, second_potency):
+    a, b, second_potency = np.broadcast_arrays(
+        np.asarray(a, dtype=float), np.asarray(b, dtype=float), np.asarray(second_potency, dtype=float))
+    dimensions = np.empty(a.shape, dtype=CORE_DIMENSIONS_DTYPE)
+    dimensions['width'] = 3 * a
+    dimensions['height'] = np.where(second_potency > 800, 4 * a, 2.5 * a)
+    dimensions['length'] = b
+    dimensions['window_section'] = (0.5 * a * 1.5 * a) * 100  ## mm²
+    dimensions['volume'] = ((dimensions['width'] * dimensions['height']) - (0.5 * a * 3 * a * 2)) * b * 0.9  ## cm³
+    dimensions['weight'] = 5.4 * (a ** 2) * 7.8
+    return dimensions
+
+
+@instrumentar('desafio_1_batch.size_transformers')
+def size_transformers(W2, V2, V1, frequency, is_long_cable=False,
+                      is_two_primary_circuits=False, is_two_secondary_circuits=False,
+                      blade_thickness=ACESITA_BLADE_THICKNESS, wire_standard="fio"):
+    """
+    Dimensiona um lote de transformadores de uma vez.
+
+    Todos os argumentos aceitam escalares ou arrays (com broadcast) e o
+    resultado é um dicionário de arrays com uma posição por projeto. Os
+    valores são os mesmos das funções escalares de desafio_1.py aplicadas na
+    ordem de primeiro_exame_escolar.py, com as espiras calculadas pelas
+    tensões V1 e V2 (verificado por batch_parity.py); combinações de
+    circuitos inválidas resultam em NaN. As bitolas seguem o padrão wire_standard (ver
+    WIRE_GAUGE_TABLES), com NaN/"" quando a seção está fora da tabela.
+    """
+    W2, V2, V1, frequency = np.broadcast_arrays(
+        np.asarray(W2, dtype=float), np.asarray(V2, dtype=float),
+        np.asarray(V1, dtype=float), np.asarray(frequency, dtype=float))
+    W1 = 1.1 * W2
+
+    secondary_current, primary_current = first_and_second_current_batch(W2, V2, V1)
+    primary_section = conductor_section_batch(primary_current, W2)
+    secondary_section = conductor_section_batch(secondary_current, W2)
+
+    with etapa('size_transformers.bitolas'):
+        primary_gauge_section, primary_gauge = gauge_lookup(primary_section, wire_standard)
+        secondary_gauge_section, secondary_gauge = gauge_lookup(secondary_section, wire_standard)
+
+    with etapa('size_transformers.nucleo'):
+        magnetic_section = magnectic_section_batch(W1, frequency, is_long_cable,
+                                                   is_two_primary_circuits, is_two_secondary_circuits)
+        geometric_section = magnetic_section * 1.1
+
+        a = np.rint(np.sqrt(geometric_section))
+        b = np.round(geometric_section / a, 1)
+        core_ms = np.round((a * b) / 1.1, 1)
+
+        n1 = calculate_turns_number_batch(frequency, V1, core_ms)
+        n2 = calculate_turns_number_batch(frequency, V2, core_ms) * 1.1
+
+        blades = blades_qtd_batch(b, blade_thickness)
+
+    result = {
+        'primary_current': primary_current,
+        'secondary_current': secondary_current,
+        'primary_section': primary_section,
+        'secondary_section': secondary_section,
+        'primary_gauge_section': primary_gauge_section,
+        'primary_gauge': primary_gauge,
+        'secondary_gauge_section': secondary_gauge_section,
+        'secondary_gauge': secondary_gauge,
+        'magnetic_section': magnetic_section,
+        'geometric_section': geometric_section,
+        'a': a,
+        'b': b,
+        'core_magnetic_section': core_ms,
+        'primary_turns': n1,
+        'secondary_turns': n2,
+        'blades': blades,
+    }
+    dimensions = dimensions_core_batch(a, b, W2)
+    for field in CORE_DIMENSIONS_DTYPE.names:
+        result[field] = dimensions[field]
+    return result
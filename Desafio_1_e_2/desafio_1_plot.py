@@ -0,0 +1,80 @@
+import numpy as np
+from mpl_toolkits.mplot3d.art3d import Poly3DCollection
+
+from desafio_1 import create_transformer_sections, rotate_transformer
+
+# Desenho 3D do núcleo e dos enrolamentos de desafio_1.py; importado sob
+# demanda por desafio_1 (desafio_1.generate_transformer continua válido).
+
+
+def plot_transformer(ax, vertices, c):
+    faces = [[vertices[j] for j in [0, 1, 5, 4]],
+             [vertices[j] for j in [7, 6, 2, 3]],
+             [vertices[j] for j in [0, 3, 7, 4]],
+             [vertices[j] for j in [1, 2, 6, 5]],
+             [vertices[j] for j in [0, 1, 2, 3]],
+             [vertices[j] for j in [4, 5, 6, 7]]]
+
+    poly3d = Poly3DCollection(faces, linewidths=1, alpha=.35, color=c)
+    ax.add_collection3d(poly3d)
+
+
+def generate_transformer(ax, angle:float, a:float, b:float, first_tension:float, second_tension:float):
+
+    parts = [                     # X, Y, Z, H, W, T
+        create_transformer_sections(0, 0, 0, 0.5*a, 3*a, b),  # base da lamina "E"
+        create_transformer_sections(0, a+1.5*a, 0, 2*a, a*0.5, b),  # seção do secundario
+        create_transformer_sections(0, a, 0, 2*a, a, b),  # tronco central do transformador
+        create_transformer_sections(0, 0, 0, 2*a, a*0.5, b),  # seção do primario
+        create_transformer_sections(2*a, 0, 0, 0.5*a, 3*a, b)   # Seção que compõe a lamina tipo "I" (topo do transformador)
+    ]
+   #cont = 0
+    for part in parts:
+        c = 'gray'
+        #if cont == 1 or cont == 3:
+        #    c = "C" + str(cont) #C1 = Laranja, C2 = Vermelho
+        #cont += 1
+        rotated_part = rotate_transformer(part, angle)
+        plot_transformer(ax, rotated_part, c) # plotar transformador rotacionado
+
+    n1 = first_tension*1.1
+    n2 = second_tension*1.1
+
+    if(n1>n2):
+        #primeiro enrolamento
+        zline = np.linspace(0.6*a, a*1.2, 100)+a*(0.75)
+        xline = np.cos(zline*3*b)
+        yline = np.sin(zline*3*b)
+        ax.plot3D((b/1.5)*xline-(a*(-1.52)), yline*(b/1.5)+(b/2), zline, color='brown')
+
+        #segundo enrolamento
+        zline = np.linspace(a, 0.5*a, 50)-a*(0.01)
+        xline = np.cos(zline*2*b)-2.5
+        yline = np.sin(zline*2*b)
+        ax.plot3D((b/1.5)*xline+(b*2.79), yline*(b/1.5)+(b/2), zline, color='brown')
+
+    elif(n2>n1): #se n2>n1
+        #primeiro enrolamento
+        zline = np.linspace(0.6*a, a*1.2, 100)-a*(0.01)
+        xline = np.cos(zline*3*b)
+        yline = np.sin(zline*3*b)
+        ax.plot3D((b/1.5)*xline-(a*(-1.52)), yline*(b/1.5)+(b/2), zline, color='brown')
+
+        #segundo enrolamento
+        zline = np.linspace(a, 0.5*a, 50)+a*(1.01)
+        xline = np.cos(zline*2*a)-2.5
+        yline = np.sin(zline*2*a)
+        ax.plot3D((b/1.5)*xline+(b*2.79), yline*(b/1.5)+(b/2), zline, color='brown')
+
+    else:
+        #primeiro enrolamento
+        zline = np.linspace(a, 0.5*a, 50)+a*(1.01)
+        xline = np.cos(zline*2*a)
+        yline = np.sin(zline*2*a)
+        ax.plot3D((b/1.5)*xline-(a*(-1.52)), yline*(b/1.5)+(b/2), zline, color='brown')
+
+        #segundo enrolamento
+        zline = np.linspace(a, 0.5*a, 50)+a*(1.01)
+        xline = np.cos(zline*2*a)
+        yline = np.sin(zline*2*a)
+        ax.plot3D((b/1.5)*xline-(a*(-1.52)), yline*(b/1.5)+(b/2), zline-a, color='brown')
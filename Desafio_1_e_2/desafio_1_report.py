@@ -0,0 +1,11 @@
+# Camada de apresentação: formatação em texto dos resultados numéricos de
+# desafio_1.py, fora do caminho de cálculo.
+
+
+def format_dimensions(dimensions):
+    return ("\nA Largura é: "+str(dimensions.width)+"cm\n" +
+            "A Altura é: "+str(dimensions.height)+"cm\n" +
+            "O Comprimento é: "+str(dimensions.length)+"cm\n" +
+            "A Seção da janela é: "+str(dimensions.window_section)+"mm²\n"+
+            "O Volume é: "+str(dimensions.volume)+"cm³\n"
+            "Peso é:" + str(dimensions.weight)+ 'g')
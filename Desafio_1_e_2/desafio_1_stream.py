@@ -0,0 +1,186 @@
+import argparse
+import csv
+import json
+import math
+import sys
+
+import numpy as np
+
+from desafio_1 import blade_type
+from desafio_1_batch import size_transformers
+from root_instrumentation import etapa
+
+# Modo não interativo de primeiro_exame_escolar.py: lê especificações de
+# transformadores em JSON Lines ou CSV (arquivo ou stdin) e escreve um
+# registro JSON por linha no stdout, na ordem da entrada.
+#
+# Campos de entrada: W2, V2, V1, frequency (obrigatórios, números > 0),
+# is_long_cable, is_two_primary_circuits, is_two_secondary_circuits
+# (opcionais, padrão falso) e id (opcional, repetido na saída). As linhas
+# válidas são dimensionadas em blocos por size_transformers; as inválidas
+# geram um registro {"linha": ..., "erro": ...} em vez de valores padrão.
+
+DEFAULT_BLOCK_SIZE = 1 << 16
+
+NUMERIC_FIELDS = ('W2', 'V2', 'V1', 'frequency')
+FLAG_FIELDS = ('is_long_cable', 'is_two_primary_circuits', 'is_two_secondary_circuits')
+_TRUE = {'1', 'true', 't', 'sim', 's', 'yes', 'y'}
+_FALSE = {'', '0', 'false', 'f', 'nao', 'não', 'n', 'no'}
+
+
+class SpecError(ValueError):
+    pass
+
+
+def _number(spec, field):
+    value = spec.get(field)
+    if type(value) in (int, float) and 0 < value < math.inf:
+        return float(value)
+    if value is None or value == '':
+        raise SpecError(f"{field} ausente")
+    if isinstance(value, bool):
+        raise SpecError(f"{field} deve ser numérico: {value!r}")
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise SpecError(f"{field} deve ser numérico: {value!r}") from None
+    if not math.isfinite(number) or number <= 0:
+        raise SpecError(f"{field} deve ser um número positivo: {value!r}")
+    return number
+
+
+def _flag(spec, field):
+    value = spec.get(field)
+    if value is None or isinstance(value, bool):
+        return bool(value)
+    if isinstance(value, (int, float)) and value in (0, 1):
+        return bool(value)
+    text = str(value).strip().lower()
+    if text in _TRUE:
+        return True
+    if text in _FALSE:
+        return False
+    raise SpecError(f"{field} deve ser verdadeiro ou falso: {value!r}")
+
+
+def validate_spec(spec):
+    """
+    Converte um registro de entrada em (W2, V2, V1, frequency, is_long_cable,
+    is_two_primary_circuits, is_two_secondary_circuits); levanta SpecError
+    com a descrição do problema.
+    """
+    if not isinstance(spec, dict):
+        raise SpecError("registro deve ser um objeto JSON")
+    values = (tuple(_number(spec, field) for field in NUMERIC_FIELDS) +
+              tuple(_flag(spec, field) for field in FLAG_FIELDS))
+    if values[6] and not values[5]:
+        raise SpecError("dois circuitos secundários exigem dois circuitos primários")
+    return values
+
+
+def read_specs(stream, fmt):
+    # (número da linha, registro ou SpecError) para cada linha de dados
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for spec in reader:
+            yield reader.line_num, spec
+        return
+    for number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line)
+        except json.JSONDecodeError as error:
+            yield number, SpecError(f"JSON inválido: {error.msg}")
+
+
+def _json_tokens(values):
+    # Texto JSON de cada valor de uma coluna, com valores não finitos (fora
+    # das tabelas) como null; um único json.dumps por coluna
+    if values.dtype.kind == 'f':
+        text = json.dumps(np.where(np.isfinite(values), values, None).tolist())
+        return text[1:-1].split(', ')
+    encoded = {value: json.dumps(value, ensure_ascii=False) for value in set(values.tolist())}
+    return [encoded[value] for value in values.tolist()]
+
+
+def _record_head(number, spec):
+    head = f'{{"linha": {number}, '
+    if isinstance(spec, dict) and 'id' in spec:
+        head += f'"id": {json.dumps(spec["id"])}, '
+    return head
+
+
+def _size_block(block, wire_standard):
+    # block: [(número, registro)]; devolve as linhas JSON na mesma ordem e o
+    # número de registros rejeitados
+    lines = [None] * len(block)
+    rows, specs = [], []
+    with etapa('modo_lote.validacao'):
+        for position, (number, spec) in enumerate(block):
+            try:
+                if isinstance(spec, SpecError):
+                    raise spec
+                specs.append(validate_spec(spec))
+                rows.append(position)
+            except SpecError as error:
+                lines[position] = (_record_head(number, spec) +
+                                   f'"erro": {json.dumps(str(error), ensure_ascii=False)}}}\n')
+
+    if rows:
+        columns = np.array(specs, dtype=float).T
+        result = size_transformers(*columns[:4], is_long_cable=columns[4].astype(bool),
+                                   is_two_primary_circuits=columns[5].astype(bool),
+                                   is_two_secondary_circuits=columns[6].astype(bool),
+                                   wire_standard=wire_standard)
+        result['blade_type'] = np.array([blade_type(a) for a in result['a'].tolist()])
+        with etapa('modo_lote.json'):
+            keys = [f'"{name}": ' for name in result]
+            tokens = zip(*(_json_tokens(values) for values in result.values()))
+            for position, row in zip(rows, tokens):
+                lines[position] = _record_head(*block[position]) + ', '.join(map(str.__add__, keys, row)) + '}\n'
+
+    return lines, len(block) - len(rows)
+
+
+def process_stream(source, output, fmt='jsonl', block_size=DEFAULT_BLOCK_SIZE, wire_standard="fio"):
+    """
+    Dimensiona todas as especificações de source (arquivo texto aberto) e
+    escreve um registro JSON por linha em output. Retorna (válidas,
+    inválidas).
+    """
+    valid = invalid = 0
+    block = []
+    for item in read_specs(source, fmt):
+        block.append(item)
+        if len(block) >= block_size:
+            lines, errors = _size_block(block, wire_standard)
+            output.writelines(lines)
+            valid, invalid, block = valid + len(lines) - errors, invalid + errors, []
+    if block:
+        lines, errors = _size_block(block, wire_standard)
+        output.writelines(lines)
+        valid, invalid = valid + len(lines) - errors, invalid + errors
+    return valid, invalid
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='primeiro_exame_escolar.py',
+        description="Dimensionamento em lote (Desafio 1): especificações em JSON Lines ou CSV, "
+                    "resultados em JSON Lines no stdout")
+    parser.add_argument('entrada', nargs='?', default='-', help="arquivo de entrada ou - para stdin")
+    parser.add_argument('--formato', choices=('jsonl', 'csv'),
+                        help="formato da entrada (padrão: pela extensão; jsonl para stdin)")
+    parser.add_argument('--bloco', type=int, default=DEFAULT_BLOCK_SIZE, help="especificações por bloco")
+    parser.add_argument('--padrao-fio', default="fio", help="tabela de bitolas (ver WIRE_GAUGE_TABLES)")
+    args = parser.parse_args(argv)
+
+    fmt = args.formato or ('csv' if args.entrada.lower().endswith('.csv') else 'jsonl')
+    if args.entrada == '-':
+        valid, invalid = process_stream(sys.stdin, sys.stdout, fmt, args.bloco, args.padrao_fio)
+    else:
+        with open(args.entrada, newline='', encoding='utf-8') as source:
+            valid, invalid = process_stream(source, sys.stdout, fmt, args.bloco, args.padrao_fio)
+    print(f"{valid} especificações dimensionadas, {invalid} rejeitadas", file=sys.stderr)
+    return 0
@@ -0,0 +1,25 @@
+import matplotlib.pyplot as plt
+
+from desafio_2 import desafio_2_curves
+from root_instrumentation import instrumentar
+
+
+@instrumentar('desafio_2.graficos')
+def desafio_2(core_lenght, core_area, n1, W1):
+    curves = desafio_2_curves(core_lenght, core_area, n1, W1)
+
+    # Plotar curva B-H
+    plt.plot(curves.H, curves.B, 'r-')
+    plt.xlabel('Campo Magnético H (A/m)')
+    plt.ylabel('Densidade de Fluxo B (T)')
+    plt.title('Curva B-H do Material do Núcleo')
+    plt.grid()
+    plt.show()
+
+    # Plotar I_m x tempo
+    plt.plot(curves.time, curves.magnetizing_current)
+    plt.xlabel('Tempo (s)')
+    plt.ylabel('Corrente de Magnetização (A)')
+    plt.title('Curva I_m x Tempo')
+    plt.grid()
+    plt.show()
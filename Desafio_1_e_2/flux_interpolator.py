@@ -0,0 +1,127 @@
+import os
+
+import numpy as np
+
+from mag_curve import DEFAULT_MAG_CURVE, load_mag_curve
+from root_instrumentation import instrumentar
+
+# Interpolação linear por partes Fluxo -> MMF, substituindo o
+# interp1d(fluxo_data, fmm_data, fill_value="extrapolate") dos notebooks do
+# Desafio 2. Inclinações e interceptos de cada segmento são calculados uma vez;
+# cada avaliação é um np.searchsorted seguido de intercepto + inclinação*fluxo.
+#
+# Erro em relação ao interp1d: a forma intercepto + inclinação*x arredonda de
+# maneira diferente de y0 + inclinação*(x - x0). Na curva do MagCurve.xlsx,
+# para fluxos de até 3x o máximo da planilha, a diferença absoluta fica abaixo
+# de 5e-11 A.e (relativa < 1e-14).
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+
+class PiecewiseLinearInterpolator:
+    """
+    Interpolador linear por partes com extrapolação linear nos extremos.
+
+    As amostras são ordenadas e abscissas repetidas viram um único ponto com
+    a média das ordenadas. Com odd_symmetric=True só as amostras com x >= 0
+    são usadas e a curva é estendida por simetria ímpar, f(-x) = -f(x).
+    """
+
+    def __init__(self, x, y, odd_symmetric=False):
+        x = np.asarray(x, dtype=float).ravel()
+        y = np.asarray(y, dtype=float).ravel()
+        if x.shape != y.shape:
+            raise ValueError("x e y devem ter o mesmo número de amostras")
+
+        if odd_symmetric:
+            positive = x > 0
+            x = np.concatenate([[0.0], x[positive]])
+            y = np.concatenate([[0.0], y[positive]])
+
+        x, inverse, counts = np.unique(x, return_inverse=True, return_counts=True)
+        y = np.bincount(inverse.ravel(), weights=y) / counts
+        if x.size < 2:
+            raise ValueError("São necessárias ao menos duas abscissas distintas")
+
+        self.x = x
+        self.y = y
+        self.odd_symmetric = odd_symmetric
+        self.slopes = np.diff(y) / np.diff(x)
+        self.intercepts = y[:-1] - self.slopes * x[:-1]
+        # Pontos internos: o índice do searchsorted já é o índice do segmento,
+        # com o primeiro e o último segmento cobrindo a extrapolação
+        self._breaks = x[1:-1]
+
+    def segment(self, x):
+        return np.searchsorted(self._breaks, x, side='right')
+
+    def value_and_slope(self, x):
+        # Valor e derivada (inclinação do segmento) em x, sem divisão em blocos
+        x = np.asarray(x, dtype=float)
+        if self.odd_symmetric:
+            magnitude = np.abs(x)
+            index = self.segment(magnitude)
+            slope = self.slopes[index]
+            return np.copysign(self.intercepts[index] + slope * magnitude, x), slope
+        index = self.segment(x)
+        slope = self.slopes[index]
+        return self.intercepts[index] + slope * x, slope
+
+    def _evaluate(self, x, out):
+        if self.odd_symmetric:
+            magnitude = np.abs(x)
+            index = self.segment(magnitude)
+            np.multiply(self.slopes[index], magnitude, out=out)
+            out += self.intercepts[index]
+            np.copysign(out, x, out=out)
+        else:
+            index = self.segment(x)
+            np.multiply(self.slopes[index], x, out=out)
+            out += self.intercepts[index]
+        return out
+
+    @instrumentar('flux_interpolator.avaliar')
+    def __call__(self, x, out=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Avalia a curva em x. Entradas grandes são processadas em blocos de
+        chunk_size amostras para limitar a memória temporária; out pode ser um
+        array (ou memmap) já alocado com o formato de x.
+        """
+        x = np.asarray(x, dtype=float)
+        if out is None:
+            out = np.empty(x.shape)
+        elif out.shape != x.shape:
+            raise ValueError("out deve ter o mesmo formato de x")
+
+        if x.ndim == 0:
+            out[...] = self._evaluate(x.reshape(1), np.empty(1))[0]
+            return out if out.ndim else out[()]
+
+        flat_x = x.reshape(-1)
+        flat_out = out.reshape(-1)
+        # out não contíguo: reshape devolve uma cópia, copiada de volta no final
+        direct = np.may_share_memory(flat_out, out)
+        for start in range(0, flat_x.size, chunk_size):
+            stop = start + chunk_size
+            self._evaluate(flat_x[start:stop], flat_out[start:stop])
+        if not direct:
+            out[...] = flat_out.reshape(out.shape)
+        return out
+
+
+_interpolators = {}  # (caminho, odd_symmetric) -> (MagCurve, interpolador)
+
+
+def flux_to_mmf_interpolator(path=DEFAULT_MAG_CURVE, odd_symmetric=False):
+    """
+    Interpolador Fluxo (Wb) -> MMF (A.e) da curva em path, construído uma vez
+    por curva e reaproveitado enquanto o arquivo não mudar.
+    """
+    curve = load_mag_curve(path)
+    key = (os.path.abspath(path), odd_symmetric)
+    cached = _interpolators.get(key)
+    if cached is not None and cached[0] is curve:
+        return cached[1]
+    interpolator = PiecewiseLinearInterpolator(curve.flux, curve.mmf, odd_symmetric)
+    _interpolators[key] = (curve, interpolator)
+    return interpolator
@@ -0,0 +1,149 @@
+import inspect
+from collections import OrderedDict
+from fractions import Fraction
+from functools import lru_cache
+
+import numpy as np
+
+# Análise harmônica em lote da corrente de magnetização: cada linha de uma
+# matriz (projetos x amostras) é uma forma de onda; uma única rfft ao longo
+# do eixo das amostras dá o espectro de todas de uma vez.
+
+DEFAULT_MAX_ORDER = 15
+DEFAULT_BATCH_SIZE = 1024
+# Teto de elementos do espectro de trabalho de um plano (16 MB em complex)
+DEFAULT_MAX_ELEMENTS = 1 << 20
+# Planos (um por comprimento de janela) mantidos por analisador
+DEFAULT_MAX_PLANS = 4
+
+# np.fft.rfft aceita out= a partir do NumPy 2.0
+_RFFT_HAS_OUT = 'out' in inspect.signature(np.fft.rfft).parameters
+
+
+def harmonics_dtype(max_order=DEFAULT_MAX_ORDER):
+    # harmonics[h - 1] é a amplitude de pico da harmônica de ordem h
+    return np.dtype([
+        ('dc', 'f8'),
+        ('rms', 'f8'),
+        ('fundamental', 'f8'),
+        ('thd', 'f8'),
+        ('harmonics', 'f8', (max_order,)),
+    ])
+
+
+class HarmonicAnalyzer:
+    """
+    Espectro harmônico de lotes de formas de onda amostradas a sample_rate.
+
+    Usa o maior trecho final de cada forma de onda com número inteiro de
+    ciclos da fundamental, de modo que cada harmônica cai exatamente em um
+    bin da FFT. Índices dos bins e buffers de trabalho são guardados por
+    comprimento da janela (os max_plans mais recentes) e reaproveitados
+    entre chamadas; os buffers têm no máximo batch_size linhas e
+    max_elements elementos no espectro, e só crescem até o lote pedido.
+    """
+
+    def __init__(self, sample_rate, fundamental=50.0, max_order=DEFAULT_MAX_ORDER,
+                 batch_size=DEFAULT_BATCH_SIZE, max_elements=DEFAULT_MAX_ELEMENTS, max_plans=DEFAULT_MAX_PLANS):
+        self.sample_rate = sample_rate
+        self.fundamental = fundamental
+        self.max_order = max_order
+        self.batch_size = batch_size
+        self.max_elements = max_elements
+        self.max_plans = max_plans
+        self.dtype = harmonics_dtype(max_order)
+        # Menor bloco com número inteiro de ciclos e de amostras
+        period = Fraction(sample_rate / fundamental).limit_denominator(1000)
+        self._block_samples = period.numerator
+        self._block_cycles = period.denominator
+        self._plans = OrderedDict()
+
+    def _plan(self, n_samples):
+        n_blocks = n_samples // self._block_samples
+        if n_blocks == 0:
+            raise ValueError(f"São necessárias ao menos {self._block_samples} amostras "
+                             f"({self._block_cycles} ciclo(s) da fundamental)")
+        window = n_blocks * self._block_samples
+        plan = self._plans.get(window)
+        if plan is not None:
+            self._plans.move_to_end(window)
+            return plan
+
+        cycles = n_blocks * self._block_cycles
+        # Bins de todas as harmônicas até Nyquist, para o THD
+        orders = np.arange(1, (window // 2) // cycles + 1)
+        scale = np.full(orders.size, 2.0 / window)
+        bins = orders * cycles
+        scale[bins == window // 2] = 1.0 / window  # bin de Nyquist não é duplicado
+        plan = {
+            'window': window,
+            'bins': bins,
+            'scale': scale,
+            'spectrum': None,
+            'amplitudes': None,
+        }
+        self._plans[window] = plan
+        if len(self._plans) > self.max_plans:
+            self._plans.popitem(last=False)
+        return plan
+
+    def _buffers(self, plan, n_rows):
+        # Linhas por lote: batch_size, limitado pelo teto de elementos e pelo
+        # número de formas de onda pedidas; os buffers só são trocados se
+        # os guardados forem menores
+        batch = max(1, min(self.batch_size, n_rows, self.max_elements // (plan['window'] // 2 + 1)))
+        if plan['spectrum'] is None or plan['spectrum'].shape[0] < batch:
+            plan['spectrum'] = np.empty((batch, plan['window'] // 2 + 1), dtype=complex)
+            plan['amplitudes'] = np.empty((batch, plan['bins'].size))
+        return batch, plan['spectrum'], plan['amplitudes']
+
+    def analyze(self, waveforms):
+        """
+        Retorna um array estruturado (dtype harmonics_dtype) com uma linha por
+        forma de onda: componente contínua, valor eficaz, amplitude da
+        fundamental, THD (fração, não %) e amplitudes de pico das ordens
+        1..max_order. Aceita uma forma de onda (1-D) ou um lote (2-D).
+        """
+        waveforms = np.asarray(waveforms, dtype=float)
+        single = waveforms.ndim == 1
+        waveforms = np.atleast_2d(waveforms)
+        plan = self._plan(waveforms.shape[-1])
+        window = plan['window']
+        waveforms = waveforms[:, waveforms.shape[-1] - window:]
+
+        result = np.empty(waveforms.shape[0], dtype=self.dtype)
+        n_orders = min(self.max_order, plan['bins'].size)
+        batch, spectrum_buffer, amplitudes_buffer = self._buffers(plan, waveforms.shape[0])
+        for start in range(0, waveforms.shape[0], batch):
+            rows = waveforms[start:start + batch]
+            size = rows.shape[0]
+            spectrum = spectrum_buffer[:size]
+            amplitudes = amplitudes_buffer[:size]
+            if _RFFT_HAS_OUT:
+                np.fft.rfft(rows, axis=-1, out=spectrum)
+            else:
+                spectrum[...] = np.fft.rfft(rows, axis=-1)
+            np.abs(spectrum[:, plan['bins']], out=amplitudes)
+            amplitudes *= plan['scale']
+
+            out = result[start:start + size]
+            out['dc'] = spectrum[:, 0].real / window
+            out['rms'] = np.sqrt(np.einsum('ij,ij->i', rows, rows) / window)
+            out['fundamental'] = amplitudes[:, 0]
+            distortion = np.sqrt(np.einsum('ij,ij->i', amplitudes[:, 1:], amplitudes[:, 1:]))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                out['thd'] = np.where(amplitudes[:, 0] > 0, distortion / amplitudes[:, 0], np.nan)
+            out['harmonics'][:, :n_orders] = amplitudes[:, :n_orders]
+            out['harmonics'][:, n_orders:] = 0.0
+
+        return result[0] if single else result
+
+
+@lru_cache(maxsize=8)
+def harmonic_analyzer(sample_rate, fundamental=50.0, max_order=DEFAULT_MAX_ORDER):
+    # Um analisador por configuração, reaproveitado entre chamadas
+    return HarmonicAnalyzer(sample_rate, fundamental, max_order)
+
+
+def harmonic_spectrum(waveforms, sample_rate, fundamental=50.0, max_order=DEFAULT_MAX_ORDER):
+    return harmonic_analyzer(sample_rate, fundamental, max_order).analyze(waveforms)
@@ -0,0 +1,435 @@
+import hashlib
+import os
+
+import numpy as np
+
+from mag_curve import DEFAULT_MAG_CURVE
+from flux_interpolator import flux_to_mmf_interpolator
+
+# Modelo de histerese de Preisach para o núcleo do Desafio 2, com entrada
+# fluxo (Wb) e saída MMF (A.e):
+#
+#   MMF(φ) = g(φ) + C(φ) - P(φ)
+#
+# g é a curva MMF x Fluxo do MagCurve.xlsx (sem histerese), P é um operador de
+# Preisach (relés ±1) e C é a linha média do laço maior de P, de modo que o
+# laço fica centrado na curva g e abre para os dois lados dela. O sinal de P é
+# negativo porque a MMF se adianta ao fluxo (o laço de um operador de Preisach
+# puro teria o sentido oposto).
+#
+# Identificação: a densidade de Preisach em u = (α+β)/2, r = (α-β)/2 é
+#   ρ(u, r) = ½ c w(u) K(r),   w(u) = g'(0)/g'(u)
+# (laço estreito onde a curva satura), K log-normal com média
+# relay_width * φ_lim, e c escolhido para que a área do laço maior entre
+# ±φ_lim seja loop_loss (J por ciclo). A função de Everett
+#   E(α, β) = ½ ∫_0^{(α-β)/2} K(r) [W(α-r) - W(β+r)] dr,   W' = c w
+# é tabelada uma vez em uma grade uniforme e gravada em disco por material.
+#
+# Fora de ±φ_lim a parte histerética fica constante e a MMF segue g.
+
+DEFAULT_GRID_SIZE = 401
+DEFAULT_RELAY_WIDTH = 0.1
+DEFAULT_RELAY_SPREAD = 0.5
+DEFAULT_SEQUENCE_CHUNK = 1024
+_STACK_GROWTH = 8
+_BISECTION_STEPS = 60
+
+
+class PreisachState:
+    """
+    Memória do operador de Preisach para um lote de cenários: pilha de
+    pontos de reversão alternados (máximo, mínimo, máximo, ...) com a saída
+    em cada um. As duas primeiras posições são as sentinelas +φ_lim e -φ_lim;
+    virgin indica que a base da pilha é o estado desmagnetizado.
+    """
+
+    def __init__(self, points, values, depth, virgin, flux, output):
+        self.points = points
+        self.values = values
+        self.depth = depth
+        self.virgin = virgin
+        self.flux = flux
+        self.output = output
+
+    def copy(self):
+        return PreisachState(self.points.copy(), self.values.copy(), self.depth.copy(),
+                             self.virgin.copy(), self.flux.copy(), self.output.copy())
+
+    def reserve(self, extra):
+        if self.depth.max(initial=0) + extra > self.points.shape[1]:
+            grow = max(extra, _STACK_GROWTH)
+            pad = np.zeros((self.points.shape[0], grow))
+            self.points = np.concatenate([self.points, pad], axis=1)
+            self.values = np.concatenate([self.values, pad], axis=1)
+
+
+class PreisachModel:
+    """
+    Modelo de histerese Fluxo -> MMF. Use preisach_model() para identificar
+    (ou carregar do cache em disco) o modelo de uma curva de magnetização.
+
+    Chamado como função, model(fluxo, out=None), calcula a MMF de regime
+    periódico de formas de onda que cobrem períodos inteiros, totalmente
+    vetorizado, e pode substituir o interpolador em magnetizing_current e em
+    magnetizing_current_chunks (que informa os limites do laço, então os
+    blocos não precisam cobrir um período). initial_state e evaluate_path
+    são a interface com estado usada por inrush.simulate_inrush.
+    """
+
+    def __init__(self, curve, flux_limit, everett, midline):
+        self.curve = curve
+        self.flux_limit = flux_limit
+        self.everett_table = everett
+        self.midline = midline
+        self._flat = np.ascontiguousarray(everett).ravel()
+        self.grid = np.linspace(-flux_limit, flux_limit, everett.shape[0])
+        self._step = self.grid[1] - self.grid[0]
+        self.total = everett[-1, 0]  # E(φ_lim, -φ_lim): saída em saturação
+
+    @classmethod
+    def identify(cls, curve, loop_loss, relay_width=DEFAULT_RELAY_WIDTH,
+                 relay_spread=DEFAULT_RELAY_SPREAD, grid_size=DEFAULT_GRID_SIZE):
+        limit = float(np.max(np.abs(curve.x)))
+        n = grid_size
+        step = 2 * limit / (n - 1)
+
+        # W em meia grade: α_i - r_k e β_j + r_k caem sempre em pontos dela
+        fine = np.linspace(-limit, limit, 2 * n - 1)
+        _, slope = curve.value_and_slope(fine)
+        _, slope_origin = curve.value_and_slope(0.0)
+        weight = slope_origin / slope
+        cumulative = np.concatenate([[0.0], np.cumsum((weight[1:] + weight[:-1]) / 2) * step / 2])
+
+        radius = np.arange(n) * step / 2
+        mean = relay_width * limit
+        mu = np.log(mean) - relay_spread ** 2 / 2
+        kernel = np.zeros(n)
+        kernel[1:] = (np.exp(-(np.log(radius[1:]) - mu) ** 2 / (2 * relay_spread ** 2))
+                      / (radius[1:] * relay_spread * np.sqrt(2 * np.pi)))
+
+        i = np.arange(n)[:, None]
+        k = np.arange(n)[None, :]
+        a_integrand = kernel * cumulative[np.clip(2 * i - k, 0, 2 * n - 2)]
+        b_integrand = kernel * cumulative[np.clip(2 * i + k, 0, 2 * n - 2)]
+        a_table = _cumulative_trapezoid(a_integrand, step / 2)
+        b_table = _cumulative_trapezoid(b_integrand, step / 2)
+
+        j = np.arange(n)[None, :]
+        lag = np.clip(i - j, 0, n - 1)
+        everett = np.where(i >= j, 0.5 * (a_table[i, lag] - b_table[j, lag]), 0.0)
+
+        # Área do laço maior com c = 1: ∮ = ∫ (P_desce - P_sobe) dφ
+        total = everett[-1, 0]
+        width = 2 * total - 2 * everett[:, 0] - 2 * everett[-1, :]
+        area = np.sum((width[1:] + width[:-1]) / 2) * step
+        everett *= loop_loss / area
+
+        return cls(curve, limit, everett, everett[:, 0] - everett[-1, :])
+
+    def save(self, path):
+        np.savez(path, flux_limit=self.flux_limit, everett=self.everett_table, midline=self.midline)
+
+    @classmethod
+    def load(cls, path, curve):
+        with np.load(path) as data:
+            return cls(curve, float(data['flux_limit']), data['everett'], data['midline'])
+
+    # --- Consultas às tabelas -------------------------------------------------
+
+    def _position(self, flux):
+        position = (np.minimum(np.maximum(flux, -self.flux_limit), self.flux_limit) + self.flux_limit) / self._step
+        index = np.minimum(position.astype(np.intp), self.grid.size - 2)
+        return index, position - index
+
+    def _corners(self, alpha, beta):
+        ia, ta = self._position(alpha)
+        ib, tb = self._position(beta)
+        n = self.grid.size
+        corner = ia * n + ib
+        table = self._flat
+        return (table.take(corner), table.take(corner + 1), table.take(corner + n),
+                table.take(corner + n + 1), ta, tb)
+
+    def everett(self, alpha, beta):
+        e00, e01, e10, e11, ta, tb = self._corners(alpha, beta)
+        return (1 - ta) * ((1 - tb) * e00 + tb * e01) + ta * ((1 - tb) * e10 + tb * e11)
+
+    def _everett_and_gradient(self, alpha, beta):
+        # E interpolada e as derivadas exatas da interpolação bilinear, dos
+        # mesmos quatro cantos
+        e00, e01, e10, e11, ta, tb = self._corners(alpha, beta)
+        low = e00 + tb * (e01 - e00)
+        high = e10 + tb * (e11 - e10)
+        dalpha = (high - low) / self._step
+        dbeta = ((1 - ta) * (e01 - e00) + ta * (e11 - e10)) / self._step
+        return low + ta * (high - low), dalpha, dbeta
+
+    def _midline(self, flux):
+        index, frac = self._position(flux)
+        low = self.midline[index]
+        difference = self.midline[index + 1] - low
+        return low + frac * difference, difference / self._step
+
+    def _mmf(self, flux, preisach, preisach_slope):
+        curve, curve_slope = self.curve.value_and_slope(flux)
+        midline, midline_slope = self._midline(flux)
+        inside = np.abs(flux) < self.flux_limit
+        return curve + midline - preisach, curve_slope + inside * (midline_slope - preisach_slope)
+
+    # --- Regime periódico (vetorizado no tempo e no lote) --------------------
+
+    def periodic_mmf(self, flux, out=None, bounds=None):
+        """
+        MMF de regime para formas de onda periódicas ao longo do último eixo,
+        que devem cobrir ao menos um período completo, a menos que bounds =
+        (mínimo, máximo) do fluxo no período seja dado (escalares ou um valor
+        por forma de onda). Supõe núcleo desmagnetizado antes da excitação,
+        com um máximo e um mínimo por período (ex.: fluxo senoidal). out pode
+        ser um array já alocado com o formato de flux.
+        """
+        flux = np.asarray(flux, dtype=float)
+        if out is not None and out.shape != flux.shape:
+            raise ValueError("out deve ter o mesmo formato de flux")
+        if bounds is None:
+            lower, upper = flux.min(axis=-1, keepdims=True), flux.max(axis=-1, keepdims=True)
+        else:
+            lower, upper = (np.asarray(bound, dtype=float)[..., None] for bound in bounds)
+        upper = np.clip(upper, -self.flux_limit, self.flux_limit)
+        lower = np.clip(lower, -self.flux_limit, self.flux_limit)
+
+        # Pontas do laço: a de maior amplitude fica na curva virgem
+        loop = self.everett(upper, lower)
+        upper_tip = np.where(upper >= -lower, self.everett(upper, -upper),
+                             2 * loop - self.everett(-lower, lower))
+        lower_tip = upper_tip - 2 * loop
+
+        # Sentido pela amostra seguinte (a última pela anterior): não depende
+        # de o trecho fechar um período; nas reversões os dois ramos coincidem
+        clipped = np.clip(flux, -self.flux_limit, self.flux_limit)
+        rising = np.empty(flux.shape, dtype=bool)
+        rising[..., :-1] = flux[..., 1:] > flux[..., :-1]
+        rising[..., -1:] = flux[..., -1:] > flux[..., -2:-1] if flux.shape[-1] > 1 else True
+        preisach = np.where(rising, lower_tip + 2 * self.everett(clipped, lower),
+                            upper_tip - 2 * self.everett(upper, clipped))
+        mmf, _ = self._mmf(flux, preisach, 0.0)
+        if out is None:
+            return mmf
+        out[...] = mmf
+        return out
+
+    __call__ = periodic_mmf
+
+    # --- Evolução com memória (inrush, formas de onda arbitrárias) -----------
+
+    def initial_state(self, residual_flux):
+        """
+        Estado com fluxo residual e MMF nula: a partir do núcleo
+        desmagnetizado, excursão simétrica até ±φ_p e retorno ao fluxo
+        residual, com φ_p escolhido (bisseção) para anular a MMF. Se nem o
+        laço maior chega a MMF zero, usa φ_p = φ_lim. Retorna (estado, MMF).
+        """
+        residual = np.clip(np.asarray(residual_flux, dtype=float).ravel(),
+                           -self.flux_limit, self.flux_limit)
+        n = residual.size
+        magnitude = np.abs(residual)
+        curve_part = self.curve.value_and_slope(magnitude)[0] + self._midline(magnitude)[0]
+
+        def descending(peak):
+            return curve_part - (self.everett(peak, -peak) - 2 * self.everett(peak, magnitude))
+
+        low, high = magnitude.copy(), np.full(n, self.flux_limit)
+        for _ in range(_BISECTION_STEPS):
+            middle = (low + high) / 2
+            positive = descending(middle) > 0
+            low = np.where(positive, middle, low)
+            high = np.where(positive, high, middle)
+        peak = np.where(descending(magnitude) <= 0, magnitude, high)
+
+        points = np.zeros((n, _STACK_GROWTH))
+        values = np.zeros((n, _STACK_GROWTH))
+        points[:, 0], points[:, 1] = self.flux_limit, -self.flux_limit
+        values[:, 0], values[:, 1] = self.total, -self.total
+        depth = np.full(n, 2)
+
+        tip = self.everett(peak, -peak)
+        minor = peak > magnitude
+        positive = minor & (residual > 0)
+        negative = minor & (residual < 0)
+        points[positive, 2], values[positive, 2] = peak[positive], tip[positive]
+        depth[positive] = 3
+        points[negative, 2], values[negative, 2] = peak[negative], tip[negative]
+        points[negative, 3], values[negative, 3] = -peak[negative], -tip[negative]
+        depth[negative] = 4
+
+        preisach = np.sign(residual) * (tip - 2 * self.everett(peak, magnitude))
+        state = PreisachState(points, values, depth, np.ones(n, dtype=bool), residual.copy(), preisach)
+        mmf, _ = self._mmf(residual, preisach, 0.0)
+        return state, mmf
+
+    def _reverse(self, state, up, down):
+        # Reversões: o ponto atual entra na pilha. Descendo pela curva virgem
+        # e voltando a subir equivale ao par (máximo |φ|, mínimo φ)
+        top_is_min = (state.depth - 1) % 2 == 1
+        base_virgin = state.virgin & (state.depth == 2)
+        push = (down & top_is_min & ~(base_virgin & (state.flux <= 0))) | (up & ~top_is_min)
+        pair = up & base_virgin & (state.flux < 0)
+        if not (push.any() or pair.any()):
+            return
+        state.reserve(2)
+        rows = np.arange(state.depth.size)
+        top = state.depth
+        state.points[rows[pair], top[pair]] = -state.flux[pair]
+        state.values[rows[pair], top[pair]] = -state.output[pair]
+        top = top + pair
+        single = push | pair
+        state.points[rows[single], top[single]] = state.flux[single]
+        state.values[rows[single], top[single]] = state.output[single]
+        state.depth = top + single
+
+    def evaluate_path(self, state, flux):
+        """
+        MMF e dMMF/dφ ao longo de flux (cenários x amostras) partindo de
+        state, sem alterá-lo. Retorna (mmf, inclinação, estado final).
+
+        O caminho é dividido em trechos monótonos; cada trecho é avaliado de
+        uma vez em todas as amostras e cenários, de modo que o laço em Python
+        é por reversão do fluxo e não por amostra.
+        """
+        state = state.copy()
+        n, size = flux.shape
+        x = np.minimum(np.maximum(flux, -self.flux_limit), self.flux_limit)
+        rows = np.arange(n)
+
+        # Direção de cada passo. Passos nulos seguem a direção anterior e, no
+        # início, a do ramo atual (não contam como reversão)
+        step = np.sign(np.diff(x, axis=1, prepend=state.flux[:, None]))
+        base_virgin = state.virgin & (state.depth == 2)
+        current = np.where(base_virgin, np.where(state.flux < 0, -1.0, 1.0),
+                           np.where((state.depth - 1) % 2 == 1, 1.0, -1.0))
+        last_move = np.maximum.accumulate(np.where(step != 0, np.arange(size), -1), axis=1)
+        step = np.where(last_move >= 0, step[rows[:, None], np.maximum(last_move, 0)], current[:, None])
+        segment = np.zeros((n, size), dtype=np.intp)
+        np.cumsum(step[:, 1:] != step[:, :-1], axis=1, out=segment[:, 1:])
+
+        preisach = np.empty((n, size))
+        preisach_slope = np.empty((n, size))
+        for s in range(segment[:, -1].max() + 1):
+            # Só os cenários que têm o trecho s entram nesta passada
+            members = segment == s
+            active = np.flatnonzero(members.any(axis=1))
+            if active.size == n:
+                active = slice(None)
+            else:
+                members = members[active]
+            first = np.argmax(members, axis=1)
+            last = size - 1 - np.argmax(members[:, ::-1], axis=1)
+            direction = np.take_along_axis(step[active], first[:, None], axis=1)[:, 0]
+            up = np.zeros(n, dtype=bool)
+            down = np.zeros(n, dtype=bool)
+            up[active] = direction > 0
+            down[active] = direction < 0
+            self._reverse(state, up, down)
+
+            # Apagamento: cada extremo anterior ultrapassado no trecho tira um
+            # par da pilha; como os extremos são aninhados, basta contá-los.
+            # O trecho é monótono, então só os cenários cuja última amostra já
+            # ultrapassou algum extremo precisam da contagem amostra a amostra
+            xs = x[active]
+            local = np.arange(xs.shape[0])
+            top = state.depth[active] - 1
+            depth = top.max() + 1
+            points = state.points[active, :depth]
+            values = state.values[active, :depth]
+            index = np.arange(depth)
+            rising_segment = direction[:, None] > 0
+            candidates = (index >= 2) & (index < top[:, None]) & ((index % 2 == 0) == rising_segment)
+            signed_points = direction[:, None] * points
+            end = direction * xs[local, last]
+            wiping = np.flatnonzero(np.any(candidates & (end[:, None] >= signed_points), axis=1))
+            reference_top = np.repeat(top[:, None], size, axis=1)
+            if wiping.size:
+                crossed = ((direction[wiping, None] * xs[wiping])[:, :, None]
+                           >= signed_points[wiping, None, :])
+                reference_top[wiping] -= 2 * np.count_nonzero(crossed & candidates[wiping, None, :], axis=2)
+            virgin = state.virgin[active, None]
+            if depth > 2:
+                reference_top -= (~rising_segment & virgin & (reference_top == 2) & (xs <= -points[:, 2:3]))
+
+            # Ramo ascendente a partir do mínimo m: P(m) + 2E(x, m); descendente
+            # a partir do máximo M: P(M) - 2E(M, x); curva virgem: sinal(x) E(|x|, -|x|)
+            reference = points[local[:, None], reference_top]
+            rising = reference_top % 2 == 1
+            base_virgin = virgin & (reference_top == 1)
+            magnitude = np.abs(xs)
+            alpha = np.where(base_virgin, magnitude, np.where(rising, xs, reference))
+            beta = np.where(base_virgin, -magnitude, np.where(rising, reference, xs))
+            everett, dalpha, dbeta = self._everett_and_gradient(alpha, beta)
+            scale = np.where(base_virgin, np.sign(xs), np.where(rising, 2.0, -2.0))
+            output = np.where(base_virgin, 0.0, values[local[:, None], reference_top]) + scale * everett
+            slope = np.where(base_virgin, dalpha - dbeta, np.where(rising, 2 * dalpha, -2 * dbeta))
+            preisach[active] = np.where(members, output, preisach[active])
+            preisach_slope[active] = np.where(members, slope, preisach_slope[active])
+
+            state.depth[active] = reference_top[local, last] + 1
+            state.flux[active] = xs[local, last]
+            state.output[active] = output[local, last]
+            state.virgin[active] &= ~np.any(members & (magnitude >= self.flux_limit), axis=1)
+
+        mmf, slope = self._mmf(flux, preisach, preisach_slope)
+        return mmf, slope, state
+
+    def mmf_sequence(self, flux, residual_flux=0.0, chunk_size=DEFAULT_SEQUENCE_CHUNK):
+        """
+        MMF ao longo de formas de onda arbitrárias (..., amostras), com a
+        memória do núcleo, partindo do fluxo residual com MMF nula. O tempo é
+        percorrido em blocos de chunk_size amostras.
+        """
+        flux = np.asarray(flux, dtype=float)
+        batch = flux.reshape(-1, flux.shape[-1])
+        residual = np.broadcast_to(residual_flux, flux.shape[:-1]).ravel()
+        state, _ = self.initial_state(residual)
+        mmf = np.empty(batch.shape)
+        for start in range(0, batch.shape[1], chunk_size):
+            mmf[:, start:start + chunk_size], _, state = self.evaluate_path(state, batch[:, start:start + chunk_size])
+        return mmf.reshape(flux.shape)
+
+
+def _cumulative_trapezoid(values, step):
+    result = np.zeros_like(values)
+    np.cumsum((values[:, 1:] + values[:, :-1]) * (step / 2), axis=1, out=result[:, 1:])
+    return result
+
+
+_models = {}
+
+
+def preisach_model(loop_loss, path=DEFAULT_MAG_CURVE, relay_width=DEFAULT_RELAY_WIDTH,
+                   relay_spread=DEFAULT_RELAY_SPREAD, grid_size=DEFAULT_GRID_SIZE):
+    """
+    Modelo de Preisach da curva em path com perda do laço maior loop_loss
+    (J por ciclo; perda em W dividida pela frequência). As tabelas de Everett
+    ficam em <curva>.preisach-<hash>.npz, uma por material e parâmetros, e
+    em cache no processo.
+    """
+    curve = flux_to_mmf_interpolator(path)
+    digest = hashlib.sha256()
+    digest.update(curve.x.tobytes())
+    digest.update(curve.y.tobytes())
+    digest.update(repr((float(loop_loss), relay_width, relay_spread, grid_size)).encode())
+    key = digest.hexdigest()[:16]
+
+    cached = _models.get(key)
+    if cached is not None and cached.curve is curve:
+        return cached
+
+    table_path = f"{os.path.abspath(path)}.preisach-{key}.npz"
+    try:
+        model = PreisachModel.load(table_path, curve)
+    except (OSError, ValueError, KeyError):
+        model = PreisachModel.identify(curve, loop_loss, relay_width, relay_spread, grid_size)
+        try:
+            model.save(table_path)
+        except OSError:
+            pass
+    _models[key] = model
+    return model
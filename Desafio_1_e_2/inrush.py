@@ -0,0 +1,176 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
+import numpy as np
+
+from flux_interpolator import flux_to_mmf_interpolator
+
+# Corrente de energização (inrush) no núcleo saturável do Desafio 2.
+# Em vez do fluxo de regime -VM/(w*NP)*cos(w*t), integra
+#   v(t) = VM*sin(w*t + ângulo) = R*i + NP*dφ/dt,   i = MMF(φ)/NP
+# a partir do fluxo residual no instante do chaveamento, para vários
+# ângulos de chaveamento e fluxos residuais ao mesmo tempo.
+#
+# A discretização é Euler implícito, estável mesmo com a indutância muito
+# baixa do núcleo saturado. As amostras são resolvidas em blocos: para cada
+# bloco o sistema não linear de todos os passos e cenários é resolvido por
+# Newton, e como o jacobiano é bidiagonal cada iteração é uma recorrência
+# linear de primeira ordem calculada com cumprod/cumsum. Não há laço em
+# Python por amostra, só por bloco e iteração.
+#
+# Com a curva MMF x Fluxo sem histerese, o fluxo residual entra apenas como
+# condição inicial; a corrente em t=0 é a da curva nesse fluxo e decai com a
+# constante de tempo do circuito. Com um núcleo com histerese (core, por
+# exemplo hysteresis.preisach_model) o fluxo residual existe com corrente
+# nula e a memória do núcleo passa de um bloco para o seguinte.
+
+DEFAULT_SAMPLE_RATE = 20000
+DEFAULT_BLOCK_SIZE = 32
+MAX_NEWTON_ITERATIONS = 50
+# Limite inferior de 1/(1 + c*dMMF/dφ) na recorrência: só altera o passo de
+# Newton (não a solução) e evita underflow do produto acumulado no bloco
+_MIN_RECURRENCE_FACTOR = 1e-9
+
+
+class InrushResult(NamedTuple):
+    time: np.ndarray          # (amostras,)
+    flux: np.ndarray          # (*cenários, amostras) ou None
+    current: np.ndarray       # (*cenários, amostras) ou None
+    peak_current: np.ndarray  # (*cenários,) maior |i| de cada cenário
+
+
+def winding_resistance(analise, side='primary'):
+    # Resistência do enrolamento a partir de AnaliseTransformadorMonofasico
+    parametros = analise.obter_parametros()
+    if side == 'primary':
+        return parametros['resistencia_primario_alta']
+    return parametros['resistencia_secundario_baixa']
+
+
+class _CurveCore:
+    # Curva MMF x Fluxo sem memória, na interface de núcleo usada abaixo
+    # (initial_state/evaluate_path, a mesma de hysteresis.PreisachModel)
+
+    def __init__(self, interpolator):
+        self.interpolator = interpolator
+
+    def initial_state(self, flux):
+        return None, self.interpolator.value_and_slope(flux)[0]
+
+    def evaluate_path(self, state, flux):
+        mmf, slope = self.interpolator.value_and_slope(flux)
+        return mmf, slope, None
+
+
+def _linear_recurrence(a, b):
+    # x_k = a_k * x_{k-1} + b_k ao longo do último eixo, com x_{-1} = 0
+    product = np.cumprod(a, axis=-1)
+    return product * np.cumsum(b / product, axis=-1)
+
+
+def _simulate_block(VM, freq, NP, R, angles, residual_flux, n_samples, sample_rate,
+                    core, block_size, keep_waveforms):
+    w = 2 * np.pi * freq
+    dt = 1 / sample_rate
+    c = dt * R / NP ** 2
+    tolerance = 1e-10 * VM / (w * NP)
+    n = angles.size
+
+    flux_prev = residual_flux.astype(float)
+    state, mmf_prev = core.initial_state(flux_prev)
+    peak = np.abs(mmf_prev) / NP
+    if keep_waveforms:
+        flux_out = np.empty((n, n_samples))
+        current_out = np.empty((n, n_samples))
+        flux_out[:, 0] = flux_prev
+        current_out[:, 0] = mmf_prev / NP
+
+    steps = np.arange(1, block_size + 1)
+    for start in range(1, n_samples, block_size):
+        size = min(block_size, n_samples - start)
+        t = (start - 1 + steps[:size]) * dt
+        drive = (dt * VM / NP) * np.sin(w * t + angles[:, None])
+
+        # Chute inicial: integração da tensão mantendo a queda R*i do último passo
+        flux = flux_prev[:, None] + np.cumsum(drive - c * mmf_prev[:, None], axis=1)
+        previous = np.empty_like(flux)
+        for _ in range(MAX_NEWTON_ITERATIONS):
+            mmf, slope, next_state = core.evaluate_path(state, flux)
+            previous[:, 0] = flux_prev
+            previous[:, 1:] = flux[:, :-1]
+            residual = flux - previous - drive + c * mmf
+            if np.max(np.abs(residual)) <= tolerance:
+                break
+            factor = np.maximum(1 / (1 + c * np.maximum(slope, 0)), _MIN_RECURRENCE_FACTOR)
+            flux += _linear_recurrence(factor, -residual * factor)
+        else:
+            raise RuntimeError("Newton não convergiu na simulação de inrush; "
+                               "reduza o bloco ou aumente a taxa de amostragem")
+
+        current = mmf / NP
+        np.maximum(peak, np.max(np.abs(current), axis=1), out=peak)
+        if keep_waveforms:
+            flux_out[:, start:start + size] = flux
+            current_out[:, start:start + size] = current
+        flux_prev = flux[:, -1]
+        mmf_prev = mmf[:, -1]
+        state = next_state
+
+    if keep_waveforms:
+        return flux_out, current_out, peak
+    return None, None, peak
+
+
+def _simulate_block_args(args):
+    return _simulate_block(*args)
+
+
+def simulate_inrush(VM, freq, NP, R, switching_angle, residual_flux=0.0, cycles=10,
+                    sample_rate=DEFAULT_SAMPLE_RATE, interpolator=None, keep_waveforms=True,
+                    block_size=DEFAULT_BLOCK_SIZE, processes=1, scenarios_per_process=256, core=None):
+    """
+    Simula a energização do transformador para todos os cenários formados
+    pelo broadcast de switching_angle (rad) e residual_flux (Wb); por exemplo
+    ângulos[:, None] e fluxos[None, :] dão uma grade ângulo x fluxo residual.
+
+    Retorna InrushResult com o tempo, fluxo e corrente de cada cenário
+    (formato (*cenários, amostras)) e o pico de corrente por cenário. Com
+    keep_waveforms=False só os picos são guardados. processes > 1 (ou None,
+    um por núcleo) distribui blocos de scenarios_per_process cenários em um
+    pool de processos. core substitui a curva sem histerese por um modelo de
+    núcleo com memória (ver hysteresis.PreisachModel).
+    """
+    if core is None:
+        if interpolator is None:
+            interpolator = flux_to_mmf_interpolator()
+        core = _CurveCore(interpolator)
+    angles, residual = np.broadcast_arrays(np.asarray(switching_angle, dtype=float),
+                                           np.asarray(residual_flux, dtype=float))
+    shape = angles.shape
+    angles, residual = angles.ravel(), residual.ravel()
+    n_samples = int(round(cycles * sample_rate / freq)) + 1
+    time = np.arange(n_samples) / sample_rate
+    if angles.size == 0:
+        # Nenhum cenário: resultados vazios com o formato do broadcast
+        if not keep_waveforms:
+            return InrushResult(time, None, None, np.empty(shape))
+        return InrushResult(time, np.empty(shape + (n_samples,)), np.empty(shape + (n_samples,)), np.empty(shape))
+
+    chunks = [(VM, freq, NP, R, angles[i:i + scenarios_per_process], residual[i:i + scenarios_per_process],
+               n_samples, sample_rate, core, block_size, keep_waveforms)
+              for i in range(0, angles.size, scenarios_per_process)]
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if processes == 1 or len(chunks) <= 1:
+        results = [_simulate_block_args(chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            results = list(executor.map(_simulate_block_args, chunks))
+
+    peak = np.concatenate([result[2] for result in results]).reshape(shape)
+    if not keep_waveforms:
+        return InrushResult(time, None, None, peak)
+    flux = np.concatenate([result[0] for result in results]).reshape(shape + (n_samples,))
+    current = np.concatenate([result[1] for result in results]).reshape(shape + (n_samples,))
+    return InrushResult(time, flux, current, peak)
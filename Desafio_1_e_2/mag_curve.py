@@ -0,0 +1,115 @@
+import hashlib
+import json
+import os
+from typing import NamedTuple
+
+import numpy as np
+
+from root_instrumentation import instrumentar
+
+# Carregamento da curva de magnetização (MMF x Fluxo) do MagCurve.xlsx.
+# A planilha é lida uma única vez e convertida em um arquivo .npy ao lado do
+# original (MagCurve.xlsx.npy), aberto depois com memory-map. O .npy é
+# invalidado pela data de modificação e pelo hash SHA-256 do arquivo de
+# origem, e chamadas repetidas no mesmo processo vêm do cache em memória.
+
+DEFAULT_MAG_CURVE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'MagCurve.xlsx')
+
+
+class MagCurve(NamedTuple):
+    mmf: np.ndarray   # Força magnetomotriz (A.e)
+    flux: np.ndarray  # Fluxo (Wb)
+
+
+_cache = {}  # caminho -> (mtime_ns, tamanho, MagCurve)
+
+
+def _sidecar_paths(path):
+    return path + '.npy', path + '.npy.json'
+
+
+def _file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as source:
+        for block in iter(lambda: source.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _read_source(path):
+    # pandas/openpyxl só são importados quando a planilha precisa ser lida
+    import pandas as pd
+    df = pd.read_excel(path)
+    return np.vstack([df['MMF'].to_numpy(dtype=float), df['Fluxo'].to_numpy(dtype=float)])
+
+
+def _load_sidecar(path, stat):
+    data_path, meta_path = _sidecar_paths(path)
+    try:
+        with open(meta_path) as meta_file:
+            meta = json.load(meta_file)
+    except (OSError, ValueError):
+        return None
+
+    if meta.get('mtime_ns') != stat.st_mtime_ns or meta.get('size') != stat.st_size:
+        # Data diferente não basta para invalidar (ex.: checkout do git):
+        # confere o conteúdo antes de reler a planilha
+        if meta.get('sha256') != _file_hash(path):
+            return None
+        meta.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+        _write_meta(meta_path, meta)
+
+    try:
+        return np.load(data_path, mmap_mode='r')
+    except (OSError, ValueError):
+        return None
+
+
+def _write_meta(meta_path, meta):
+    tmp_path = meta_path + '.tmp'
+    try:
+        with open(tmp_path, 'w') as meta_file:
+            json.dump(meta, meta_file)
+        os.replace(tmp_path, meta_path)
+    except OSError:
+        pass
+
+
+@instrumentar('mag_curve.planilha')
+def _build_sidecar(path, stat):
+    data = _read_source(path)
+    data_path, meta_path = _sidecar_paths(path)
+    tmp_path = data_path + '.tmp.npy'
+    try:
+        np.save(tmp_path, data)
+        os.replace(tmp_path, data_path)
+    except OSError:
+        # Diretório sem permissão de escrita: usa os dados em memória
+        return data
+    _write_meta(meta_path, {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size,
+                            'sha256': _file_hash(path)})
+    return np.load(data_path, mmap_mode='r')
+
+
+@instrumentar('mag_curve.load_mag_curve')
+def load_mag_curve(path=DEFAULT_MAG_CURVE):
+    """
+    Retorna a curva de magnetização (MMF, Fluxo) de path como arrays somente
+    leitura. Só relê a planilha quando ela muda.
+    """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    cached = _cache.get(path)
+    if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2]
+
+    data = _load_sidecar(path, stat)
+    if data is None:
+        data = _build_sidecar(path, stat)
+    curve = MagCurve(data[0], data[1])
+    _cache[path] = (stat.st_mtime_ns, stat.st_size, curve)
+    return curve
+
+
+def clear_cache():
+    _cache.clear()
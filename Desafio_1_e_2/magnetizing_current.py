@@ -0,0 +1,78 @@
+import numpy as np
+
+from flux_interpolator import flux_to_mmf_interpolator
+from root_instrumentation import instrumentar
+
+# Corrente de magnetização do Desafio 2 a partir da curva de magnetização:
+#   fluxo(t) = -VM / (w * NP) * cos(w * t)
+#   mmf(t)   = curva Fluxo -> MMF avaliada em fluxo(t)
+#   i_m(t)   = mmf(t) / NP
+# magnetizing_current calcula tudo em memória; magnetizing_current_chunks
+# gera o mesmo resultado em blocos de tamanho fixo para simulações longas.
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+
+@instrumentar('magnetizing_current')
+def magnetizing_current(VM, freq, NP, time, interpolator=None):
+    if interpolator is None:
+        interpolator = flux_to_mmf_interpolator()
+    w = 2 * np.pi * freq
+    flux = -VM / (w * NP) * np.cos(w * np.asarray(time, dtype=float))
+    mmf = interpolator(flux)
+    return flux, mmf, mmf / NP
+
+
+def allocate_output(n_samples, path=None):
+    # Buffer (4, n_samples) para t, fluxo, mmf e i_m; com path, um .npy
+    # mapeado em memória, que não precisa caber na RAM
+    if path is None:
+        return np.empty((4, n_samples))
+    return np.lib.format.open_memmap(path, mode='w+', dtype=float, shape=(4, n_samples))
+
+
+def magnetizing_current_chunks(VM, freq, NP, duration, sample_rate, chunk_size=DEFAULT_CHUNK_SIZE,
+                               interpolator=None, out=None):
+    """
+    Gera blocos (t, fluxo, mmf, i_m) de até chunk_size amostras cobrindo
+    duration segundos a sample_rate amostras/s, com t_k = k / sample_rate.
+
+    Sem out, os blocos são visões de um único buffer reutilizado a cada
+    iteração (memória constante): copie o que precisar guardar antes de pedir
+    o próximo bloco. Com out de formato (4, n_amostras), por exemplo de
+    allocate_output, cada bloco é escrito direto nele e os valores permanecem.
+    interpolator pode ser um modelo de histerese (hysteresis.PreisachModel):
+    ele recebe os limites do fluxo senoidal, então qualquer chunk_size serve.
+    """
+    if interpolator is None:
+        interpolator = flux_to_mmf_interpolator()
+    n_samples = int(round(duration * sample_rate))
+    if out is not None and out.shape != (4, n_samples):
+        raise ValueError(f"out deve ter formato (4, {n_samples})")
+
+    w = 2 * np.pi * freq
+    flux_peak = -VM / (w * NP)
+    offsets = np.arange(chunk_size, dtype=float)
+    buffer = np.empty((4, chunk_size)) if out is None else None
+    # Modelos com memória precisam do laço inteiro, não só do trecho do bloco
+    periodic = getattr(interpolator, 'periodic_mmf', None)
+    bounds = (-abs(flux_peak), abs(flux_peak))
+
+    for start in range(0, n_samples, chunk_size):
+        size = min(chunk_size, n_samples - start)
+        if out is None:
+            t, flux, mmf, current = buffer[:, :size]
+        else:
+            t, flux, mmf, current = out[:, start:start + size]
+
+        np.add(offsets[:size], start, out=t)
+        t /= sample_rate
+        np.multiply(t, w, out=flux)
+        np.cos(flux, out=flux)
+        flux *= flux_peak
+        if periodic is None:
+            interpolator(flux, out=mmf)
+        else:
+            periodic(flux, out=mmf, bounds=bounds)
+        np.divide(mmf, NP, out=current)
+        yield t, flux, mmf, current
@@ -1,13 +1,19 @@
-import pandas as pd
 import numpy as np
 import math
-import matplotlib.pyplot as plt
+import sys
 
 from desafio_1 import initialize_parameters, first_and_second_current, \
     conductor_section, bitola,magnectic_section,core_geometric_section_1, \
     calculate_a_and_b_geometric_section, core_geometric_section, \
     core_magnetic_section, calculate_turns_number_1, \
     dimensions_core, blades_qtd, blade_type
+from desafio_1_report import format_dimensions
+
+if __name__ == '__main__' and len(sys.argv) > 1:
+    # Modo em lote, sem perguntas: python primeiro_exame_escolar.py specs.jsonl
+    # (ou - para stdin); ver desafio_1_stream
+    from desafio_1_stream import main
+    sys.exit(main(sys.argv[1:]))
 
 if __name__ == '__main__': 
 
@@ -54,8 +60,9 @@ if __name__ == '__main__':
             
             core_gs = core_geometric_section(a, b)
             core_ms =round(core_magnetic_section(a, b),1)
-            n1 = calculate_turns_number_1(frequency, W1, core_ms)
-            n2 = calculate_turns_number_1(frequency,  W2, core_ms)*1.1
+            # Espiras = tensão x espiras por volt (33,5/Sm em 60 Hz, 40/Sm em 50 Hz)
+            n1 = calculate_turns_number_1(frequency, V1, core_ms)
+            n2 = calculate_turns_number_1(frequency, V2, core_ms)*1.1
 
             dimensions= dimensions_core(a,b,W2)
             qtd_blades= blades_qtd(b,acesita_blade_espessura)
@@ -67,7 +74,7 @@ if __name__ == '__main__':
             print("Bitola do cabo secundário: ", section_2_bitola)
             print("Tipo de lâmina: ", blade)
             print("Quantidade de lâminas: ", qtd_blades)
-            print("Dimensões: ",dimensions)
+            print("Dimensões: ",format_dimensions(dimensions))
 
     
     except ValueError:
@@ -0,0 +1,23 @@
+import os
+import sys
+from contextlib import nullcontext
+
+# Reexporta etapa e instrumentar de instrumentacao.py (na raiz do
+# repositório) para os módulos deste diretório. Scripts executados daqui
+# (python primeiro_exame_escolar.py ...) não têm a raiz no sys.path, então
+# ela é acrescentada antes da importação, como em servico.py.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+try:
+    from instrumentacao import etapa, instrumentar
+except ImportError as error:
+    # Diretório copiado sem a raiz: etapa e instrumentar não fazem nada
+    if os.environ.get('INSTRUMENTACAO') or os.environ.get('INSTRUMENTACAO_RASTRO'):
+        print(f"Aviso: instrumentação desligada, instrumentacao.py não foi importado ({error})", file=sys.stderr)
+    etapa = nullcontext
+
+    def instrumentar(nome=None):
+        return lambda funcao: funcao
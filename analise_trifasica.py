@@ -0,0 +1,250 @@
+import numpy as np
+
+from desafio_3_e_desafio_4FINAL import calcular_perdas, impedancia_equivalente
+from instrumentacao import instrumentar
+
+# Análise de bancos trifásicos formados por três unidades monofásicas
+# iguais, a partir dos parâmetros do circuito equivalente de
+# AnaliseTransformadorMonofasico (ou das colunas de calcular_parametros_lote).
+#
+# Cada enrolamento de BT alimenta a carga da sua fase (S em kVA e fator de
+# potência com sinal, positivo para carga atrasada), em estrela (fase-neutro)
+# nas ligações Yy e Dy e em triângulo (entre fases) na Yd. Como em
+# AnaliseCarregamentoTransformador, a tensão na carga é a nominal e a
+# regulação vem da tensão sem carga E = V + Zeq I, com Zeq referida à BT.
+# Na Dy e na Yy com neutro de AT aterrado a sequência zero das cargas tem
+# retorno e cada unidade vê só a própria carga; na Yd a soma das tensões do
+# triângulo é nula, e a sequência zero das cargas circula no triângulo sem
+# passar pelas unidades.
+#
+# Na Yy com neutro de AT isolado a corrente de sequência zero só tem o ramo
+# de magnetização como caminho, então a tensão na carga não pode ficar na
+# nominal: as cargas viram admitâncias (as da potência pedida na tensão
+# nominal), a fonte é a tensão nominal sem carga atrás de Zeq, com Zφ em
+# cada enrolamento, e o deslocamento do neutro de AT sai da lei dos nós no
+# neutro isolado. Com carga equilibrada o neutro não se desloca e a
+# regulação é a mesma das outras ligações.
+#
+# Todas as entradas fazem broadcast; a última dimensão das cargas é a fase
+# (a, b, c), então cargas (instantes, bancos, 3) com parâmetros (bancos,)
+# analisam todos os bancos em todos os instantes de uma vez.
+
+LIGACOES = ('Yy', 'Dy', 'Yd')
+
+# Operador a = 1∠120° e matrizes de Fortescue: fase = A @ sequência (0, 1, 2)
+OPERADOR_A = np.exp(2j * np.pi / 3)
+MATRIZ_FORTESCUE = np.array([[1, 1, 1],
+                             [1, OPERADOR_A ** 2, OPERADOR_A],
+                             [1, OPERADOR_A, OPERADOR_A ** 2]])
+MATRIZ_FORTESCUE_INVERSA = MATRIZ_FORTESCUE.conj().T / 3
+_SEQUENCIA_POSITIVA = np.array([1, OPERADOR_A ** 2, OPERADOR_A])  # ângulos 0°, -120°, +120°
+
+
+def componentes_simetricas(fasores):
+    """
+    Componentes (zero, positiva, negativa) de fasores de fase (..., 3).
+    """
+    return np.asarray(fasores) @ MATRIZ_FORTESCUE_INVERSA.T
+
+
+def fasores_de_fase(componentes):
+    """
+    Fasores das fases a, b, c a partir das componentes (..., 3).
+    """
+    return np.asarray(componentes) @ MATRIZ_FORTESCUE.T
+
+
+class AnaliseBancoTrifasico:
+    """
+    Regulação, perdas, eficiência e corrente de neutro por fase de um banco
+    trifásico de unidades monofásicas. potencia_carga_kVA e fator_potencia
+    têm a fase na última dimensão (..., 3) (escalares valem para as três
+    fases); sem potencia_carga_kVA cada unidade opera na potência nominal.
+    neutro_at_aterrado só muda o resultado da ligação Yy.
+    """
+
+    def __init__(self, parametros_transformador, ligacao='Dy', potencia_carga_kVA=None, fator_potencia=0.92,
+                 neutro_at_aterrado=True):
+        if ligacao not in LIGACOES:
+            raise ValueError(f"ligacao deve ser uma de {', '.join(LIGACOES)}: {ligacao!r}")
+        fator_potencia = np.asarray(fator_potencia, dtype=float)
+        if not np.all(np.abs(fator_potencia) <= 1.0):
+            raise ValueError("Fator de Potência Inválido: os valores devem estar entre -1.0 e 1.0.")
+        self.parametros = parametros_transformador
+        self.ligacao = ligacao
+        self.neutro_at_aterrado = neutro_at_aterrado
+        self.neutro_isolado = ligacao == 'Yy' and not neutro_at_aterrado
+
+        # Parâmetros por banco com uma dimensão para as fases
+        parametro = lambda nome: np.asarray(self.parametros[nome], dtype=float)[..., None]
+        self.tensao_secundaria_nominal = parametro('tensao_baixa')
+        self.relacao_transformacao = parametro('relacao_transformacao')
+        if potencia_carga_kVA is None:
+            potencia_carga = parametro('potencia_nominal')
+        else:
+            potencia_carga = np.asarray(potencia_carga_kVA, dtype=float) * 1e3
+        self.fator_potencia, self.potencia_carga = np.broadcast_arrays(
+            fator_potencia, np.broadcast_to(potencia_carga, np.broadcast_shapes(np.shape(potencia_carga), (3,))))
+
+        self.impedancia_equivalente = impedancia_equivalente(parametro('resistencia_equivalente_alta'),
+                                                             parametro('reatancia_equivalente_alta'))
+
+    def impedancia_serie(self):
+        # Zeq referida à BT, (..., 1)
+        return self.impedancia_equivalente / self.relacao_transformacao ** 2
+
+    def tensoes_nominais(self):
+        # Tensões nominais nos enrolamentos de BT, sequência positiva
+        return self.tensao_secundaria_nominal * _SEQUENCIA_POSITIVA
+
+    def admitancias_carga(self):
+        # conj(S)/V² de cada fase na tensão nominal: I = Y V é a corrente pedida
+        fator_potencia = np.abs(self.fator_potencia)
+        seno = np.sqrt(1 - fator_potencia ** 2)
+        admitancia = np.empty(self.fator_potencia.shape, dtype=complex)
+        escala = self.potencia_carga / self.tensao_secundaria_nominal ** 2
+        admitancia.real = escala * fator_potencia
+        admitancia.imag = escala * np.where(self.fator_potencia < 0, seno, -seno)
+        return admitancia
+
+    @instrumentar('trifasico.neutro_isolado')
+    def resolver_neutro_isolado(self):
+        """
+        Yy com neutro de AT isolado: (tensões nos enrolamentos, tensões nas
+        cargas, deslocamento do neutro de AT), complexas e referidas à BT.
+        """
+        impedancia_serie = self.impedancia_serie()
+        admitancia_carga = self.admitancias_carga()
+        resistencia = np.asarray(self.parametros['resistencia_nucleo_baixa'], dtype=float)[..., None]
+        reatancia = np.asarray(self.parametros['reatancia_magnetizacao_baixa'], dtype=float)[..., None]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            admitancia_magnetizacao = 1 / resistencia - 1j / reatancia  # Rc // jXm; inf -> 0
+            divisor = 1 + impedancia_serie * admitancia_carga
+            admitancia_fase = admitancia_magnetizacao + admitancia_carga / divisor
+            # Lei dos nós no neutro isolado: soma de (U - Vn) Y = 0
+            fonte = self.tensoes_nominais()
+            soma = admitancia_fase.sum(axis=-1, keepdims=True)
+            deslocamento = np.where(soma == 0, 0, (fonte * admitancia_fase).sum(axis=-1, keepdims=True) / soma)
+        tensao_enrolamento = fonte - deslocamento
+        return tensao_enrolamento, tensao_enrolamento / divisor, deslocamento[..., 0]
+
+    def tensoes_carga(self):
+        # Nominais, exceto na Yy com neutro de AT isolado
+        if self.neutro_isolado:
+            return self.resolver_neutro_isolado()[1]
+        return np.broadcast_to(self.tensoes_nominais(), np.broadcast_shapes(self.tensao_secundaria_nominal.shape,
+                                                                            self.fator_potencia.shape))
+
+    @instrumentar('trifasico.correntes')
+    def calcular_correntes_fase(self):
+        # Corrente de cada carga: Y V (|S|/V atrasada de φ na tensão nominal)
+        return self.admitancias_carga() * self.tensoes_carga()
+
+    def calcular_correntes_enrolamento(self):
+        # Na Yd a sequência zero das cargas fica circulando no triângulo de BT
+        correntes = self.calcular_correntes_fase()
+        if self.ligacao == 'Yd':
+            correntes = correntes - correntes.mean(axis=-1, keepdims=True)
+        return correntes
+
+    @instrumentar('trifasico.tensao_sem_carga')
+    def calcular_tensoes_sem_carga(self):
+        if self.neutro_isolado:
+            return np.broadcast_to(self.tensoes_nominais(), self.tensoes_carga().shape)
+        return self.tensoes_carga() + self.impedancia_serie() * self.calcular_correntes_enrolamento()
+
+    def calcular_regulacao_tensao(self):
+        # (|E| - |V|) / |V| em % por fase, (..., 3)
+        tensao_carga = np.abs(self.tensoes_carga())
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return (np.abs(self.calcular_tensoes_sem_carga()) - tensao_carga) / tensao_carga * 100
+
+    def calcular_perdas(self):
+        # (cobre, núcleo) em W por unidade, (..., 3), com a corrente e a tensão de cada enrolamento
+        parametros = {nome: np.asarray(self.parametros[nome], dtype=float)[..., None]
+                      for nome in ('tensao_baixa', 'resistencia_equivalente_alta', 'relacao_transformacao',
+                                   'resistencia_nucleo_baixa')}
+        potencia_enrolamento = self.potencia_carga
+        if self.neutro_isolado:
+            parametros['tensao_baixa'] = np.abs(self.resolver_neutro_isolado()[0])
+            potencia_enrolamento = np.abs(self.calcular_correntes_fase()) * parametros['tensao_baixa']
+        elif self.ligacao == 'Yd':
+            potencia_enrolamento = np.abs(self.calcular_correntes_enrolamento()) * self.tensao_secundaria_nominal
+        perdas_cobre, perdas_nucleo = calcular_perdas(parametros, potencia_enrolamento)
+        return np.broadcast_arrays(perdas_cobre, perdas_nucleo)
+
+    def calcular_potencia_saida(self):
+        # Potência ativa entregue a cada carga (W), (..., 3)
+        if self.neutro_isolado:
+            return np.abs(self.tensoes_carga()) ** 2 * self.admitancias_carga().real
+        return self.potencia_carga * np.abs(self.fator_potencia)
+
+    def calcular_eficiencia(self):
+        # % por fase (..., 3) e do banco (...)
+        potencia_saida = self.calcular_potencia_saida()
+        perdas = sum(self.calcular_perdas())
+        potencia_entrada = potencia_saida + perdas
+        with np.errstate(divide='ignore', invalid='ignore'):
+            por_fase = np.where(potencia_entrada == 0, 0.0, potencia_saida / potencia_entrada * 100)
+            saida_banco, entrada_banco = potencia_saida.sum(axis=-1), potencia_entrada.sum(axis=-1)
+            banco = np.where(entrada_banco == 0, 0.0, saida_banco / entrada_banco * 100)
+        return por_fase, banco
+
+    def calcular_corrente_neutro(self):
+        """
+        Correntes de neutro (A, complexas) de BT e de AT: 3 I0 onde há
+        neutro aterrado. Na Dy a sequência zero circula no triângulo de AT
+        e na Yd não chega aos neutros.
+        """
+        sequencia_zero = componentes_simetricas(self.calcular_correntes_fase())[..., 0]
+        zero = np.zeros_like(sequencia_zero)
+        if self.ligacao == 'Yd':
+            return zero, zero
+        neutro_bt = 3 * sequencia_zero
+        if self.ligacao == 'Dy' or not self.neutro_at_aterrado:
+            neutro_at = zero
+        else:
+            neutro_at = 3 * sequencia_zero / self.relacao_transformacao[..., 0]
+        return neutro_bt, neutro_at
+
+    def calcular_deslocamento_neutro(self):
+        # Tensão do neutro de AT (V, referida à BT) em % da tensão nominal; nula fora da Yy isolada
+        if not self.neutro_isolado:
+            return np.zeros(np.broadcast_shapes(self.tensao_secundaria_nominal.shape[:-1],
+                                                self.fator_potencia.shape[:-1]))
+        return np.abs(self.resolver_neutro_isolado()[2]) / self.tensao_secundaria_nominal[..., 0] * 100
+
+    def calcular_desequilibrio(self):
+        # |I2|/|I1| e |I0|/|I1| das correntes de carga, em %
+        componentes = np.abs(componentes_simetricas(self.calcular_correntes_fase()))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return (np.where(componentes[..., 1] == 0, 0.0, componentes[..., 2] / componentes[..., 1] * 100),
+                    np.where(componentes[..., 1] == 0, 0.0, componentes[..., 0] / componentes[..., 1] * 100))
+
+    @instrumentar('trifasico.resultados')
+    def resultados(self):
+        """
+        Dicionário de arrays: por fase (..., 3) regulação, tensão e corrente
+        da carga, eficiência e perdas; por banco (...) eficiência, perdas
+        totais, correntes de neutro (módulo), deslocamento do neutro de AT e
+        desequilíbrio.
+        """
+        perdas_cobre, perdas_nucleo = self.calcular_perdas()
+        eficiencia, eficiencia_banco = self.calcular_eficiencia()
+        neutro_bt, neutro_at = self.calcular_corrente_neutro()
+        desequilibrio_negativa, desequilibrio_zero = self.calcular_desequilibrio()
+        return {
+            'regulacao_percentual': self.calcular_regulacao_tensao(),
+            'tensao_carga_V': np.abs(self.tensoes_carga()),
+            'eficiencia_percentual': eficiencia,
+            'perdas_cobre_W': perdas_cobre,
+            'perdas_nucleo_W': perdas_nucleo,
+            'corrente_fase_A': np.abs(self.calcular_correntes_fase()),
+            'eficiencia_banco_percentual': eficiencia_banco,
+            'perdas_banco_W': (perdas_cobre + perdas_nucleo).sum(axis=-1),
+            'corrente_neutro_bt_A': np.abs(neutro_bt),
+            'corrente_neutro_at_A': np.abs(neutro_at),
+            'deslocamento_neutro_percentual': self.calcular_deslocamento_neutro(),
+            'desequilibrio_negativa_percentual': desequilibrio_negativa,
+            'desequilibrio_zero_percentual': desequilibrio_zero,
+        }
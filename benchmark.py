@@ -0,0 +1,353 @@
+import argparse
+import datetime
+import io
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+import timeit
+
+import numpy as np
+
+# Benchmarks dos três desafios, sem acesso à rede. Cada caso é medido com
+# timeit (coletor de lixo desligado): o número de chamadas por repetição é
+# ajustado para somar pelo menos --tempo-minimo segundos, e o resultado
+# guardado é o tempo por chamada (mínimo e mediana das repetições).
+#
+#   python benchmark.py --salvar base.json                 # gera a referência
+#   python benchmark.py --base base.json --limite 0.2      # falha se algo ficar >20% mais lento
+#
+# Casos escalares (as funções originais, uma chamada) rodam com tamanho 1;
+# os caminhos em lote rodam com 1, 1e3 e 1e6 elementos (ver --tamanhos).
+# As entradas são geradas com semente fixa e a curva de magnetização é lida
+# uma vez, fora da medição.
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [RAIZ, os.path.join(RAIZ, 'Desafio_1_e_2')]
+
+DEFAULT_TAMANHOS = (1, 1000, 1000000)
+DEFAULT_REPETICOES = 5
+DEFAULT_TEMPO_MINIMO = 0.2
+DEFAULT_LIMITE = 0.25
+SEMENTE = 20240601
+
+
+def _especificacoes(n):
+    rng = np.random.default_rng(SEMENTE)
+    W2 = rng.integers(50, 3000, n).astype(float)
+    V2 = rng.choice([12.0, 24.0, 110.0, 127.0, 220.0], n)
+    V1 = rng.choice([110.0, 127.0, 220.0, 380.0], n)
+    frequency = rng.choice([50.0, 60.0], n)
+    return W2, V2, V1, frequency
+
+
+def _ensaios(n):
+    # Leituras em torno do transformador de exemplo de desafio_3_e_desafio_4FINAL.main
+    rng = np.random.default_rng(SEMENTE)
+    variacao = lambda valor: valor * rng.uniform(0.9, 1.1, n)
+    return {'tensao_ca': variacao(240), 'corrente_ca': variacao(0.2), 'potencia_ca': variacao(35),
+            'tensao_cc': variacao(528), 'corrente_cc': variacao(0.757), 'potencia_cc': variacao(120),
+            'tensao_baixa': np.full(n, 240.0), 'tensao_alta': np.full(n, 13200.0)}
+
+
+_EXEMPLO = dict(tensao_ca=240, corrente_ca=0.2, potencia_ca=35, tensao_cc=528, corrente_cc=0.757, potencia_cc=120,
+                tensao_baixa=240, tensao_alta=13200)
+
+
+# Desafio 1
+
+def _bitola(n):
+    from desafio_1 import bitola
+    return lambda: bitola(0.9)
+
+
+def _gauge_lookup(n):
+    from desafio_1 import gauge_lookup
+    secoes = np.random.default_rng(SEMENTE).uniform(0.01, 60, n)
+    return lambda: gauge_lookup(secoes)
+
+
+def _magnectic_section(n):
+    from desafio_1 import magnectic_section
+    return lambda: magnectic_section(330, 60, False)
+
+
+def _magnectic_section_batch(n):
+    from desafio_1_batch import magnectic_section_batch
+    W2, _, _, frequency = _especificacoes(n)
+    return lambda: magnectic_section_batch(1.1 * W2, frequency)
+
+
+def _dimensions_core(n):
+    from desafio_1 import dimensions_core
+    return lambda: dimensions_core(4, 4.8, 300)
+
+
+def _dimensions_core_batch(n):
+    from desafio_1_batch import dimensions_core_batch
+    W2, _, _, _ = _especificacoes(n)
+    return lambda: dimensions_core_batch(np.rint(np.sqrt(W2 / 15)), 4.8, W2)
+
+
+def _fluxo_desafio_1(n):
+    # A sequência de chamadas do modo interativo de primeiro_exame_escolar (opção D1), sem input/print
+    from desafio_1 import first_and_second_current, conductor_section, bitola, magnectic_section, \
+        core_geometric_section_1, calculate_a_and_b_geometric_section, core_geometric_section, \
+        core_magnetic_section, calculate_turns_number_1, dimensions_core, blades_qtd, blade_type
+
+    def fluxo(W2=300, V2=110, V1=220, frequency=60):
+        first_current, second_current = first_and_second_current(W2, V2, V1)
+        W1 = 1.1 * W2
+        section_1 = conductor_section(first_current, W2)
+        section_2 = conductor_section(second_current, W2)
+        bitola(section_1), bitola(section_2)
+        geometric_section = core_geometric_section_1(magnectic_section(W1, frequency, False))
+        a = round(math.sqrt(geometric_section))
+        blade_type(a)
+        b = round(calculate_a_and_b_geometric_section(geometric_section, a), 1)
+        core_geometric_section(a, b)
+        core_ms = round(core_magnetic_section(a, b), 1)
+        calculate_turns_number_1(frequency, V1, core_ms), calculate_turns_number_1(frequency, V2, core_ms)
+        return dimensions_core(a, b, W2), blades_qtd(b, 0.035)
+
+    return fluxo
+
+
+def _size_transformers(n):
+    from desafio_1_batch import size_transformers
+    especificacoes = _especificacoes(n)
+    return lambda: size_transformers(*especificacoes)
+
+
+class _Descarte:
+    def writelines(self, linhas):
+        pass
+
+
+def _modo_lote(n):
+    # primeiro_exame_escolar em modo lote: JSON Lines em memória -> JSON Lines descartado
+    from desafio_1_stream import process_stream
+    texto = ''.join(json.dumps({'id': i, 'W2': W2, 'V2': V2, 'V1': V1, 'frequency': frequency}) + '\n'
+                    for i, (W2, V2, V1, frequency) in enumerate(zip(*(c.tolist() for c in _especificacoes(n)))))
+    return lambda: process_stream(io.StringIO(texto), _Descarte())
+
+
+def _dimensionar_cache(n):
+    # Acerto no LRU em memória de cache_resultados (sem disco)
+    from cache_resultados import CacheResultados, dimensionar
+    cache = CacheResultados('dimensionamento', 'benchmark', caminho=None)
+    dimensionar(300, 110, 220, 60, cache=cache)
+    return lambda: dimensionar(300, 110, 220, 60, cache=cache)
+
+
+# Desafio 2
+
+def _magnetizing_current(n):
+    from flux_interpolator import flux_to_mmf_interpolator
+    from magnetizing_current import magnetizing_current
+    interpolator = flux_to_mmf_interpolator()
+    tempo = np.arange(n) / 20000
+    return lambda: magnetizing_current(311, 60, 300, tempo, interpolator)
+
+
+# Desafios 3 e 4
+
+def _analise_monofasica(n):
+    from desafio_3_e_desafio_4FINAL import AnaliseTransformadorMonofasico
+    return lambda: AnaliseTransformadorMonofasico(**_EXEMPLO).obter_parametros()
+
+
+def _parametros_lote(n):
+    from desafio_3_e_desafio_4_batch import calcular_parametros_lote
+    ensaios = _ensaios(n)
+    return lambda: calcular_parametros_lote(ensaios)
+
+
+def _analise_carregamento(n):
+    from desafio_3_e_desafio_4FINAL import AnaliseCarregamentoTransformador, AnaliseTransformadorMonofasico
+    parametros = AnaliseTransformadorMonofasico(**_EXEMPLO).obter_parametros()
+
+    def analise():
+        carregamento = AnaliseCarregamentoTransformador(parametros, 0.8, 'atrasado', 8)
+        return carregamento.calcular_regulacao_tensao(), carregamento.calcular_eficiencia()
+
+    return analise
+
+
+def _analise_carregamento_lote(n):
+    from desafio_3_e_desafio_4FINAL import AnaliseCarregamentoTransformadorVetorizada, AnaliseTransformadorMonofasico
+    parametros = AnaliseTransformadorMonofasico(**_EXEMPLO).obter_parametros()
+    rng = np.random.default_rng(SEMENTE)
+    fator_potencia = rng.uniform(-1, 1, n)
+    potencia_kVA = rng.uniform(0.5, 12, n)
+
+    def analise():
+        carregamento = AnaliseCarregamentoTransformadorVetorizada(parametros, fator_potencia, potencia_kVA)
+        return carregamento.calcular_regulacao_tensao(), carregamento.calcular_eficiencia()
+
+    return analise
+
+
+def _jacobiano_carregamento(n):
+    # Mesmos pontos de _analise_carregamento_lote, com as derivadas analíticas
+    from desafio_3_e_desafio_4FINAL import AnaliseCarregamentoTransformadorVetorizada, AnaliseTransformadorMonofasico
+    parametros = AnaliseTransformadorMonofasico(**_EXEMPLO).obter_parametros()
+    rng = np.random.default_rng(SEMENTE)
+    fator_potencia = rng.uniform(-1, 1, n)
+    potencia_kVA = rng.uniform(0.5, 12, n)
+    return lambda: AnaliseCarregamentoTransformadorVetorizada(parametros, fator_potencia,
+                                                              potencia_kVA).calcular_jacobiano()
+
+
+def _banco_trifasico(n):
+    # n bancos Dy com carga desequilibrada por fase
+    from analise_trifasica import AnaliseBancoTrifasico
+    from desafio_3_e_desafio_4FINAL import AnaliseTransformadorMonofasico
+    parametros = AnaliseTransformadorMonofasico(**_EXEMPLO).obter_parametros()
+    rng = np.random.default_rng(SEMENTE)
+    fator_potencia = rng.uniform(-1, 1, (n, 3))
+    potencia_kVA = rng.uniform(0.5, 12, (n, 3))
+    return lambda: AnaliseBancoTrifasico(parametros, 'Dy', potencia_kVA, fator_potencia).resultados()
+
+
+def _incerteza_parametros(n):
+    # n amostras de Monte Carlo de um registro, sem pool
+    from incerteza_ensaios import incerteza_parametros
+    return lambda: incerteza_parametros(_EXEMPLO, amostras=max(n, 2), processes=1)
+
+
+# nome -> (preparação, em lote); a preparação recebe o tamanho e devolve a função medida
+CASOS = {
+    'desafio_1.bitola': (_bitola, False),
+    'desafio_1.gauge_lookup': (_gauge_lookup, True),
+    'desafio_1.magnectic_section': (_magnectic_section, False),
+    'desafio_1_batch.magnectic_section_batch': (_magnectic_section_batch, True),
+    'desafio_1.dimensions_core': (_dimensions_core, False),
+    'desafio_1_batch.dimensions_core_batch': (_dimensions_core_batch, True),
+    'primeiro_exame_escolar.fluxo_d1': (_fluxo_desafio_1, False),
+    'desafio_1_batch.size_transformers': (_size_transformers, True),
+    'primeiro_exame_escolar.modo_lote': (_modo_lote, True),
+    'cache_resultados.dimensionar': (_dimensionar_cache, False),
+    'magnetizing_current.magnetizing_current': (_magnetizing_current, True),
+    'AnaliseTransformadorMonofasico': (_analise_monofasica, False),
+    'desafio_3_e_desafio_4_batch.calcular_parametros_lote': (_parametros_lote, True),
+    'AnaliseCarregamentoTransformador': (_analise_carregamento, False),
+    'AnaliseCarregamentoTransformadorVetorizada': (_analise_carregamento_lote, True),
+    'AnaliseCarregamentoTransformadorVetorizada.jacobiano': (_jacobiano_carregamento, True),
+    'analise_trifasica.AnaliseBancoTrifasico': (_banco_trifasico, True),
+    'incerteza_ensaios.incerteza_parametros': (_incerteza_parametros, True),
+}
+
+
+def medir(funcao, repeticoes=DEFAULT_REPETICOES, tempo_minimo=DEFAULT_TEMPO_MINIMO):
+    """
+    Tempo por chamada de funcao (s): mínimo e mediana de repeticoes
+    medições, cada uma com chamadas suficientes para durar tempo_minimo.
+    """
+    timer = timeit.Timer(funcao)
+    primeira = timer.timeit(1)
+    chamadas = max(1, int(tempo_minimo / max(primeira, 1e-9)))
+    tempos = [tempo / chamadas for tempo in timer.repeat(repeticoes, chamadas)]
+    return {'minimo_s': min(tempos), 'mediana_s': statistics.median(tempos), 'chamadas': chamadas,
+            'repeticoes': repeticoes}
+
+
+def executar(casos=None, tamanhos=DEFAULT_TAMANHOS, repeticoes=DEFAULT_REPETICOES,
+             tempo_minimo=DEFAULT_TEMPO_MINIMO, progresso=None):
+    """
+    Mede os casos escolhidos (todos por padrão). Retorna o dicionário salvo
+    em JSON: 'ambiente' e 'resultados' com uma entrada 'caso[tamanho]'.
+    """
+    resultados = {}
+    for nome in casos or CASOS:
+        preparar, em_lote = CASOS[nome]
+        for tamanho in (tamanhos if em_lote else (1,)):
+            resultado = medir(preparar(tamanho), repeticoes, tempo_minimo)
+            resultado.update(caso=nome, tamanho=tamanho)
+            resultados[f'{nome}[{tamanho}]'] = resultado
+            if progresso is not None:
+                progresso(f'{nome}[{tamanho}]', resultado)
+    ambiente = {
+        'data': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'plataforma': platform.platform(),
+        'processador': platform.processor() or platform.machine(),
+        'nucleos': os.cpu_count(),
+    }
+    return {'ambiente': ambiente, 'resultados': resultados}
+
+
+def comparar(atual, base, limite=DEFAULT_LIMITE):
+    """
+    Compara os mínimos de atual com os de base. Retorna uma lista de
+    (chave, base_s, atual_s, razão, regrediu) para as chaves em comum;
+    regrediu quando atual > base * (1 + limite).
+    """
+    comparacao = []
+    for chave, resultado in atual['resultados'].items():
+        referencia = base['resultados'].get(chave)
+        if referencia is None:
+            continue
+        razao = resultado['minimo_s'] / referencia['minimo_s']
+        comparacao.append((chave, referencia['minimo_s'], resultado['minimo_s'], razao, razao > 1 + limite))
+    return comparacao
+
+
+def _formatar_tempo(segundos):
+    for unidade, escala in (('s', 1), ('ms', 1e-3), ('µs', 1e-6)):
+        if segundos >= escala:
+            return f'{segundos / escala:.3g} {unidade}'
+    return f'{segundos / 1e-9:.3g} ns'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks dos desafios 1 a 4")
+    parser.add_argument('casos', nargs='*', help=f"casos a medir (padrão: todos): {', '.join(CASOS)}")
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=list(DEFAULT_TAMANHOS),
+                        help="tamanhos dos casos em lote")
+    parser.add_argument('--repeticoes', type=int, default=DEFAULT_REPETICOES)
+    parser.add_argument('--tempo-minimo', type=float, default=DEFAULT_TEMPO_MINIMO,
+                        help="duração mínima de cada repetição (s)")
+    parser.add_argument('--salvar', help="grava os resultados neste JSON")
+    parser.add_argument('--base', help="JSON de referência para comparação")
+    parser.add_argument('--limite', type=float, default=DEFAULT_LIMITE,
+                        help="regressão tolerada (0.25 = 25%% mais lento)")
+    args = parser.parse_args(argv)
+
+    desconhecidos = sorted(set(args.casos) - set(CASOS))
+    if desconhecidos:
+        parser.error(f"casos desconhecidos: {', '.join(desconhecidos)}")
+
+    def progresso(chave, resultado):
+        print(f"{chave:<62}{_formatar_tempo(resultado['minimo_s']):>12}{_formatar_tempo(resultado['mediana_s']):>12}",
+              flush=True)
+
+    print(f"{'caso[tamanho]':<62}{'mínimo':>12}{'mediana':>12}")
+    atual = executar(args.casos, args.tamanhos, args.repeticoes, args.tempo_minimo, progresso)
+    if args.salvar:
+        with open(args.salvar, 'w', encoding='utf-8') as arquivo:
+            json.dump(atual, arquivo, indent=2, ensure_ascii=False)
+
+    if not args.base:
+        return 0
+    with open(args.base, encoding='utf-8') as arquivo:
+        base = json.load(arquivo)
+    if base.get('ambiente', {}).get('plataforma') != atual['ambiente']['plataforma']:
+        print("\nAviso: a referência foi medida em outra plataforma", file=sys.stderr)
+    comparacao = comparar(atual, base, args.limite)
+    print(f"\n{'caso[tamanho]':<62}{'base':>12}{'atual':>12}{'razão':>8}")
+    for chave, tempo_base, tempo_atual, razao, regrediu in comparacao:
+        print(f"{chave:<62}{_formatar_tempo(tempo_base):>12}{_formatar_tempo(tempo_atual):>12}{razao:>8.2f}"
+              f"{'  REGRESSÃO' if regrediu else ''}")
+    regressoes = sum(regrediu for *_, regrediu in comparacao)
+    if regressoes:
+        print(f"\n{regressoes} caso(s) mais de {args.limite:.0%} mais lento(s) que a referência", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,250 @@
+import hashlib
+import json
+import math
+import os
+import sqlite3
+import sys
+import threading
+from collections import OrderedDict
+
+# Memoização persistente dos resultados de dimensionamento (Desafio 1) e dos
+# parâmetros de ensaio (AnaliseTransformadorMonofasico) em dois níveis:
+#
+#   1. LRU em memória, limitado a max_itens entradas por cache;
+#   2. SQLite em disco (caminho=None desliga), que sobrevive a reinícios e é
+#      compartilhado entre processos. O arquivo padrão fica no diretório de
+#      cache do usuário ($XDG_CACHE_HOME ou ~/.cache), fora do repositório;
+#      a variável CACHE_RESULTADOS escolhe outro.
+#
+# A chave é o nome do cálculo, a versão do modelo e as entradas normalizadas
+# (números como float com 12 algarismos significativos, então 220, 220.0 e
+# "220" dão a mesma chave). A versão padrão é o hash do código-fonte dos
+# módulos do cálculo mais VERSAO_FORMULAS: qualquer mudança nas fórmulas
+# invalida as entradas antigas, que podar() remove do disco.
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+DESAFIO_1 = os.path.join(RAIZ, 'Desafio_1_e_2')
+
+VERSAO_FORMULAS = 1  # incremente para invalidar tudo sem mudar o código
+DEFAULT_MAX_ITENS = 4096
+DEFAULT_CAMINHO = os.environ.get('CACHE_RESULTADOS') or os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+    'transformadores', 'resultados.cache.sqlite')
+_ALGARISMOS = 12
+
+
+def versao_modelo(*arquivos):
+    """
+    Hash curto do conteúdo dos arquivos de código e de VERSAO_FORMULAS.
+    """
+    digest = hashlib.sha256(str(VERSAO_FORMULAS).encode())
+    for arquivo in arquivos:
+        with open(arquivo, 'rb') as fonte:
+            digest.update(fonte.read())
+    return digest.hexdigest()[:16]
+
+
+def _normalizar(valor):
+    if type(valor) is float or type(valor) is int:
+        numero = valor + 0.0  # -0.0 -> 0.0
+        return float('%.*g' % (_ALGARISMOS, numero)) if math.isfinite(numero) else numero
+    if isinstance(valor, bool) or valor is None:
+        return valor
+    if isinstance(valor, (int, float)) or hasattr(valor, 'item'):
+        return _normalizar(float(valor))
+    if isinstance(valor, str):
+        try:
+            return _normalizar(float(valor))
+        except ValueError:
+            return valor
+    raise TypeError(f"entrada não suportada na chave do cache: {valor!r}")
+
+
+def normalizar_entradas(entradas):
+    """
+    Entradas normalizadas e o texto canônico delas (a chave do cache).
+    """
+    normalizadas = {nome: _normalizar(valor) for nome, valor in entradas.items()}
+    return normalizadas, repr(sorted(normalizadas.items()))
+
+
+class CacheResultados:
+    """
+    Cache de dois níveis para um cálculo (nome) em uma versão do modelo.
+    Os valores são dicionários serializáveis em JSON; obter() devolve uma
+    cópia, então o chamador pode alterá-la. Seguro entre threads.
+    """
+
+    def __init__(self, nome, versao, caminho=DEFAULT_CAMINHO, max_itens=DEFAULT_MAX_ITENS):
+        self.nome = nome
+        self.versao = versao
+        self.caminho = caminho
+        self.max_itens = max_itens
+        self._memoria = OrderedDict()
+        self._trava = threading.Lock()
+        self._conexao = None
+        self.zerar_estatisticas()
+
+    def _banco(self):
+        if self._conexao is None and self.caminho is not None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.caminho)), exist_ok=True)
+            conexao = sqlite3.connect(self.caminho, timeout=30, check_same_thread=False,
+                                      isolation_level=None)
+            conexao.execute('PRAGMA journal_mode=WAL')
+            conexao.execute('PRAGMA synchronous=NORMAL')
+            conexao.execute('CREATE TABLE IF NOT EXISTS resultados (nome TEXT, versao TEXT, chave TEXT, '
+                            'valor TEXT, PRIMARY KEY (nome, versao, chave)) WITHOUT ROWID')
+            self._conexao = conexao
+        return self._conexao
+
+    def _lembrar(self, chave, valor):
+        self._memoria[chave] = valor
+        self._memoria.move_to_end(chave)
+        while len(self._memoria) > self.max_itens:
+            self._memoria.popitem(last=False)
+            self._estatisticas['despejos'] += 1
+
+    def obter(self, entradas, calcular):
+        """
+        Resultado para entradas (dicionário nome -> valor): da memória, do
+        disco ou de calcular(**entradas normalizadas), que é gravado nos dois
+        níveis.
+        """
+        entradas, chave = normalizar_entradas(entradas)
+        with self._trava:
+            valor = self._memoria.get(chave)
+            if valor is not None:
+                self._memoria.move_to_end(chave)
+                self._estatisticas['acertos_memoria'] += 1
+                return dict(valor)
+            banco = self._banco()
+            if banco is not None:
+                linha = banco.execute('SELECT valor FROM resultados WHERE nome = ? AND versao = ? AND chave = ?',
+                                      (self.nome, self.versao, chave)).fetchone()
+                if linha is not None:
+                    valor = json.loads(linha[0])
+                    self._lembrar(chave, valor)
+                    self._estatisticas['acertos_disco'] += 1
+                    return dict(valor)
+            self._estatisticas['faltas'] += 1
+
+        # Calculado fora da trava: outras threads seguem consultando
+        valor = calcular(**entradas)
+        texto = json.dumps(valor)
+        with self._trava:
+            self._lembrar(chave, json.loads(texto))
+            banco = self._banco()
+            if banco is not None:
+                banco.execute('INSERT OR REPLACE INTO resultados VALUES (?, ?, ?, ?)',
+                              (self.nome, self.versao, chave, texto))
+        return dict(valor)
+
+    def estatisticas(self):
+        """
+        Acertos na memória e no disco, faltas, despejos do LRU, taxa de
+        acerto e ocupação da memória.
+        """
+        with self._trava:
+            resultado = dict(self._estatisticas)
+            resultado['itens_memoria'] = len(self._memoria)
+        consultas = resultado['acertos_memoria'] + resultado['acertos_disco'] + resultado['faltas']
+        resultado['taxa_acerto'] = (consultas - resultado['faltas']) / consultas if consultas else 0.0
+        resultado['max_itens'] = self.max_itens
+        return resultado
+
+    def zerar_estatisticas(self):
+        self._estatisticas = {'acertos_memoria': 0, 'acertos_disco': 0, 'faltas': 0, 'despejos': 0}
+
+    def limpar(self, disco=False):
+        # Esvazia a memória; com disco=True apaga também as entradas deste cálculo
+        with self._trava:
+            self._memoria.clear()
+            if disco and self._banco() is not None:
+                self._banco().execute('DELETE FROM resultados WHERE nome = ?', (self.nome,))
+
+    def podar(self):
+        """
+        Remove do disco as entradas deste cálculo de outras versões do
+        modelo. Retorna quantas foram removidas.
+        """
+        with self._trava:
+            banco = self._banco()
+            if banco is None:
+                return 0
+            return banco.execute('DELETE FROM resultados WHERE nome = ? AND versao != ?',
+                                 (self.nome, self.versao)).rowcount
+
+    def fechar(self):
+        with self._trava:
+            if self._conexao is not None:
+                self._conexao.close()
+                self._conexao = None
+
+
+# Cálculos em cache
+
+def _dimensionar(W2, V2, V1, frequency, is_long_cable, is_two_primary_circuits, is_two_secondary_circuits,
+                 wire_standard):
+    if DESAFIO_1 not in sys.path:
+        sys.path.append(DESAFIO_1)
+    from desafio_1 import blade_type
+    from desafio_1_batch import size_transformers
+
+    resultado = size_transformers(W2, V2, V1, frequency, is_long_cable=is_long_cable,
+                                  is_two_primary_circuits=is_two_primary_circuits,
+                                  is_two_secondary_circuits=is_two_secondary_circuits,
+                                  wire_standard=wire_standard)
+    resultado = {nome: valor.item() for nome, valor in resultado.items()}
+    resultado['blade_type'] = blade_type(resultado['a'])
+    return resultado
+
+
+def _parametros_ensaio(**ensaios):
+    from desafio_3_e_desafio_4FINAL import AnaliseTransformadorMonofasico
+
+    parametros = AnaliseTransformadorMonofasico(**ensaios).obter_parametros()
+    return {nome: float(valor) for nome, valor in parametros.items()}
+
+
+_caches = {}
+_trava_caches = threading.Lock()
+
+
+def cache_padrao(nome):
+    """
+    Cache compartilhado no processo para 'dimensionamento' ou
+    'parametros_ensaio', no DEFAULT_CAMINHO e na versão do código atual.
+    """
+    with _trava_caches:
+        cache = _caches.get(nome)
+        if cache is None:
+            arquivos = {
+                'dimensionamento': [os.path.join(DESAFIO_1, 'desafio_1.py'),
+                                    os.path.join(DESAFIO_1, 'desafio_1_batch.py')],
+                'parametros_ensaio': [os.path.join(RAIZ, 'desafio_3_e_desafio_4FINAL.py')],
+            }[nome]
+            cache = _caches[nome] = CacheResultados(nome, versao_modelo(*arquivos))
+        return cache
+
+
+def dimensionar(W2, V2, V1, frequency, is_long_cable=False, is_two_primary_circuits=False,
+                is_two_secondary_circuits=False, wire_standard="fio", cache=None):
+    """
+    Dimensionamento de uma especificação (mesmos campos de
+    desafio_1_batch.size_transformers, mais blade_type) com memoização.
+    """
+    entradas = dict(W2=W2, V2=V2, V1=V1, frequency=frequency, is_long_cable=bool(is_long_cable),
+                    is_two_primary_circuits=bool(is_two_primary_circuits),
+                    is_two_secondary_circuits=bool(is_two_secondary_circuits), wire_standard=wire_standard)
+    return (cache or cache_padrao('dimensionamento')).obter(entradas, _dimensionar)
+
+
+def parametros_ensaio(tensao_ca, corrente_ca, potencia_ca, tensao_cc, corrente_cc, potencia_cc,
+                      tensao_baixa, tensao_alta, frequencia=60, cache=None):
+    """
+    AnaliseTransformadorMonofasico(...).obter_parametros() com memoização.
+    """
+    entradas = dict(tensao_ca=tensao_ca, corrente_ca=corrente_ca, potencia_ca=potencia_ca,
+                    tensao_cc=tensao_cc, corrente_cc=corrente_cc, potencia_cc=potencia_cc,
+                    tensao_baixa=tensao_baixa, tensao_alta=tensao_alta, frequencia=frequencia)
+    return (cache or cache_padrao('parametros_ensaio')).obter(entradas, _parametros_ensaio)
@@ -0,0 +1,182 @@
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+# Teste de carga de servico.py: --clientes conexões persistentes enviam
+# requisições em sequência (cada uma espera a resposta da anterior) até
+# completar --requisicoes, e o relatório traz latências (p50, p90, p99,
+# máximo), vazão e o tamanho médio dos lotes formados pelo serviço.
+#
+#   python carga_servico.py --iniciar --rota dimensionamento --clientes 64
+#   python carga_servico.py --porta 8080 --rota carregamento --json
+#
+# Com --iniciar o serviço é iniciado em um subprocesso (com --max-lote,
+# --janela-ms e --processos repassados) e encerrado no fim.
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+SEMENTE = 20240501
+ROTAS = ('dimensionamento', 'parametros', 'carregamento')
+
+
+def gerar_corpos(rota, quantidade, semente=SEMENTE):
+    """
+    quantidade corpos JSON (bytes) válidos e variados para a rota.
+    """
+    rng = np.random.default_rng(semente)
+    if rota == 'dimensionamento':
+        colunas = (rng.uniform(50, 2000, quantidade).round(), rng.choice([110.0, 127.0, 220.0], quantidade),
+                   rng.choice([220.0, 380.0, 440.0], quantidade), rng.choice([50.0, 60.0], quantidade))
+        registros = [dict(zip(('W2', 'V2', 'V1', 'frequency'), linha)) for linha in zip(*(c.tolist() for c in colunas))]
+    else:
+        escala = rng.uniform(0.8, 1.2, (quantidade, 1))
+        base = np.array([240, 0.2, 35, 528, 0.757, 120, 240, 13200], dtype=float)
+        campos = ('tensao_ca', 'corrente_ca', 'potencia_ca', 'tensao_cc', 'corrente_cc', 'potencia_cc',
+                  'tensao_baixa', 'tensao_alta')
+        registros = [dict(zip(campos, linha)) for linha in (base * escala).tolist()]
+        if rota == 'carregamento':
+            for registro, fator_potencia, potencia in zip(registros, rng.uniform(-1, 1, quantidade).tolist(),
+                                                          rng.uniform(0.5, 12, quantidade).tolist()):
+                registro.update(fator_potencia=fator_potencia, potencia_carga_kVA=potencia)
+    return [json.dumps(registro).encode() for registro in registros]
+
+
+async def _conectar(host, porta, unix):
+    if unix:
+        return await asyncio.open_unix_connection(unix)
+    return await asyncio.open_connection(host, porta)
+
+
+async def _requisicao(leitor, escritor, metodo, caminho, corpo=b''):
+    escritor.write(f'{metodo} {caminho} HTTP/1.1\r\nHost: servico\r\nContent-Type: application/json\r\n'
+                   f'Content-Length: {len(corpo)}\r\n\r\n'.encode('latin-1') + corpo)
+    await escritor.drain()
+    status = int((await leitor.readline()).split()[1])
+    tamanho = 0
+    while True:
+        linha = await leitor.readline()
+        if linha in (b'\r\n', b'\n', b''):
+            break
+        nome, _, valor = linha.decode('latin-1').partition(':')
+        if nome.strip().lower() == 'content-length':
+            tamanho = int(valor)
+    return status, await leitor.readexactly(tamanho)
+
+
+async def _cliente(host, porta, unix, caminho, corpos, proximo, latencias, erros):
+    leitor, escritor = await _conectar(host, porta, unix)
+    try:
+        while True:
+            indice = next(proximo, None)
+            if indice is None:
+                return
+            inicio = time.perf_counter()
+            status, _ = await _requisicao(leitor, escritor, 'POST', caminho, corpos[indice % len(corpos)])
+            latencias.append(time.perf_counter() - inicio)
+            if status != 200:
+                erros.append(status)
+    finally:
+        escritor.close()
+
+
+async def _estatisticas_servico(host, porta, unix):
+    leitor, escritor = await _conectar(host, porta, unix)
+    try:
+        _, corpo = await _requisicao(leitor, escritor, 'GET', '/estatisticas')
+        return json.loads(corpo)
+    finally:
+        escritor.close()
+
+
+async def executar_carga(rota='dimensionamento', requisicoes=20000, clientes=64, host='127.0.0.1', porta=8080,
+                         unix=None, aquecimento=500):
+    """
+    Executa o teste e devolve o relatório (dicionário) com latências em ms,
+    vazão em requisições/s, erros e as estatísticas de lotes do serviço.
+    """
+    caminho = '/' + rota
+    corpos = gerar_corpos(rota, min(requisicoes, 10000))
+    if aquecimento:
+        await asyncio.gather(*(_cliente(host, porta, unix, caminho, corpos, iter(range(i, aquecimento, clientes)),
+                                        [], []) for i in range(min(clientes, aquecimento))))
+    antes = (await _estatisticas_servico(host, porta, unix))['rotas'][caminho]
+
+    latencias, erros = [], []
+    proximo = iter(range(requisicoes))
+    inicio = time.perf_counter()
+    await asyncio.gather(*(_cliente(host, porta, unix, caminho, corpos, proximo, latencias, erros)
+                           for _ in range(clientes)))
+    duracao = time.perf_counter() - inicio
+
+    depois = (await _estatisticas_servico(host, porta, unix))['rotas'][caminho]
+    lotes = depois['lotes'] - antes['lotes']
+    percentis = np.percentile(np.array(latencias) * 1e3, [50, 90, 99])
+    return {
+        'rota': caminho, 'requisicoes': len(latencias), 'clientes': clientes, 'duracao_s': duracao,
+        'vazao_rps': len(latencias) / duracao, 'erros': len(erros),
+        'latencia_ms': {'p50': percentis[0], 'p90': percentis[1], 'p99': percentis[2],
+                        'media': statistics.fmean(latencias) * 1e3, 'maxima': max(latencias) * 1e3},
+        'lotes': lotes, 'media_lote': (depois['itens'] - antes['itens']) / lotes if lotes else 0.0,
+    }
+
+
+def _iniciar_servico(args):
+    comando = [sys.executable, os.path.join(RAIZ, 'servico.py'), '--max-lote', str(args.max_lote),
+               '--janela-ms', str(args.janela_ms)]
+    comando += ['--unix', args.unix] if args.unix else ['--host', args.host, '--porta', str(args.porta)]
+    if args.processos is not None:
+        comando += ['--processos', str(args.processos)]
+    processo = subprocess.Popen(comando, stderr=subprocess.PIPE, text=True)
+    linha = processo.stderr.readline()  # "servindo em ..." quando o socket está pronto
+    if not linha.startswith('servindo'):
+        processo.kill()
+        raise RuntimeError(f"o serviço não iniciou: {linha}{processo.stderr.read()}")
+    return processo
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Teste de carga do serviço (latência e vazão)")
+    parser.add_argument('--rota', choices=ROTAS, default='dimensionamento')
+    parser.add_argument('--requisicoes', type=int, default=20000)
+    parser.add_argument('--clientes', type=int, default=64, help="conexões simultâneas")
+    parser.add_argument('--aquecimento', type=int, default=500, help="requisições descartadas antes da medida")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--porta', type=int, default=8080)
+    parser.add_argument('--unix', help="socket Unix do serviço")
+    parser.add_argument('--iniciar', action='store_true', help="inicia o serviço em um subprocesso")
+    parser.add_argument('--max-lote', type=int, default=256, help="(com --iniciar)")
+    parser.add_argument('--janela-ms', type=float, default=2.0, help="(com --iniciar)")
+    parser.add_argument('--processos', type=int, help="(com --iniciar)")
+    parser.add_argument('--json', action='store_true', help="relatório em JSON")
+    args = parser.parse_args(argv)
+
+    processo = _iniciar_servico(args) if args.iniciar else None
+    try:
+        relatorio = asyncio.run(executar_carga(args.rota, args.requisicoes, args.clientes, args.host, args.porta,
+                                               args.unix, args.aquecimento))
+    finally:
+        if processo is not None:
+            processo.terminate()
+            processo.wait()
+
+    if args.json:
+        print(json.dumps(relatorio, indent=2))
+    else:
+        latencia = relatorio['latencia_ms']
+        print(f"{relatorio['rota']}: {relatorio['requisicoes']} requisições, {relatorio['clientes']} clientes, "
+              f"{relatorio['duracao_s']:.2f} s")
+        print(f"vazão: {relatorio['vazao_rps']:.0f} req/s   erros: {relatorio['erros']}")
+        print(f"latência (ms): p50 {latencia['p50']:.2f}  p90 {latencia['p90']:.2f}  p99 {latencia['p99']:.2f}  "
+              f"máx {latencia['maxima']:.2f}")
+        print(f"lotes: {relatorio['lotes']} (média de {relatorio['media_lote']:.1f} itens)")
+    return 1 if relatorio['erros'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,7 +1,5 @@
 import numpy as np
-import matplotlib.pyplot as plt
 import cmath
-from matplotlib.patches import Arc
 
 class AnaliseCarregamentoTransformador:
     """
@@ -122,6 +120,9 @@ class AnaliseCarregamentoTransformador:
         Gera diagrama fasorial mostrando relações entre tensões e correntes
         sob condição de carga.
         """
+        import matplotlib.pyplot as plt
+        from matplotlib.patches import Arc
+
         tensao_sec_vazio = self.calcular_tensao_sem_carga()
         corrente_sec = self.calcular_corrente_secundaria()
         tensao_sec_carga = complex(self.tensao_secundaria_nominal, 0)
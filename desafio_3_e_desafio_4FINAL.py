@@ -1,7 +1,35 @@
 import numpy as np
-import matplotlib.pyplot as plt
 import cmath
-from matplotlib.patches import Arc
+
+from diagramas_fasoriais import DiagramaFasorial, desenhar_pyplot
+from instrumentacao import instrumentar
+
+@instrumentar('carregamento.perdas')
+def calcular_perdas(parametros, potencia_carga):
+    """
+    Perdas no cobre e no núcleo (W) para a potência de carga em VA, escalar
+    ou array, com os parâmetros referidos ao lado de baixa.
+    """
+    tensao_secundaria = parametros['tensao_baixa']
+    corrente_secundaria_modulo = potencia_carga / tensao_secundaria
+    resistencia_eq_baixa = parametros['resistencia_equivalente_alta'] / (parametros['relacao_transformacao']**2)
+    perdas_cobre = resistencia_eq_baixa * (corrente_secundaria_modulo ** 2)
+    perdas_nucleo = (tensao_secundaria ** 2) / parametros['resistencia_nucleo_baixa']
+    return perdas_cobre, perdas_nucleo
+
+def impedancia_equivalente(resistencia, reatancia):
+    """
+    R + jX para resistência e reatância numéricas (devolve complex) ou arrays
+    (com broadcast entre si). complex() só aceita escalares e R + 1j * X
+    transforma X infinita em NaN na parte real; as partes são copiadas.
+    """
+    if isinstance(resistencia, (int, float)) and isinstance(reatancia, (int, float)):
+        return complex(resistencia, reatancia)
+    resistencia, reatancia = np.broadcast_arrays(np.asarray(resistencia, dtype=float),
+                                                 np.asarray(reatancia, dtype=float))
+    impedancia = np.empty(resistencia.shape, dtype=complex)
+    impedancia.real, impedancia.imag = resistencia, reatancia
+    return impedancia
 
 class AnaliseCarregamentoTransformador:
     """
@@ -14,7 +42,7 @@ class AnaliseCarregamentoTransformador:
         self.potencia_nominal = self.parametros['potencia_nominal']
         self.tensao_primaria_nominal = self.parametros['tensao_alta']
         self.tensao_secundaria_nominal = self.parametros['tensao_baixa']
-        self.impedancia_equivalente = complex(
+        self.impedancia_equivalente = impedancia_equivalente(
             self.parametros['resistencia_equivalente_alta'],
             self.parametros['reatancia_equivalente_alta']
         )
@@ -35,32 +63,32 @@ class AnaliseCarregamentoTransformador:
             angulo = -angulo
         return cmath.rect(modulo_corrente, angulo)
     
+    @instrumentar('carregamento.tensao_sem_carga')
     def calcular_tensao_sem_carga(self):
         impedancia_eq_baixa = self.impedancia_equivalente / (self.relacao_transformacao**2)
         corrente_secundaria = self.calcular_corrente_secundaria()
         tensao_plena_carga = self.tensao_secundaria_nominal
         return tensao_plena_carga + impedancia_eq_baixa * corrente_secundaria
     
+    @instrumentar('carregamento.regulacao')
     def calcular_regulacao_tensao(self):
         tensao_sem_carga = self.calcular_tensao_sem_carga()
         tensao_plena_carga = self.tensao_secundaria_nominal
         return (abs(tensao_sem_carga) - tensao_plena_carga) / tensao_plena_carga * 100
     
+    @instrumentar('carregamento.eficiencia')
     def calcular_eficiencia(self):
         potencia_saida = self.potencia_carga * self.fator_potencia
-        corrente_secundaria_modulo = self.potencia_carga / self.tensao_secundaria_nominal
-        resistencia_eq_baixa = self.impedancia_equivalente.real / (self.relacao_transformacao**2)
-        perdas_cobre = resistencia_eq_baixa * (corrente_secundaria_modulo ** 2)
-        resistencia_nucleo_baixa = self.parametros['resistencia_nucleo_baixa']
-        perdas_nucleo = (self.tensao_secundaria_nominal ** 2) / resistencia_nucleo_baixa
+        perdas_cobre, perdas_nucleo = calcular_perdas(self.parametros, self.potencia_carga)
         potencia_entrada = potencia_saida + perdas_cobre + perdas_nucleo
         if potencia_entrada == 0:
             return 0
         return (potencia_saida / potencia_entrada) * 100
     
-    def plotar_diagrama_fasorial_regulacao(self): # Renomeado para clareza
+    @instrumentar('carregamento.diagrama_regulacao')
+    def dados_diagrama_fasorial_regulacao(self):
         """
-        Gera diagrama fasorial para REGULAÇÃO DE TENSÃO, mostrando relações 
+        Fasores do diagrama de REGULAÇÃO DE TENSÃO, mostrando relações 
         entre tensões e correntes sob condição de carga.
         Os fasores são referidos ao secundário.
         V2 (vazio) representa V1 referido ao secundário.
@@ -81,85 +109,290 @@ class AnaliseCarregamentoTransformador:
             fator_escala_corrente = 1
         fator_escala_corrente = max(1, fator_escala_corrente) # Garante que não seja menor que 1
 
-        origem = np.array([0, 0])
-        v_carga_xy = np.array([tensao_sec_carga.real, tensao_sec_carga.imag])
-        i_sec_xy_plot = np.array([corrente_sec.real * fator_escala_corrente, corrente_sec.imag * fator_escala_corrente])
-        
-        queda_r_xy = np.array([queda_resistiva.real, queda_resistiva.imag])
-        queda_x_xy = np.array([queda_indutiva.real, queda_indutiva.imag])
-        v_vazio_xy = np.array([tensao_sec_vazio.real, tensao_sec_vazio.imag])
-        
-        plt.figure(figsize=(10, 10))
-        ax = plt.gca()
-        
-        plt.quiver(*origem, *v_carga_xy, angles='xy', scale_units='xy', scale=1, color='blue', width=0.005, label=f'$V_2$ (carga) = {abs(tensao_sec_carga):.1f} V')
-        plt.quiver(*origem, *i_sec_xy_plot, angles='xy', scale_units='xy', scale=1, color='orange', width=0.005, label=f'$I_2$ (x{fator_escala_corrente:.1f}) = {abs(corrente_sec):.1f} A')
-        plt.quiver(*origem, *v_vazio_xy, angles='xy', scale_units='xy', scale=1, color='green', width=0.005, label=f'$V_1\' = V_2$ (vazio) = {abs(tensao_sec_vazio):.1f} V')
-        
-        plt.quiver(*v_carga_xy, *queda_r_xy, angles='xy', scale_units='xy', scale=1, color='red', width=0.003, label='$R_{{eq,2}} \cdot I_2$')
-        plt.quiver(*(v_carga_xy + queda_r_xy), *queda_x_xy, angles='xy', scale_units='xy', scale=1, color='purple', width=0.003, label='$jX_{{eq,2}} \cdot I_2$')
+        i_sec_plot = corrente_sec * fator_escala_corrente
+        setas = np.array([
+            [0, 0, tensao_sec_carga.real, tensao_sec_carga.imag],
+            [0, 0, i_sec_plot.real, i_sec_plot.imag],
+            [0, 0, tensao_sec_vazio.real, tensao_sec_vazio.imag],
+            [tensao_sec_carga.real, tensao_sec_carga.imag, queda_resistiva.real, queda_resistiva.imag],
+            [(tensao_sec_carga + queda_resistiva).real, (tensao_sec_carga + queda_resistiva).imag,
+             queda_indutiva.real, queda_indutiva.imag],
+        ])
+        rotulos = (
+            f'$V_2$ (carga) = {abs(tensao_sec_carga):.1f} V',
+            f'$I_2$ (x{fator_escala_corrente:.1f}) = {abs(corrente_sec):.1f} A',
+            f'$V_1\' = V_2$ (vazio) = {abs(tensao_sec_vazio):.1f} V',
+            '$R_{{eq,2}} \\cdot I_2$',
+            '$jX_{{eq,2}} \\cdot I_2$',
+        )
         
+        arco = texto = None
         if abs(corrente_sec) > 0:
             angulo_fp_rad = cmath.phase(corrente_sec)
             angulo_fp_deg = np.degrees(angulo_fp_rad)
             raio_arco = abs(tensao_sec_carga) * 0.4
             theta1, theta2 = (angulo_fp_deg, 0) if angulo_fp_deg < 0 else (0, angulo_fp_deg)
-            arco = Arc(origem, 2*raio_arco, 2*raio_arco, angle=0, theta1=theta1, theta2=theta2, color='k', linestyle='--')
-            ax.add_patch(arco)
+            arco = (raio_arco, theta1, theta2)
             angulo_texto_rad = angulo_fp_rad / 2
-            plt.text(raio_arco * np.cos(angulo_texto_rad) * 1.1, raio_arco * np.sin(angulo_texto_rad) * 1.1, f'$\\phi_{{carga}} = {abs(angulo_fp_deg):.1f}^\\circ$', fontsize=12)
+            texto = (raio_arco * np.cos(angulo_texto_rad) * 1.1, raio_arco * np.sin(angulo_texto_rad) * 1.1, f'$\\phi_{{carga}} = {abs(angulo_fp_deg):.1f}^\\circ$')
         
         limite_max_tensao = abs(tensao_sec_vazio) * 1.2
         # Ajustar limites para acomodar corrente escalada se necessário
-        lim_corrente_real_plot = abs(i_sec_xy_plot[0]) * 1.2
-        lim_corrente_imag_plot = abs(i_sec_xy_plot[1]) * 1.2
+        lim_corrente_real_plot = abs(i_sec_plot.real) * 1.2
+        lim_corrente_imag_plot = abs(i_sec_plot.imag) * 1.2
 
-        lim_x_max = max(limite_max_tensao, lim_corrente_real_plot, abs(v_vazio_xy[0])*1.1, abs(v_carga_xy[0])*1.1)
-        lim_y_max = max(limite_max_tensao, lim_corrente_imag_plot, abs(v_vazio_xy[1])*1.1, abs(v_carga_xy[1])*1.1)
+        lim_x_max = max(limite_max_tensao, lim_corrente_real_plot, abs(tensao_sec_vazio.real)*1.1, abs(tensao_sec_carga.real)*1.1)
+        lim_y_max = max(limite_max_tensao, lim_corrente_imag_plot, abs(tensao_sec_vazio.imag)*1.1, abs(tensao_sec_carga.imag)*1.1)
         
         # Garante que os limites não sejam zero se todos os valores forem zero
         lim_x_max = lim_x_max if lim_x_max > 1e-6 else 1.0
         lim_y_max = lim_y_max if lim_y_max > 1e-6 else 1.0
 
-        plt.xlim(-lim_x_max, lim_x_max)
-        plt.ylim(-lim_y_max, lim_y_max)
-
-        plt.axhline(0, color='k', linestyle='--', alpha=0.3)
-        plt.axvline(0, color='k', linestyle='--', alpha=0.3)
-        plt.grid(True, linestyle='--', alpha=0.5)
-        
         tipo_carga_str = "Indutiva" if self.tipo_fator_potencia == 'atrasado' else "Capacitiva"
-        plt.title(f'Diagrama Fasorial da Regulação de Tensão (Carga {tipo_carga_str} - FP={self.fator_potencia})')
-        plt.xlabel('Componente Real')
-        plt.ylabel('Componente Imaginária')
-        plt.legend(loc='best')
-        plt.gca().set_aspect('equal', adjustable='box')
-        return plt
+        titulo = f'Diagrama Fasorial da Regulação de Tensão (Carga {tipo_carga_str} - FP={self.fator_potencia})'
+        return DiagramaFasorial('regulacao', setas, rotulos, arco, texto, (lim_x_max, lim_y_max), titulo)
+
+    def plotar_diagrama_fasorial_regulacao(self): # Renomeado para clareza
+        """
+        Desenha o diagrama de regulação com o pyplot (ver
+        diagramas_fasoriais.RenderizadorFasorial para salvar em lote).
+        """
+        return desenhar_pyplot(self.dados_diagrama_fasorial_regulacao())
+
+# Ordem das linhas e colunas de AnaliseCarregamentoTransformadorVetorizada.calcular_jacobiano
+SAIDAS_SENSIBILIDADE = ('regulacao', 'eficiencia')
+VARIAVEIS_SENSIBILIDADE = ('resistencia_equivalente_alta', 'reatancia_equivalente_alta', 'resistencia_nucleo_baixa',
+                           'relacao_transformacao', 'potencia_carga_kVA', 'fator_potencia')
+
+class AnaliseCarregamentoTransformadorVetorizada(AnaliseCarregamentoTransformador):
+    """
+    Versão vetorizada da análise de carregamento: potencia_carga_kVA e
+    fator_potencia podem ser arrays (com broadcast entre si, por exemplo
+    kVA[:, None] e FP[None, :] para uma superfície) e os cálculos devolvem
+    arrays. O fator de potência tem sinal: positivo para carga atrasada
+    (indutiva) e negativo para carga adiantada (capacitiva).
+
+    Os valores de parametros_transformador também podem ser arrays do mesmo
+    formato das cargas (um transformador por posição, como as colunas de
+    desafio_3_e_desafio_4_batch.calcular_parametros_lote); ponto() exige
+    parâmetros escalares.
+    """
+
+    def __init__(self, parametros_transformador, fator_potencia=0.92, potencia_carga_kVA=None):
+        super().__init__(parametros_transformador)
+
+        # A carga e o fator de potência (com sinal, no lugar de
+        # tipo_fator_potencia) substituem os valores padrão da classe base
+        fator_potencia = np.asarray(fator_potencia, dtype=float)
+        if not np.all(np.abs(fator_potencia) <= 1.0):
+            raise ValueError("Fator de Potência Inválido: os valores devem estar entre -1.0 e 1.0.")
+        if potencia_carga_kVA is None:
+            potencia_carga = np.asarray(self.potencia_nominal, dtype=float)
+        else:
+            potencia_carga = np.asarray(potencia_carga_kVA, dtype=float) * 1e3
+        self.fator_potencia, self.potencia_carga = np.broadcast_arrays(fator_potencia, potencia_carga)
+        self.tipo_fator_potencia = None
+
+    def calcular_corrente_secundaria(self):
+        # I2 = |I2| (cos φ -/+ j sen φ), com cos φ = |FP|: atrasada para FP >= 0
+        modulo_corrente = self.potencia_carga / self.tensao_secundaria_nominal
+        fator_potencia = np.abs(self.fator_potencia)
+        seno = np.sqrt(1 - fator_potencia ** 2)
+        corrente = np.empty(self.fator_potencia.shape, dtype=complex)
+        corrente.real = modulo_corrente * fator_potencia
+        corrente.imag = modulo_corrente * np.where(self.fator_potencia < 0, seno, -seno)
+        return corrente
+
+    @instrumentar('carregamento.regulacao')
+    def calcular_regulacao_tensao(self):
+        tensao_sem_carga = self.calcular_tensao_sem_carga()
+        tensao_plena_carga = self.tensao_secundaria_nominal
+        return (np.abs(tensao_sem_carga) - tensao_plena_carga) / tensao_plena_carga * 100
+
+    @instrumentar('carregamento.eficiencia')
+    def calcular_eficiencia(self):
+        potencia_saida = self.potencia_carga * np.abs(self.fator_potencia)
+        perdas_cobre, perdas_nucleo = calcular_perdas(self.parametros, self.potencia_carga)
+        potencia_entrada = potencia_saida + perdas_cobre + perdas_nucleo
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(potencia_entrada == 0, 0.0, potencia_saida / potencia_entrada * 100)
+
+    @instrumentar('carregamento.jacobiano')
+    def calcular_jacobiano(self):
+        """
+        Regulação e eficiência (%) com as derivadas analíticas em relação a
+        VARIAVEIS_SENSIBILIDADE (Req e Xeq em ohms no lado de AT, Rc em ohms,
+        a, carga em kVA e FP com sinal), no mesmo passo vetorizado.
+
+        Retorna (valores, jacobiano) com formatos (..., 2) e (..., 2, 6):
+        jacobiano[..., i, j] = d SAIDAS_SENSIBILIDADE[i] / d
+        VARIAVEIS_SENSIBILIDADE[j], em % por unidade da variável. Em
+        |FP| = 1 a derivada da regulação em relação ao FP é infinita (sen φ
+        tem derivada vertical), e em FP = 0 vale a do lado atrasado.
+        """
+        resistencia = np.asarray(self.parametros['resistencia_equivalente_alta'], dtype=float)
+        reatancia = np.asarray(self.parametros['reatancia_equivalente_alta'], dtype=float)
+        resistencia_nucleo = np.asarray(self.parametros['resistencia_nucleo_baixa'], dtype=float)
+        relacao = np.asarray(self.relacao_transformacao, dtype=float)
+        tensao = np.asarray(self.tensao_secundaria_nominal, dtype=float)
+        potencia = self.potencia_carga
+        cosseno = np.abs(self.fator_potencia)
+        sinal = np.where(self.fator_potencia < 0, -1.0, 1.0)
+        seno = sinal * np.sqrt(1 - cosseno ** 2)  # sen φ com o sinal da carga (atrasada > 0)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # Regulação: E = V + (I/a²) [(R cos φ + X sen φ) + j (X cos φ - R sen φ)]
+            por_va = 1 / (tensao * relacao ** 2)
+            escala = potencia * por_va  # I/a²
+            real_por_va = por_va * (resistencia * cosseno + reatancia * seno)
+            imag_por_va = por_va * (reatancia * cosseno - resistencia * seno)
+            queda_real, queda_imag = potencia * real_por_va, potencia * imag_por_va
+            parte_real = tensao + queda_real
+            modulo = np.hypot(parte_real, queda_imag)
+            regulacao = (modulo - tensao) / tensao * 100
+
+            # d|E| = (Re(E) dRe + Im(E) dIm) / |E|, em % de V
+            fator = 100 / (tensao * modulo)
+            derivada_seno = -cosseno / np.sqrt(1 - cosseno ** 2)  # d(sen φ)/dFP
+            derivada_regulacao = lambda real, imag: fator * (parte_real * real + queda_imag * imag)
+            regulacao_derivadas = (
+                derivada_regulacao(escala * cosseno, -escala * seno),
+                derivada_regulacao(escala * seno, escala * cosseno),
+                np.zeros_like(regulacao),
+                derivada_regulacao(-2 * queda_real / relacao, -2 * queda_imag / relacao),
+                derivada_regulacao(real_por_va, imag_por_va) * 1e3,
+                sinal * derivada_regulacao(escala * resistencia, escala * reatancia)
+                + derivada_seno * derivada_regulacao(escala * reatancia, -escala * resistencia),
+            )
+
+            # Eficiência: η = Ps / (Ps + Pcu + Pfe), Ps = S |FP|
+            potencia_saida = potencia * cosseno
+            perdas_cobre, perdas_nucleo = calcular_perdas(self.parametros, potencia)
+            potencia_entrada = potencia_saida + perdas_cobre + perdas_nucleo
+            valida = potencia_entrada != 0
+            eficiencia = np.where(valida, potencia_saida / potencia_entrada * 100, 0.0)
+            fator = np.where(valida, 100 / potencia_entrada ** 2, 0.0)
+            eficiencia_derivadas = (
+                -fator * potencia_saida * (potencia / tensao) ** 2 / relacao ** 2,
+                np.zeros_like(eficiencia),
+                fator * potencia_saida * tensao ** 2 / resistencia_nucleo ** 2,
+                fator * potencia_saida * 2 * perdas_cobre / relacao,
+                fator * cosseno * (perdas_nucleo - perdas_cobre) * 1e3,
+                fator * potencia * sinal * (perdas_cobre + perdas_nucleo),
+            )
+
+        valores = np.stack(np.broadcast_arrays(regulacao, eficiencia), axis=-1)
+        linhas = [np.stack(np.broadcast_arrays(*derivadas), axis=-1)
+                  for derivadas in (regulacao_derivadas, eficiencia_derivadas)]
+        return valores, np.stack(np.broadcast_arrays(*linhas), axis=-2)
+
+    def ponto(self, *indice):
+        # Análise escalar de um ponto do lote (por exemplo para o diagrama fasorial)
+        fator_potencia = float(self.fator_potencia[indice])
+        return AnaliseCarregamentoTransformador(
+            self.parametros,
+            fator_potencia=abs(fator_potencia),
+            tipo_fator_potencia='adiantado' if fator_potencia < 0 else 'atrasado',
+            potencia_carga_kVA=float(self.potencia_carga[indice]) / 1e3
+        )
+
+    def dados_diagrama_fasorial_regulacao(self, *indice):
+        return self.ponto(*indice).dados_diagrama_fasorial_regulacao()
+
+    def plotar_diagrama_fasorial_regulacao(self, *indice):
+        return self.ponto(*indice).plotar_diagrama_fasorial_regulacao()
+
+class _Entrada:
+    # Leitura de ensaio; ao ser alterada descarta os grupos de parâmetros que dependem dela
+    def __set_name__(self, owner, nome):
+        self.nome = nome
+
+    def __get__(self, obj, tipo=None):
+        if obj is None:
+            return self
+        return obj._entradas[self.nome]
+
+    def __set__(self, obj, valor):
+        obj._entradas[self.nome] = valor
+        for grupo in obj._DEPENDENTES[self.nome]:
+            obj._cache.pop(grupo, None)
+
+class _Derivado:
+    # Parâmetro calculado sob demanda junto com os demais do seu grupo
+    def __init__(self, grupo):
+        self.grupo = grupo
+
+    def __set_name__(self, owner, nome):
+        self.nome = nome
+
+    def __get__(self, obj, tipo=None):
+        if obj is None:
+            return self
+        return obj._grupo(self.grupo)[self.nome]
+
+    def __set__(self, obj, valor):
+        raise AttributeError(f"{self.nome} é calculado a partir dos ensaios; altere as leituras")
 
 class AnaliseTransformadorMonofasico:
+    # Os parâmetros são calculados na primeira leitura e guardados por grupo.
+    # Alterar uma leitura de ensaio (ex.: transformador.potencia_cc = 130)
+    # descarta só os grupos que dependem dela: o ensaio em vazio recalcula o
+    # ramo de excitação, o ensaio em curto os parâmetros série, e as tensões
+    # nominais apenas a referência ao secundário (Rs, Xs).
+    _DEPENDENTES = {
+        'tensao_ca': ('excitacao',), 'corrente_ca': ('excitacao',), 'potencia_ca': ('excitacao',),
+        'tensao_cc': ('serie', 'secundario'), 'corrente_cc': ('serie', 'secundario'),
+        'potencia_cc': ('serie', 'secundario'),
+        'tensao_baixa': ('secundario',), 'tensao_alta': ('secundario',),
+    }
+
+    tensao_ca, corrente_ca, potencia_ca = _Entrada(), _Entrada(), _Entrada()
+    tensao_cc, corrente_cc, potencia_cc = _Entrada(), _Entrada(), _Entrada()
+    tensao_baixa, tensao_alta = _Entrada(), _Entrada()
+
+    Rc_BT, Zphi_BT_mag, Ic_BT, Xm_BT, Im_BT = (_Derivado('excitacao') for _ in range(5))
+    Req_AT, Xeq_AT, Rp_AT, Xp_AT = (_Derivado('serie') for _ in range(4))
+    Rs_BT, Xs_BT = _Derivado('secundario'), _Derivado('secundario')
+
     def __init__(self, tensao_ca, corrente_ca, potencia_ca, tensao_cc, corrente_cc, potencia_cc, 
                  tensao_baixa, tensao_alta, frequencia=60):
+        self._entradas = {}
+        self._cache = {}
         self.tensao_ca, self.corrente_ca, self.potencia_ca = tensao_ca, corrente_ca, potencia_ca
         self.tensao_cc, self.corrente_cc, self.potencia_cc = tensao_cc, corrente_cc, potencia_cc
         self.tensao_baixa, self.tensao_alta = tensao_baixa, tensao_alta
         self.frequencia = frequencia
-        self.relacao_transformacao = tensao_alta / tensao_baixa
-        self.parametros = {}
-        self.calcular_parametros()
-    
+
+    @property
+    def relacao_transformacao(self):
+        return self.tensao_alta / self.tensao_baixa
+
+    def _grupo(self, grupo):
+        valores = self._cache.get(grupo)
+        if valores is None:
+            valores = self._cache[grupo] = getattr(self, '_calcular_' + grupo)()
+        return valores
+
     def calcular_parametros(self):
+        # Recalcula todos os grupos (normalmente desnecessário: o cálculo é sob demanda)
+        self._cache.clear()
+        for grupo in ('excitacao', 'serie', 'secundario'):
+            self._grupo(grupo)
+
+    @instrumentar('monofasico.excitacao')
+    def _calcular_excitacao(self):
         # Ensaio em vazio (lado BT) - Parâmetros para DESAFIO 3
-        self.Rc_BT = (self.tensao_ca ** 2) / self.potencia_ca
+        Rc_BT = (self.tensao_ca ** 2) / self.potencia_ca
         
         # Impedância de excitação Z_phi = V_ca / I_ca (magnitude)
         # I_ca é a corrente de excitação I_phi
         if self.corrente_ca > 1e-9: # Evita divisão por zero
-            self.Zphi_BT_mag = self.tensao_ca / self.corrente_ca
+            Zphi_BT_mag = self.tensao_ca / self.corrente_ca
         else:
-            self.Zphi_BT_mag = float('inf')
+            Zphi_BT_mag = float('inf')
 
         # Corrente ativa do núcleo (Ic) e reativa (Im)
-        self.Ic_BT = self.tensao_ca / self.Rc_BT
+        Ic_BT = self.tensao_ca / Rc_BT
         
         # Cálculo de Xm_BT
         # S_ca_squared = (self.tensao_ca * self.corrente_ca)**2
@@ -173,49 +406,63 @@ class AnaliseTransformadorMonofasico:
 
         # Método alternativo para Xm_BT usando admitâncias (como no original)
         Y_ca_mag = self.corrente_ca / self.tensao_ca if self.tensao_ca > 1e-9 else 0
-        G_c_BT = 1 / self.Rc_BT if self.Rc_BT > 1e-9 else 0
+        G_c_BT = 1 / Rc_BT if Rc_BT > 1e-9 else 0
         
         if Y_ca_mag**2 - G_c_BT**2 >= 0:
             Bm_BT = np.sqrt(Y_ca_mag**2 - G_c_BT**2)
-            self.Xm_BT = 1 / Bm_BT if Bm_BT > 1e-9 else float('inf')
+            Xm_BT = 1 / Bm_BT if Bm_BT > 1e-9 else float('inf')
         else:
             # Pode acontecer devido a imprecisões de medição ou se Pca for muito próximo de Sca
             # print(f"Aviso: Y_ca_mag^2 ({Y_ca_mag**2:.4g}) < G_c_BT^2 ({G_c_BT**2:.4g}). Xm_BT será muito alto/infinito.")
             # Neste caso, Im seria muito pequeno. Se P_ca = V_ca*I_ca (FP=1 no vazio, irreal), então Q_ca=0, Xm=inf.
             # Se I_c^2 + I_m^2 = I_phi^2, então I_m = sqrt(I_phi^2 - I_c^2)
-            if self.corrente_ca**2 >= self.Ic_BT**2:
-                 Im_BT_calc = np.sqrt(self.corrente_ca**2 - self.Ic_BT**2)
-                 self.Xm_BT = self.tensao_ca / Im_BT_calc if Im_BT_calc > 1e-9 else float('inf')
+            if self.corrente_ca**2 >= Ic_BT**2:
+                 Im_BT_calc = np.sqrt(self.corrente_ca**2 - Ic_BT**2)
+                 Xm_BT = self.tensao_ca / Im_BT_calc if Im_BT_calc > 1e-9 else float('inf')
             else:
-                # print(f"Aviso: Ic_BT ({self.Ic_BT:.4g}A) > I_phi ({self.corrente_ca:.4g}A). Impossível calcular Im e Xm_BT desta forma.")
-                self.Xm_BT = float('inf') # Definir Xm como infinito se Im não puder ser calculado
+                # print(f"Aviso: Ic_BT ({Ic_BT:.4g}A) > I_phi ({self.corrente_ca:.4g}A). Impossível calcular Im e Xm_BT desta forma.")
+                Xm_BT = float('inf') # Definir Xm como infinito se Im não puder ser calculado
 
 
-        self.Im_BT = self.tensao_ca / self.Xm_BT if self.Xm_BT > 1e-9 and self.Xm_BT != float('inf') else 0
+        Im_BT = self.tensao_ca / Xm_BT if Xm_BT > 1e-9 and Xm_BT != float('inf') else 0
 
+        return {'Rc_BT': Rc_BT, 'Zphi_BT_mag': Zphi_BT_mag, 'Ic_BT': Ic_BT, 'Xm_BT': Xm_BT, 'Im_BT': Im_BT}
 
+    @instrumentar('monofasico.serie')
+    def _calcular_serie(self):
         # Ensaio em curto (lado AT) - Parâmetros para DESAFIO 4
-        self.Req_AT = self.potencia_cc / (self.corrente_cc ** 2)
+        Req_AT = self.potencia_cc / (self.corrente_cc ** 2)
         Z_cc_mag = self.tensao_cc / self.corrente_cc
         
-        if Z_cc_mag**2 - self.Req_AT**2 < 0:
-            # print(f"Aviso: Z_cc_mag^2 ({Z_cc_mag**2:.4g}) < Req_AT^2 ({self.Req_AT**2:.4g}). Xeq_AT será zero.")
-            self.Xeq_AT = 0
+        if Z_cc_mag**2 - Req_AT**2 < 0:
+            # print(f"Aviso: Z_cc_mag^2 ({Z_cc_mag**2:.4g}) < Req_AT^2 ({Req_AT**2:.4g}). Xeq_AT será zero.")
+            Xeq_AT = 0
         else:
-            self.Xeq_AT = np.sqrt(Z_cc_mag**2 - self.Req_AT**2)
+            Xeq_AT = np.sqrt(Z_cc_mag**2 - Req_AT**2)
         
         # Parâmetros DESAFIO 4: Rp, Xp, Rs, Xs
         # Assumindo que o primário é o lado de Alta Tensão (AT) e o secundário é Baixa Tensão (BT)
         # E que R1 = R2' e X1 = X2' (aproximação comum onde R1 é Rp, R2' é Rs referido ao primário)
-        self.Rp_AT = self.Req_AT / 2  # Resistência do primário (AT)
-        self.Xp_AT = self.Xeq_AT / 2  # Reatância do primário (AT)
-        
-        # Resistência do secundário (BT)
-        self.Rs_BT = (self.Req_AT / 2) / (self.relacao_transformacao**2)
-        # Reatância do secundário (BT)
-        self.Xs_BT = (self.Xeq_AT / 2) / (self.relacao_transformacao**2)
+        return {
+            'Req_AT': Req_AT,
+            'Xeq_AT': Xeq_AT,
+            'Rp_AT': Req_AT / 2,  # Resistência do primário (AT)
+            'Xp_AT': Xeq_AT / 2,  # Reatância do primário (AT)
+        }
+
+    @instrumentar('monofasico.secundario')
+    def _calcular_secundario(self):
+        return {
+            # Resistência do secundário (BT)
+            'Rs_BT': (self.Req_AT / 2) / (self.relacao_transformacao**2),
+            # Reatância do secundário (BT)
+            'Xs_BT': (self.Xeq_AT / 2) / (self.relacao_transformacao**2),
+        }
 
-        self.parametros = {
+    @property
+    def parametros(self):
+        # Novo dicionário a cada leitura, com os valores atuais
+        return {
             'resistencia_nucleo_baixa': self.Rc_BT,          # Rc (BT)
             'reatancia_magnetizacao_baixa': self.Xm_BT,    # Xm (BT)
             'impedancia_excitacao_baixa_mag': self.Zphi_BT_mag, # Zphi (BT) - magnitude
@@ -284,20 +531,17 @@ class AnaliseTransformadorMonofasico:
         print(f"Potência nominal aparente estimada (Sn_estimada): {params['potencia_nominal']/1000:.2f} kVA (Baseada em V_alta * I_cc)")
 
 
-    def plotar_diagrama_fasorial_excitacao(self):
+    @instrumentar('monofasico.diagrama_excitacao')
+    def dados_diagrama_fasorial_excitacao(self):
         """
-        Gera diagrama fasorial da corrente de excitação (ensaio em vazio).
+        Fasores do diagrama da corrente de excitação (ensaio em vazio).
         Todos os valores são do lado de baixa tensão (BT).
         """
-        origem = np.array([0,0]) # Definindo a origem aqui
         V_ca_fasor = complex(self.tensao_ca, 0)
         
         Ic_fasor = complex(self.Ic_BT, 0) # Em fase com V_ca
         Im_fasor = complex(0, -self.Im_BT) # 90 graus atrasada em relação a V_ca (indutivo)
         
-        # Corrente total de excitação (Iphi) calculada
-        Iphi_calculada_fasor = Ic_fasor + Im_fasor
-        
         # Usar a corrente medida no ensaio e seu ângulo para Iphi_plotar
         fator_potencia_ca = self.potencia_ca / (self.tensao_ca * self.corrente_ca) if (self.tensao_ca * self.corrente_ca) > 0 else 0
         fator_potencia_ca = max(-1.0, min(1.0, fator_potencia_ca)) # Garante que o FP esteja no intervalo válido
@@ -317,25 +561,22 @@ class AnaliseTransformadorMonofasico:
         Ic_xy_plot = np.array([Ic_fasor.real * fator_escala, Ic_fasor.imag * fator_escala])
         Im_xy_plot = np.array([Im_fasor.real * fator_escala, Im_fasor.imag * fator_escala])
         Iphi_xy_plot = np.array([Iphi_plotar_fasor.real * fator_escala, Iphi_plotar_fasor.imag * fator_escala])
-        
-        plt.figure(figsize=(8, 8))
-        ax = plt.gca()
-        
-        plt.quiver(*origem, *V_ref_xy, angles='xy', scale_units='xy', scale=1, color='blue', width=0.005, label=f'$V_{{ca}}$ = {self.tensao_ca:.1f} V (Referência)')
-        plt.quiver(*origem, *Ic_xy_plot, angles='xy', scale_units='xy', scale=1, color='red', width=0.003, label=f'$I_c$ (ativa) (x{fator_escala:.1f}) = {abs(Ic_fasor):.3f} A')
-        plt.quiver(*origem, *Im_xy_plot, angles='xy', scale_units='xy', scale=1, color='purple', width=0.003, label=f'$I_m$ (reativa) (x{fator_escala:.1f}) = {abs(Im_fasor):.3f} A')
-        plt.quiver(*origem, *Iphi_xy_plot, angles='xy', scale_units='xy', scale=1, color='green', width=0.005, label=f'$I_{{\phi}}$ (medida) (x{fator_escala:.1f}) = {abs(Iphi_plotar_fasor):.3f} A')
+        setas = np.array([[0, 0, *V_ref_xy], [0, 0, *Ic_xy_plot], [0, 0, *Im_xy_plot], [0, 0, *Iphi_xy_plot]])
+        rotulos = (
+            f'$V_{{ca}}$ = {self.tensao_ca:.1f} V (Referência)',
+            f'$I_c$ (ativa) (x{fator_escala:.1f}) = {abs(Ic_fasor):.3f} A',
+            f'$I_m$ (reativa) (x{fator_escala:.1f}) = {abs(Im_fasor):.3f} A',
+            f'$I_{{\\phi}}$ (medida) (x{fator_escala:.1f}) = {abs(Iphi_plotar_fasor):.3f} A',
+        )
         
         angulo_phi0_deg = np.degrees(angulo_phi_ca_rad)
         raio_arco_phi0 = abs(V_ca_fasor) * 0.25
         
         theta1_phi0, theta2_phi0 = (angulo_phi0_deg, 0) if angulo_phi0_deg < 0 else (0, angulo_phi0_deg)
-        arco_phi0 = Arc(origem, 2*raio_arco_phi0, 2*raio_arco_phi0, angle=0, theta1=theta1_phi0, theta2=theta2_phi0, color='k', linestyle='--')
-        ax.add_patch(arco_phi0)
         angulo_texto_rad_phi0 = angulo_phi_ca_rad / 2
-        plt.text(raio_arco_phi0 * np.cos(angulo_texto_rad_phi0) * 1.1, 
+        texto = (raio_arco_phi0 * np.cos(angulo_texto_rad_phi0) * 1.1, 
                  raio_arco_phi0 * np.sin(angulo_texto_rad_phi0) * 1.1 - (0.05 * abs(V_ca_fasor)), 
-                 f'$\\phi_0 = {abs(angulo_phi0_deg):.1f}^\\circ$', fontsize=12)
+                 f'$\\phi_0 = {abs(angulo_phi0_deg):.1f}^\\circ$')
 
         lim_tensao_real = abs(V_ref_xy[0]) * 1.2
         lim_tensao_imag = abs(V_ref_xy[1]) * 1.2 # Embora V_ref_xy[1] seja 0, para generalizar
@@ -354,18 +595,15 @@ class AnaliseTransformadorMonofasico:
         if lim_y < 0.1 * lim_x and lim_x > 1e-6 : lim_y = 0.5 * lim_x
         if lim_x < 0.1 * lim_y and lim_y > 1e-6 : lim_x = 0.5 * lim_y
 
+        return DiagramaFasorial('excitacao', setas, rotulos, (raio_arco_phi0, theta1_phi0, theta2_phi0), texto,
+                                (lim_x, lim_y), 'Diagrama Fasorial da Corrente de Excitação (Ensaio em Vazio)')
 
-        plt.xlim(-lim_x, lim_x)
-        plt.ylim(-lim_y, lim_y)
-        plt.axhline(0, color='k', linestyle='--', alpha=0.3)
-        plt.axvline(0, color='k', linestyle='--', alpha=0.3)
-        plt.grid(True, linestyle='--', alpha=0.5)
-        plt.title('Diagrama Fasorial da Corrente de Excitação (Ensaio em Vazio)')
-        plt.xlabel('Componente Real')
-        plt.ylabel('Componente Imaginária')
-        plt.legend(loc='best')
-        plt.gca().set_aspect('equal', adjustable='box')
-        return plt
+    def plotar_diagrama_fasorial_excitacao(self):
+        """
+        Desenha o diagrama da corrente de excitação com o pyplot (ver
+        diagramas_fasoriais.RenderizadorFasorial para salvar em lote).
+        """
+        return desenhar_pyplot(self.dados_diagrama_fasorial_excitacao())
 
 def main():
     print("\n=== DESAFIO 3 & 4: Determinação de Parâmetros e Análise ===")
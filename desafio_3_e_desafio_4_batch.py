@@ -0,0 +1,132 @@
+import os
+
+import numpy as np
+
+from instrumentacao import instrumentar
+
+# Extração em lote dos parâmetros do circuito equivalente a partir dos
+# ensaios em vazio e em curto, reproduzindo
+# AnaliseTransformadorMonofasico.calcular_parametros com arrays: cada ramo
+# if/else do cálculo escalar vira uma máscara, e os registros que caem nos
+# tratamentos especiais são marcados no campo 'flags'.
+
+COLUNAS_ENSAIO = ('tensao_ca', 'corrente_ca', 'potencia_ca', 'tensao_cc', 'corrente_cc', 'potencia_cc',
+                  'tensao_baixa', 'tensao_alta')
+
+# Bits do campo 'flags'
+FLAG_ENTRADA_INVALIDA = 1   # leitura não finita, nula ou negativa
+FLAG_ZPHI_INFINITA = 2      # corrente em vazio <= 1e-9: Zphi = inf
+FLAG_XM_ALTERNATIVO = 4     # |Y|² < G²: Xm pela corrente reativa Iphi² - Ic²
+FLAG_XM_INFINITA = 8        # Xm = inf (Im = 0)
+FLAG_XEQ_NULA = 16          # |Zcc|² < Req²: Xeq = 0
+FLAGS_INCONSISTENTE = FLAG_ENTRADA_INVALIDA | FLAG_XM_ALTERNATIVO | FLAG_XEQ_NULA
+
+# Mesmos nomes e ordem do dicionário parametros
+PARAMETROS_DTYPE = np.dtype([
+    ('resistencia_nucleo_baixa', 'f8'),
+    ('reatancia_magnetizacao_baixa', 'f8'),
+    ('impedancia_excitacao_baixa_mag', 'f8'),
+    ('corrente_nucleo_ativa_baixa', 'f8'),
+    ('corrente_magnetizacao_reativa_baixa', 'f8'),
+    ('resistencia_equivalente_alta', 'f8'),
+    ('reatancia_equivalente_alta', 'f8'),
+    ('resistencia_primario_alta', 'f8'),
+    ('reatancia_primario_alta', 'f8'),
+    ('resistencia_secundario_baixa', 'f8'),
+    ('reatancia_secundario_baixa', 'f8'),
+    ('relacao_transformacao', 'f8'),
+    ('tensao_baixa', 'f8'),
+    ('tensao_alta', 'f8'),
+    ('potencia_nominal', 'f8'),
+    ('flags', 'u1'),
+])
+
+
+@instrumentar('lote.ler_ensaios')
+def ler_ensaios(caminho):
+    """
+    Lê as colunas de COLUNAS_ENSAIO de um CSV ou Parquet (pela extensão) e
+    devolve um dicionário coluna -> array.
+    """
+    import pandas as pd
+
+    if os.fspath(caminho).endswith('.parquet'):
+        tabela = pd.read_parquet(caminho, columns=list(COLUNAS_ENSAIO))
+    else:
+        tabela = pd.read_csv(caminho, usecols=list(COLUNAS_ENSAIO))
+    return {coluna: tabela[coluna].to_numpy(dtype=float) for coluna in COLUNAS_ENSAIO}
+
+
+@instrumentar('lote.parametros')
+def calcular_parametros_lote(ensaios):
+    """
+    Parâmetros de todos os registros de uma vez. ensaios é um caminho (CSV ou
+    Parquet) ou qualquer objeto indexável pelos nomes de COLUNAS_ENSAIO
+    (dicionário de arrays, array estruturado, DataFrame).
+
+    Retorna um array estruturado (PARAMETROS_DTYPE), uma linha por registro,
+    com os mesmos valores do cálculo escalar e o campo 'flags'; registros com
+    flags & FLAGS_INCONSISTENTE merecem revisão.
+    """
+    if isinstance(ensaios, (str, os.PathLike)):
+        ensaios = ler_ensaios(ensaios)
+    V_ca, I_ca, P_ca, V_cc, I_cc, P_cc, V_baixa, V_alta = np.broadcast_arrays(
+        *(np.asarray(ensaios[coluna], dtype=float) for coluna in COLUNAS_ENSAIO))
+
+    resultado = np.zeros(V_ca.shape, dtype=PARAMETROS_DTYPE)
+    flags = np.zeros(V_ca.shape, dtype=np.uint8)
+    leituras = np.stack([V_ca, I_ca, P_ca, V_cc, I_cc, P_cc, V_baixa, V_alta])
+    flags[~np.all(np.isfinite(leituras) & (leituras > 0), axis=0)] |= FLAG_ENTRADA_INVALIDA
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        a = V_alta / V_baixa
+
+        # Ensaio em vazio (lado BT)
+        Rc = V_ca ** 2 / P_ca
+        zphi_infinita = ~(I_ca > 1e-9)
+        Zphi = np.where(zphi_infinita, np.inf, V_ca / I_ca)
+        Ic = V_ca / Rc
+
+        Y = np.where(V_ca > 1e-9, I_ca / V_ca, 0.0)
+        G = np.where(Rc > 1e-9, 1 / Rc, 0.0)
+        diferenca = Y ** 2 - G ** 2
+        alternativo = ~(diferenca >= 0)
+        Bm = np.sqrt(np.where(alternativo, 0.0, diferenca))
+        Xm_admitancia = np.where(Bm > 1e-9, 1 / Bm, np.inf)
+        # Caminho alternativo: Im = sqrt(Iphi² - Ic²) quando possível
+        quadrado_Im = I_ca ** 2 - Ic ** 2
+        Im_calc = np.sqrt(np.where(quadrado_Im >= 0, quadrado_Im, 0.0))
+        Xm_corrente = np.where((quadrado_Im >= 0) & (Im_calc > 1e-9), V_ca / Im_calc, np.inf)
+        Xm = np.where(alternativo, Xm_corrente, Xm_admitancia)
+        xm_infinita = ~((Xm > 1e-9) & (Xm != np.inf))
+        Im = np.where(xm_infinita, 0.0, V_ca / Xm)
+
+        # Ensaio em curto (lado AT)
+        Req = P_cc / I_cc ** 2
+        Z_cc = V_cc / I_cc
+        diferenca_cc = Z_cc ** 2 - Req ** 2
+        xeq_nula = diferenca_cc < 0
+        Xeq = np.where(xeq_nula, 0.0, np.sqrt(np.where(xeq_nula, 0.0, diferenca_cc)))
+
+        resultado['resistencia_nucleo_baixa'] = Rc
+        resultado['reatancia_magnetizacao_baixa'] = Xm
+        resultado['impedancia_excitacao_baixa_mag'] = Zphi
+        resultado['corrente_nucleo_ativa_baixa'] = Ic
+        resultado['corrente_magnetizacao_reativa_baixa'] = Im
+        resultado['resistencia_equivalente_alta'] = Req
+        resultado['reatancia_equivalente_alta'] = Xeq
+        resultado['resistencia_primario_alta'] = Req / 2
+        resultado['reatancia_primario_alta'] = Xeq / 2
+        resultado['resistencia_secundario_baixa'] = (Req / 2) / a ** 2
+        resultado['reatancia_secundario_baixa'] = (Xeq / 2) / a ** 2
+        resultado['relacao_transformacao'] = a
+        resultado['tensao_baixa'] = V_baixa
+        resultado['tensao_alta'] = V_alta
+        resultado['potencia_nominal'] = V_alta * I_cc
+
+    flags[zphi_infinita] |= FLAG_ZPHI_INFINITA
+    flags[alternativo] |= FLAG_XM_ALTERNATIVO
+    flags[xm_infinita] |= FLAG_XM_INFINITA
+    flags[xeq_nula] |= FLAG_XEQ_NULA
+    resultado['flags'] = flags
+    return resultado
@@ -0,0 +1,213 @@
+import io
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.util import Finalize
+from typing import NamedTuple
+
+import numpy as np
+
+from instrumentacao import etapa, instrumentar
+
+# Desenho dos diagramas fasoriais separado do cálculo dos fasores.
+#
+# As classes de análise (AnaliseCarregamentoTransformador,
+# AnaliseTransformadorMonofasico) devolvem um DiagramaFasorial só com números
+# e textos; este módulo desenha. Para lotes grandes, RenderizadorFasorial
+# mantém uma figura Agg por tipo de diagrama, criada uma vez, e a cada
+# diagrama só atualiza setas, arco, textos e limites antes de salvar em PNG
+# ou SVG. Nada passa pelo estado global do pyplot, então nenhuma figura fica
+# aberta. O matplotlib só é importado ao desenhar.
+
+DEFAULT_DPI = 100
+DEFAULT_POR_TAREFA = 64
+
+
+class DiagramaFasorial(NamedTuple):
+    tipo: str                # 'regulacao' ou 'excitacao'
+    setas: np.ndarray        # (n, 4): x, y da origem e dx, dy de cada fasor
+    rotulos: tuple           # legenda de cada seta
+    arco: tuple              # (raio, theta1, theta2) em graus, ou None
+    texto: tuple             # (x, y, texto) do ângulo, ou None
+    limites: tuple           # (lim_x, lim_y): eixos em [-lim, lim]
+    titulo: str
+
+
+# Aparência fixa de cada tipo: tamanho da figura, cor e largura das setas
+_ESTILOS = {
+    'regulacao': ((10, 10), ('blue', 'orange', 'green', 'red', 'purple'), (0.005, 0.005, 0.005, 0.003, 0.003)),
+    'excitacao': ((8, 8), ('blue', 'red', 'purple', 'green'), (0.005, 0.003, 0.003, 0.005)),
+}
+
+
+class _Modelo:
+    # Artistas de um tipo de diagrama em um Axes, criados uma vez e atualizados por diagrama
+
+    def __init__(self, ax, tipo):
+        from matplotlib.patches import Arc
+
+        _, cores, larguras = _ESTILOS[tipo]
+        self.ax = ax
+        self.setas = [ax.quiver(0, 0, 1, 0, angles='xy', scale_units='xy', scale=1, color=cor, width=largura,
+                                label=' ')
+                      for cor, largura in zip(cores, larguras)]
+        self.arco = ax.add_patch(Arc((0, 0), 1, 1, angle=0, theta1=0, theta2=1, color='k', linestyle='--'))
+        self.texto = ax.text(0, 0, '', fontsize=12)
+        ax.axhline(0, color='k', linestyle='--', alpha=0.3)
+        ax.axvline(0, color='k', linestyle='--', alpha=0.3)
+        ax.grid(True, linestyle='--', alpha=0.5)
+        ax.set_xlabel('Componente Real')
+        ax.set_ylabel('Componente Imaginária')
+        ax.set_aspect('equal', adjustable='box')
+        self.legenda = ax.legend(loc='best')
+
+    def atualizar(self, diagrama):
+        for seta, (x, y, dx, dy), rotulo, texto_legenda in zip(self.setas, diagrama.setas, diagrama.rotulos,
+                                                                self.legenda.get_texts()):
+            seta.set_offsets([[x, y]])
+            seta.set_UVC(dx, dy)
+            seta.set_label(rotulo)
+            texto_legenda.set_text(rotulo)
+
+        self.arco.set_visible(diagrama.arco is not None)
+        if diagrama.arco is not None:
+            raio, theta1, theta2 = diagrama.arco
+            self.arco.set_width(2 * raio)
+            self.arco.set_height(2 * raio)
+            self.arco.theta1, self.arco.theta2 = theta1, theta2
+            self.arco.stale = True
+        self.texto.set_visible(diagrama.texto is not None)
+        if diagrama.texto is not None:
+            x, y, texto = diagrama.texto
+            self.texto.set_position((x, y))
+            self.texto.set_text(texto)
+
+        lim_x, lim_y = diagrama.limites
+        self.ax.set_xlim(-lim_x, lim_x)
+        self.ax.set_ylim(-lim_y, lim_y)
+        self.ax.set_title(diagrama.titulo)
+
+
+@instrumentar('diagrama.pyplot')
+def desenhar_pyplot(diagrama):
+    """
+    Desenha o diagrama em uma nova figura do pyplot e devolve o módulo
+    pyplot (uso interativo, como em plt.show()).
+    """
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=_ESTILOS[diagrama.tipo][0])
+    _Modelo(plt.gca(), diagrama.tipo).atualizar(diagrama)
+    return plt
+
+
+class RenderizadorFasorial:
+    """
+    Renderiza diagramas fasoriais em figuras Agg reaproveitadas: uma figura
+    por tipo, criada no primeiro diagrama daquele tipo. Use como gerenciador
+    de contexto (ou chame fechar()) para liberar as figuras.
+    """
+
+    def __init__(self, dpi=DEFAULT_DPI):
+        self.dpi = dpi
+        self._modelos = {}  # tipo -> (Figure, _Modelo)
+
+    def figura(self, diagrama):
+        # Figura do tipo do diagrama, já atualizada com ele
+        modelo = self._modelos.get(diagrama.tipo)
+        if modelo is None:
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            from matplotlib.figure import Figure
+
+            figura = Figure(figsize=_ESTILOS[diagrama.tipo][0], dpi=self.dpi)
+            FigureCanvasAgg(figura)
+            modelo = self._modelos[diagrama.tipo] = (figura, _Modelo(figura.add_subplot(), diagrama.tipo))
+        modelo[1].atualizar(diagrama)
+        return modelo[0]
+
+    def salvar(self, diagrama, destino=None, formato='png'):
+        """
+        Salva o diagrama em destino (caminho ou arquivo binário aberto) no
+        formato 'png' ou 'svg'. Sem destino devolve os bytes da imagem.
+        """
+        with etapa('diagrama.atualizar'):
+            figura = self.figura(diagrama)
+        with etapa('diagrama.savefig'):
+            if destino is None:
+                buffer = io.BytesIO()
+                figura.savefig(buffer, format=formato)
+                return buffer.getvalue()
+            figura.savefig(destino, format=formato)
+        return None
+
+    def fechar(self):
+        for figura, _ in self._modelos.values():
+            figura.clear()
+        self._modelos.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.fechar()
+
+
+_renderizador_processo = None
+
+
+def _inicializar_processo(dpi):
+    global _renderizador_processo
+    _renderizador_processo = RenderizadorFasorial(dpi)
+    # Os trabalhadores saem com os._exit e não rodam atexit; os finalizadores
+    # do multiprocessing rodam ao fim do processo e liberam as figuras
+    Finalize(_renderizador_processo, _renderizador_processo.fechar, exitpriority=0)
+
+
+def _renderizar(renderizador, tarefa, formato):
+    return [renderizador.salvar(diagrama, destino, formato) for diagrama, destino in tarefa]
+
+
+def _renderizar_no_processo(tarefa, formato):
+    return _renderizar(_renderizador_processo, tarefa, formato)
+
+
+def renderizar_lote(diagramas, destinos=None, formato='png', processes=None, por_tarefa=DEFAULT_POR_TAREFA,
+                    dpi=DEFAULT_DPI):
+    """
+    Renderiza uma sequência de DiagramaFasorial em um pool de processos, cada
+    processo com seu próprio RenderizadorFasorial. destinos é uma sequência
+    de caminhos (um por diagrama); sem destinos devolve a lista de bytes de
+    cada imagem, na ordem dos diagramas. processes=None usa um processo por
+    núcleo; processes=1 renderiza no processo atual.
+    """
+    diagramas = list(diagramas)
+    em_memoria = destinos is None
+    if em_memoria:
+        destinos = [None] * len(diagramas)
+    else:
+        destinos = [os.fspath(destino) for destino in destinos]
+        if len(destinos) != len(diagramas):
+            raise ValueError("destinos deve ter um caminho por diagrama")
+    itens = list(zip(diagramas, destinos))
+    tarefas = [itens[i:i + por_tarefa] for i in range(0, len(itens), por_tarefa)]
+
+    if processes is None:
+        processes = os.cpu_count() or 1
+    imagens = []
+    if processes == 1 or len(tarefas) <= 1:
+        with RenderizadorFasorial(dpi) as renderizador:
+            for tarefa in tarefas:
+                imagens.extend(_renderizar(renderizador, tarefa, formato))
+    else:
+        # No máximo duas tarefas por processo em andamento: as imagens voltam em ordem
+        with ProcessPoolExecutor(max_workers=processes, initializer=_inicializar_processo,
+                                 initargs=(dpi,)) as executor:
+            pendentes = deque()
+            for tarefa in tarefas:
+                if len(pendentes) >= 2 * processes:
+                    imagens.extend(pendentes.popleft().result())
+                pendentes.append(executor.submit(_renderizar_no_processo, tarefa, formato))
+            while pendentes:
+                imagens.extend(pendentes.popleft().result())
+
+    return imagens if em_memoria else None
@@ -0,0 +1,218 @@
+import os
+import warnings
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from desafio_3_e_desafio_4_batch import (COLUNAS_ENSAIO, FLAG_ENTRADA_INVALIDA, FLAG_XEQ_NULA, FLAG_XM_ALTERNATIVO,
+                                         FLAG_XM_INFINITA, calcular_parametros_lote, ler_ensaios)
+from instrumentacao import instrumentar
+
+# Propagação por Monte Carlo do erro dos instrumentos dos ensaios em vazio e
+# em curto para os parâmetros do circuito equivalente.
+#
+# Cada leitura (tensão, corrente e potência dos dois ensaios) é sorteada em
+# torno do valor registrado com erro limitado pela classe de exatidão do
+# instrumento, em % da leitura: uniforme em ±classe (padrão) ou normal com o
+# mesmo desvio padrão (classe/√3). As tensões nominais não são medidas e não
+# variam. Todas as amostras passam de uma vez por calcular_parametros_lote,
+# então os tratamentos especiais (Xm pelo caminho alternativo ou infinita)
+# aparecem nas amostras exatamente como no cálculo escalar.
+#
+# As amostras de cada registro são divididas em blocos de amostras_bloco, e
+# cada bloco tem o próprio gerador, filho de SeedSequence(semente).spawn():
+# o resultado depende só da semente e de amostras_bloco, não do número de
+# processos nem da ordem de execução.
+
+LEITURAS = COLUNAS_ENSAIO[:6]
+
+# Classe de exatidão (% da leitura) por grandeza; chaves de LEITURAS
+# (p. ex. 'corrente_ca') sobrepõem a da grandeza só para aquela leitura
+CLASSES_PADRAO = {'tensao': 0.5, 'corrente': 0.5, 'potencia': 1.0}
+DISTRIBUICOES = ('uniforme', 'normal')
+
+PARAMETROS_INCERTEZA = ('resistencia_nucleo_baixa', 'reatancia_magnetizacao_baixa', 'impedancia_excitacao_baixa_mag',
+                        'resistencia_equivalente_alta', 'reatancia_equivalente_alta')
+
+DEFAULT_AMOSTRAS_BLOCO = 1 << 16
+DEFAULT_MAX_ELEMENTOS = 1 << 22
+
+# Estatísticas das amostras finitas de um parâmetro
+ESTATISTICAS_DTYPE = np.dtype([
+    ('nominal', 'f8'),      # valor com as leituras registradas
+    ('media', 'f8'),
+    ('desvio', 'f8'),
+    ('inferior', 'f8'),     # limites do intervalo de confiança (quantis)
+    ('superior', 'f8'),
+    ('finitas', 'f8'),      # fração das amostras com valor finito
+])
+
+INCERTEZA_DTYPE = np.dtype([(nome, ESTATISTICAS_DTYPE) for nome in PARAMETROS_INCERTEZA] + [
+    ('fracao_xm_infinita', 'f8'),
+    ('fracao_xm_alternativo', 'f8'),
+    ('fracao_xeq_nula', 'f8'),
+    ('fracao_entrada_invalida', 'f8'),
+    ('amostras', 'i8'),
+])
+
+_FLAGS_CONTADAS = (FLAG_XM_INFINITA, FLAG_XM_ALTERNATIVO, FLAG_XEQ_NULA, FLAG_ENTRADA_INVALIDA)
+
+
+def classes_leituras(classes=None):
+    """
+    Meia largura do erro (fração da leitura) de cada uma das LEITURAS.
+    """
+    classes = {**CLASSES_PADRAO, **(classes or {})}
+    desconhecidas = set(classes) - set(CLASSES_PADRAO) - set(LEITURAS)
+    if desconhecidas:
+        raise ValueError(f"classes de exatidão desconhecidas: {', '.join(sorted(desconhecidas))}")
+    limites = np.array([classes.get(leitura, classes[leitura.split('_')[0]]) for leitura in LEITURAS], dtype=float)
+    if not np.all((limites >= 0) & (limites < 100)):
+        raise ValueError("As classes de exatidão devem estar entre 0 e 100 (% da leitura).")
+    return limites / 100
+
+
+def _amostrar(leituras, limites, distribuicao, sementes, tamanho):
+    # (6, registros, tamanho) leituras sorteadas, um gerador por registro
+    erros = np.empty((len(LEITURAS), len(sementes), tamanho))
+    for registro, semente in enumerate(sementes):
+        rng = np.random.default_rng(semente)
+        if distribuicao == 'uniforme':
+            erros[:, registro] = rng.uniform(-1.0, 1.0, (len(LEITURAS), tamanho))
+        else:
+            erros[:, registro] = rng.standard_normal((len(LEITURAS), tamanho)) / np.sqrt(3)
+    erros *= limites[:, None, None]
+    erros += 1.0
+    erros *= leituras[:len(LEITURAS), :, None]
+    return erros
+
+
+def _tarefa(tarefa, leituras, limites, distribuicao):
+    inicio, fim, sementes, tamanho = tarefa
+    amostras = _amostrar(leituras[:, inicio:fim], limites, distribuicao, sementes, tamanho)
+    ensaios = dict(zip(LEITURAS, amostras))
+    ensaios['tensao_baixa'] = leituras[6, inicio:fim, None]
+    ensaios['tensao_alta'] = leituras[7, inicio:fim, None]
+    parametros = calcular_parametros_lote(ensaios)
+    valores = np.stack([parametros[nome] for nome in PARAMETROS_INCERTEZA])
+    contagens = np.stack([np.count_nonzero(parametros['flags'] & flag, axis=-1) for flag in _FLAGS_CONTADAS])
+    return valores, contagens
+
+
+_dados_processo = None
+
+
+def _inicializar_processo(leituras, limites, distribuicao):
+    global _dados_processo
+    _dados_processo = (leituras, limites, distribuicao)
+
+
+def _tarefa_no_processo(tarefa):
+    return _tarefa(tarefa, *_dados_processo)
+
+
+def _tarefas(registros, amostras, amostras_bloco, max_elementos, semente):
+    # Grupos de registros cujas amostras cabem em max_elementos; cada grupo
+    # é dividido em blocos de amostras, o último bloco do grupo o fecha
+    sementes = np.random.SeedSequence(semente).spawn(registros)
+    blocos = -(-amostras // amostras_bloco)
+    altura = max(1, max_elementos // (amostras * len(PARAMETROS_INCERTEZA)))
+    for inicio in range(0, registros, altura):
+        fim = min(inicio + altura, registros)
+        filhos = [semente_registro.spawn(blocos) for semente_registro in sementes[inicio:fim]]
+        for bloco in range(blocos):
+            tamanho = min(amostras_bloco, amostras - bloco * amostras_bloco)
+            yield inicio, fim, [filho[bloco] for filho in filhos], tamanho
+
+
+def _estatisticas(valores, nivel):
+    # valores (parâmetros, registros, amostras) -> campos de ESTATISTICAS_DTYPE
+    finitos = np.isfinite(valores)
+    valores = np.where(finitos, valores, np.nan)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # registros sem amostras finitas
+        inferior, superior = np.nanquantile(valores, [(1 - nivel) / 2, (1 + nivel) / 2], axis=-1)
+        return {'media': np.nanmean(valores, axis=-1), 'desvio': np.nanstd(valores, axis=-1, ddof=1),
+                'inferior': inferior, 'superior': superior, 'finitas': finitos.mean(axis=-1)}
+
+
+@instrumentar('incerteza.monte_carlo')
+def incerteza_parametros(ensaios, classes=None, amostras=100000, nivel=0.95, distribuicao='uniforme', semente=0,
+                         amostras_bloco=DEFAULT_AMOSTRAS_BLOCO, max_elementos=DEFAULT_MAX_ELEMENTOS, processes=None):
+    """
+    Incerteza dos parâmetros de cada registro de ensaios (caminho CSV ou
+    Parquet, ou objeto indexável pelos nomes de COLUNAS_ENSAIO, como em
+    calcular_parametros_lote) para instrumentos com as classes de exatidão
+    dadas (ver CLASSES_PADRAO), com amostras sorteios por registro.
+
+    Retorna um array estruturado (INCERTEZA_DTYPE), uma linha por registro:
+    para cada um de PARAMETROS_INCERTEZA o valor nominal, média, desvio e o
+    intervalo de confiança de nível dado, calculados sobre as amostras
+    finitas, e a fração das amostras com Xm infinita, Xm pelo caminho
+    alternativo, Xeq nula ou entrada inválida.
+    processes=None usa um processo por núcleo; processes=1 roda sem pool.
+    """
+    if distribuicao not in DISTRIBUICOES:
+        raise ValueError(f"distribuicao deve ser uma de {', '.join(DISTRIBUICOES)}: {distribuicao!r}")
+    if not 0 < nivel < 1:
+        raise ValueError("O nível de confiança deve estar entre 0 e 1.")
+    if amostras < 2 or amostras_bloco < 1:
+        raise ValueError("São necessárias ao menos 2 amostras por registro e blocos não vazios.")
+    if isinstance(ensaios, (str, os.PathLike)):
+        ensaios = ler_ensaios(ensaios)
+    leituras = np.stack(np.broadcast_arrays(*(np.atleast_1d(np.asarray(ensaios[coluna], dtype=float))
+                                              for coluna in COLUNAS_ENSAIO)))
+    limites = classes_leituras(classes)
+    registros = leituras.shape[1]
+
+    resultado = np.zeros(registros, dtype=INCERTEZA_DTYPE)
+    nominais = calcular_parametros_lote(dict(zip(COLUNAS_ENSAIO, leituras)))
+    for nome in PARAMETROS_INCERTEZA:
+        resultado[nome]['nominal'] = nominais[nome]
+    resultado['amostras'] = amostras
+    contagens = np.zeros((len(_FLAGS_CONTADAS), registros), dtype=np.int64)
+
+    # Amostras do grupo de registros em andamento, preenchidas bloco a bloco
+    grupo = {'inicio': None, 'valores': None, 'preenchidas': 0}
+
+    def juntar(tarefa, parcial):
+        inicio, fim, _, tamanho = tarefa
+        valores, contagem = parcial
+        if grupo['inicio'] != inicio:
+            grupo.update(inicio=inicio, preenchidas=0,
+                         valores=np.empty((len(PARAMETROS_INCERTEZA), fim - inicio, amostras)))
+        preenchidas = grupo['preenchidas']
+        grupo['valores'][..., preenchidas:preenchidas + tamanho] = valores
+        grupo['preenchidas'] += tamanho
+        contagens[:, inicio:fim] += contagem
+        if grupo['preenchidas'] == amostras:
+            for campo, valor in _estatisticas(grupo['valores'], nivel).items():
+                for indice, nome in enumerate(PARAMETROS_INCERTEZA):
+                    resultado[nome][campo][inicio:fim] = valor[indice]
+            grupo['valores'] = None
+
+    tarefas = _tarefas(registros, amostras, amostras_bloco, max_elementos, semente)
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if processes == 1:
+        for tarefa in tarefas:
+            juntar(tarefa, _tarefa(tarefa, leituras, limites, distribuicao))
+    else:
+        # No máximo dois blocos por processo em andamento: memória limitada
+        with ProcessPoolExecutor(max_workers=processes, initializer=_inicializar_processo,
+                                 initargs=(leituras, limites, distribuicao)) as executor:
+            pendentes = deque()
+            for tarefa in tarefas:
+                if len(pendentes) >= 2 * processes:
+                    anterior, futuro = pendentes.popleft()
+                    juntar(anterior, futuro.result())
+                pendentes.append((tarefa, executor.submit(_tarefa_no_processo, tarefa)))
+            while pendentes:
+                anterior, futuro = pendentes.popleft()
+                juntar(anterior, futuro.result())
+
+    for indice, campo in enumerate(('fracao_xm_infinita', 'fracao_xm_alternativo', 'fracao_xeq_nula',
+                                    'fracao_entrada_invalida')):
+        resultado[campo] = contagens[indice] / amostras
+    return resultado
@@ -0,0 +1,206 @@
+import atexit
+import functools
+import json
+import os
+import sys
+import threading
+import time
+
+# Instrumentação opcional das etapas de cálculo: chamadas, tempo de parede,
+# tempo de CPU e tempo próprio (sem as etapas internas) por etapa, e um
+# rastro no formato Chrome trace (chrome://tracing, Perfetto, speedscope).
+#
+# As etapas são marcadas no código com
+#     with etapa('mag_curve.planilha'): ...
+# ou com o decorador @instrumentar(). Desligada (padrão), etapa() devolve
+# sempre o mesmo contexto vazio e a função decorada só testa uma flag.
+#
+# Para ligar: ativar() no código, ou as variáveis de ambiente
+#     INSTRUMENTACAO=1                   tabela de resumo no stderr ao sair
+#     INSTRUMENTACAO_RASTRO=rastro.json  também grava o rastro ao sair
+#
+# Os contadores são por processo: em pools de processos cada trabalhador
+# acumula os seus.
+
+DEFAULT_MAX_EVENTOS = 1000000
+
+
+class _Estado:
+    ativo = False
+    rastro = False
+    max_eventos = DEFAULT_MAX_EVENTOS
+
+
+_estado = _Estado()
+_estatisticas = {}  # nome -> [chamadas, parede_ns, cpu_ns, proprio_ns]
+_eventos = []
+_trava = threading.Lock()  # _estatisticas e _eventos são compartilhados entre threads
+_pilhas = threading.local()
+_inicio_ns = time.perf_counter_ns()
+
+
+class _Nulo:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULO = _Nulo()
+
+
+class _Etapa:
+    __slots__ = ('nome', 'parede', 'cpu', 'internas')
+
+    def __init__(self, nome):
+        self.nome = nome
+
+    def __enter__(self):
+        pilha = getattr(_pilhas, 'pilha', None)
+        if pilha is None:
+            pilha = _pilhas.pilha = []
+        pilha.append(self)
+        self.internas = 0
+        self.cpu = time.thread_time_ns()
+        self.parede = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        fim = time.perf_counter_ns()
+        parede = fim - self.parede
+        cpu = time.thread_time_ns() - self.cpu
+        pilha = _pilhas.pilha
+        pilha.pop()
+        if pilha:
+            pilha[-1].internas += parede
+
+        with _trava:
+            estatistica = _estatisticas.get(self.nome)
+            if estatistica is None:
+                estatistica = _estatisticas[self.nome] = [0, 0, 0, 0]
+            estatistica[0] += 1
+            estatistica[1] += parede
+            estatistica[2] += cpu
+            estatistica[3] += parede - self.internas
+            if _estado.rastro and len(_eventos) < _estado.max_eventos:
+                _eventos.append((self.nome, self.parede, parede, cpu, threading.get_ident()))
+        return False
+
+
+def etapa(nome):
+    """
+    Contexto que mede o bloco como a etapa nome (quando a instrumentação
+    está ligada).
+    """
+    if _estado.ativo:
+        return _Etapa(nome)
+    return _NULO
+
+
+def instrumentar(nome=None):
+    """
+    Decorador: cada chamada da função é uma etapa (nome padrão:
+    módulo.função).
+    """
+    def decorar(funcao):
+        rotulo = nome or f'{funcao.__module__}.{funcao.__qualname__}'
+
+        @functools.wraps(funcao)
+        def instrumentada(*args, **kwargs):
+            if not _estado.ativo:
+                return funcao(*args, **kwargs)
+            with _Etapa(rotulo):
+                return funcao(*args, **kwargs)
+
+        return instrumentada
+    return decorar
+
+
+def ativar(rastro=False, max_eventos=DEFAULT_MAX_EVENTOS):
+    """
+    Liga a contagem; com rastro=True guarda também cada chamada (até
+    max_eventos) para salvar_rastro.
+    """
+    _estado.ativo = True
+    _estado.rastro = rastro
+    _estado.max_eventos = max_eventos
+
+
+def desativar():
+    _estado.ativo = False
+    _estado.rastro = False
+
+
+def ativo():
+    return _estado.ativo
+
+
+def limpar():
+    with _trava:
+        _estatisticas.clear()
+        _eventos.clear()
+
+
+def estatisticas():
+    """
+    Dicionário nome -> {'chamadas', 'parede_s', 'cpu_s', 'proprio_s'} com
+    os totais acumulados desde o último limpar().
+    """
+    with _trava:
+        totais = [(nome, tuple(valores)) for nome, valores in _estatisticas.items()]
+    return {nome: {'chamadas': chamadas, 'parede_s': parede / 1e9, 'cpu_s': cpu / 1e9, 'proprio_s': proprio / 1e9}
+            for nome, (chamadas, parede, cpu, proprio) in totais}
+
+
+def tabela(ordenar='parede_s'):
+    """
+    Resumo em texto, uma linha por etapa, ordenado pela coluna ordenar
+    (decrescente).
+    """
+    dados = sorted(estatisticas().items(), key=lambda item: item[1][ordenar], reverse=True)
+    linhas = [f"{'etapa':<48}{'chamadas':>10}{'parede (ms)':>13}{'CPU (ms)':>11}{'próprio (ms)':>14}{'µs/chamada':>12}"]
+    for nome, valores in dados:
+        linhas.append(f"{nome:<48}{valores['chamadas']:>10}{valores['parede_s'] * 1e3:>13.3f}"
+                      f"{valores['cpu_s'] * 1e3:>11.3f}{valores['proprio_s'] * 1e3:>14.3f}"
+                      f"{valores['parede_s'] / valores['chamadas'] * 1e6:>12.2f}")
+    return '\n'.join(linhas)
+
+
+def rastro_chrome():
+    # Eventos completos ("ph": "X") em microssegundos desde a importação do módulo
+    pid = os.getpid()
+    with _trava:
+        eventos = list(_eventos)
+    return {
+        'traceEvents': [{'name': nome, 'ph': 'X', 'ts': (inicio - _inicio_ns) / 1e3, 'dur': parede / 1e3,
+                         'pid': pid, 'tid': tid, 'args': {'cpu_us': cpu / 1e3}}
+                        for nome, inicio, parede, cpu, tid in eventos],
+        'displayTimeUnit': 'ms',
+    }
+
+
+def salvar_rastro(destino):
+    """
+    Grava o rastro (ativar(rastro=True)) em JSON no formato Chrome trace;
+    destino é um caminho ou arquivo texto aberto.
+    """
+    if hasattr(destino, 'write'):
+        json.dump(rastro_chrome(), destino)
+        return
+    with open(destino, 'w', encoding='utf-8') as arquivo:
+        json.dump(rastro_chrome(), arquivo)
+
+
+def _relatorio_saida(caminho_rastro):
+    if _estatisticas:
+        print(tabela(), file=sys.stderr)
+    if caminho_rastro:
+        salvar_rastro(caminho_rastro)
+
+
+if os.environ.get('INSTRUMENTACAO') or os.environ.get('INSTRUMENTACAO_RASTRO'):
+    ativar(rastro=bool(os.environ.get('INSTRUMENTACAO_RASTRO')))
+    atexit.register(_relatorio_saida, os.environ.get('INSTRUMENTACAO_RASTRO'))
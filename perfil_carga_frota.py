@@ -0,0 +1,192 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from desafio_3_e_desafio_4FINAL import calcular_perdas
+from instrumentacao import instrumentar
+
+# Perdas anuais de uma frota de transformadores a partir de perfis de carga.
+#
+# O perfil é uma tabela "larga": uma linha por instante (8760 horas, ou
+# 35040 quartos de hora) e uma coluna por unidade, com a carga em kVA, em um
+# .npy (lido por memmap) ou em um CSV (lido em blocos com pandas). Cada bloco
+# tem no máximo max_elementos valores; os blocos são processados em paralelo
+# e cada um devolve apenas somas e máximos por unidade, então a memória não
+# depende do tamanho da frota nem da duração do perfil.
+#
+# As perdas usam o mesmo modelo de AnaliseCarregamentoTransformador
+# (calcular_perdas): cobre Req/a² * (S/V2)² e núcleo V2²/Rc. Amostras
+# ausentes (NaN no CSV) não contam energia nem perdas.
+
+DEFAULT_MAX_ELEMENTOS = 1 << 22
+
+RESULTADO_DTYPE = np.dtype([
+    ('perdas_cobre_kWh', 'f8'),
+    ('perdas_nucleo_kWh', 'f8'),
+    ('perdas_kWh', 'f8'),
+    ('perda_pico_W', 'f8'),
+    ('horas_acima_nominal', 'f8'),
+    ('energia_saida_kWh', 'f8'),
+    ('eficiencia', 'f8'),        # % ponderada pela energia
+])
+
+_CHAVES_FROTA = ('resistencia_equivalente_alta', 'relacao_transformacao', 'tensao_baixa',
+                 'resistencia_nucleo_baixa', 'potencia_nominal', 'fator_potencia')
+
+
+def parametros_frota(lista_parametros, fator_potencia=0.92, potencia_nominal_kVA=None):
+    """
+    Junta os dicionários de AnaliseTransformadorMonofasico.obter_parametros()
+    de cada unidade em um dicionário de arrays (uma posição por unidade),
+    aceito por calcular_perdas. fator_potencia (com sinal, positivo para
+    carga atrasada) e potencia_nominal_kVA podem ser escalares ou arrays;
+    sem potencia_nominal_kVA vale a 'potencia_nominal' de cada unidade.
+    """
+    frota = {chave: np.array([parametros[chave] for parametros in lista_parametros], dtype=float)
+             for chave in _CHAVES_FROTA[:5]}
+    unidades = len(lista_parametros)
+    if potencia_nominal_kVA is not None:
+        frota['potencia_nominal'] = np.broadcast_to(np.asarray(potencia_nominal_kVA, dtype=float) * 1e3,
+                                                    (unidades,)).copy()
+    frota['fator_potencia'] = np.broadcast_to(np.asarray(fator_potencia, dtype=float), (unidades,)).copy()
+    return frota
+
+
+def _fatiar_frota(frota, colunas):
+    return {chave: frota[chave][colunas] for chave in _CHAVES_FROTA}
+
+
+@instrumentar('frota.bloco')
+def _acumular(carga_kVA, frota, intervalo_horas):
+    # Somas parciais (Wh) e máximos por unidade de um bloco (instantes x unidades):
+    # linhas cobre, núcleo, pico, horas acima da nominal, energia de saída
+    potencia = np.asarray(carga_kVA, dtype=float) * 1e3
+    valido = np.isfinite(potencia)
+    potencia = np.where(valido, potencia, 0.0)
+    perdas_cobre, perdas_nucleo = calcular_perdas(frota, potencia)
+    perdas_nucleo = np.where(valido, perdas_nucleo, 0.0)
+
+    parcial = np.empty((5, potencia.shape[1]))
+    parcial[0] = perdas_cobre.sum(axis=0) * intervalo_horas
+    parcial[1] = perdas_nucleo.sum(axis=0) * intervalo_horas
+    parcial[2] = (perdas_cobre + perdas_nucleo).max(axis=0, initial=0.0)
+    parcial[3] = np.count_nonzero(potencia > frota['potencia_nominal'], axis=0) * intervalo_horas
+    parcial[4] = potencia.sum(axis=0) * np.abs(frota['fator_potencia']) * intervalo_horas
+    return parcial
+
+
+def _tarefa(tarefa, frota, intervalo_horas):
+    colunas, origem = tarefa[0], tarefa[1]
+    if isinstance(origem, str):
+        inicio, fim = tarefa[2]
+        carga = np.load(origem, mmap_mode='r')[inicio:fim, colunas]
+    else:
+        carga = origem
+    return colunas, _acumular(carga, _fatiar_frota(frota, colunas), intervalo_horas)
+
+
+_frota_processo = None
+
+
+def _inicializar_processo(frota, intervalo_horas):
+    global _frota_processo
+    _frota_processo = (frota, intervalo_horas)
+
+
+def _tarefa_no_processo(tarefa):
+    return _tarefa(tarefa, *_frota_processo)
+
+
+def _tarefas_npy(caminho, unidades, max_elementos):
+    # Blocos (linhas, colunas) do .npy; os processos abrem o memmap e leem só o bloco
+    instantes, colunas_arquivo = np.load(caminho, mmap_mode='r').shape
+    if colunas_arquivo != unidades:
+        raise ValueError(f"O perfil tem {colunas_arquivo} unidades e a frota {unidades}")
+    largura = min(unidades, max_elementos)
+    altura = max(1, max_elementos // largura)
+    for coluna in range(0, unidades, largura):
+        colunas = slice(coluna, min(coluna + largura, unidades))
+        for linha in range(0, instantes, altura):
+            yield colunas, caminho, (linha, min(linha + altura, instantes))
+
+
+def _tarefas_csv(caminho, unidades, max_elementos, coluna_indice):
+    import pandas as pd
+
+    altura = max(1, max_elementos // unidades)
+    with pd.read_csv(caminho, index_col=coluna_indice, chunksize=altura) as leitor:
+        for bloco in leitor:
+            if bloco.shape[1] != unidades:
+                raise ValueError(f"O perfil tem {bloco.shape[1]} unidades e a frota {unidades}")
+            yield slice(0, unidades), bloco.to_numpy(dtype=float)
+
+
+def _tarefas_array(carga_kVA, unidades, max_elementos):
+    if carga_kVA.shape[1] != unidades:
+        raise ValueError(f"O perfil tem {carga_kVA.shape[1]} unidades e a frota {unidades}")
+    altura = max(1, max_elementos // unidades)
+    for linha in range(0, carga_kVA.shape[0], altura):
+        yield slice(0, unidades), carga_kVA[linha:linha + altura]
+
+
+@instrumentar('frota.processar_perfis')
+def processar_perfis(perfil, frota, intervalo_horas=1.0, max_elementos=DEFAULT_MAX_ELEMENTOS,
+                     processes=None, coluna_indice=0):
+    """
+    Perdas e eficiência de cada unidade da frota (parametros_frota) ao longo
+    do perfil de carga em kVA: caminho de um .npy ou CSV (instantes x
+    unidades, colunas na ordem da frota) ou um array já em memória.
+    intervalo_horas é a duração de cada instante (1 para perfis horários,
+    0.25 para 15 min). No CSV, coluna_indice é a coluna de data/hora (None se
+    não houver).
+
+    Retorna um array estruturado (RESULTADO_DTYPE) com uma linha por unidade.
+    processes=None usa um processo por núcleo; processes=1 roda sem pool.
+    """
+    unidades = frota['potencia_nominal'].size
+    if isinstance(perfil, (str, os.PathLike)):
+        caminho = os.fspath(perfil)
+        if caminho.endswith('.npy'):
+            tarefas = _tarefas_npy(caminho, unidades, max_elementos)
+        else:
+            tarefas = _tarefas_csv(caminho, unidades, max_elementos, coluna_indice)
+    else:
+        tarefas = _tarefas_array(np.asarray(perfil), unidades, max_elementos)
+
+    totais = np.zeros((5, unidades))
+
+    def somar(resultado):
+        colunas, parcial = resultado
+        totais[[0, 1, 3, 4], colunas] += parcial[[0, 1, 3, 4]]
+        np.maximum(totais[2, colunas], parcial[2], out=totais[2, colunas])
+
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if processes == 1:
+        for tarefa in tarefas:
+            somar(_tarefa(tarefa, frota, intervalo_horas))
+    else:
+        # No máximo dois blocos por processo em andamento: memória limitada
+        with ProcessPoolExecutor(max_workers=processes, initializer=_inicializar_processo,
+                                 initargs=(frota, intervalo_horas)) as executor:
+            pendentes = deque()
+            for tarefa in tarefas:
+                if len(pendentes) >= 2 * processes:
+                    somar(pendentes.popleft().result())
+                pendentes.append(executor.submit(_tarefa_no_processo, tarefa))
+            while pendentes:
+                somar(pendentes.popleft().result())
+
+    resultado = np.empty(unidades, dtype=RESULTADO_DTYPE)
+    resultado['perdas_cobre_kWh'] = totais[0] / 1e3
+    resultado['perdas_nucleo_kWh'] = totais[1] / 1e3
+    resultado['perdas_kWh'] = (totais[0] + totais[1]) / 1e3
+    resultado['perda_pico_W'] = totais[2]
+    resultado['horas_acima_nominal'] = totais[3]
+    resultado['energia_saida_kWh'] = totais[4] / 1e3
+    entrada = totais[4] + totais[0] + totais[1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        resultado['eficiencia'] = np.where(entrada > 0, totais[4] / entrada * 100, 0.0)
+    return resultado
@@ -0,0 +1,389 @@
+import argparse
+import asyncio
+import json
+import math
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlsplit
+
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+if os.path.join(RAIZ, 'Desafio_1_e_2') not in sys.path:
+    sys.path.append(os.path.join(RAIZ, 'Desafio_1_e_2'))
+
+from desafio_1 import blade_type
+from desafio_1_batch import size_transformers
+from desafio_1_stream import SpecError, validate_spec
+from desafio_3_e_desafio_4FINAL import AnaliseCarregamentoTransformadorVetorizada, calcular_perdas
+from desafio_3_e_desafio_4_batch import COLUNAS_ENSAIO, PARAMETROS_DTYPE, calcular_parametros_lote
+
+# Serviço HTTP local (asyncio, só biblioteca padrão) para dimensionamento
+# (Desafio 1), parâmetros de ensaio (Desafio 3) e análise de carregamento
+# (Desafio 4):
+#
+#   POST /dimensionamento   {"W2", "V2", "V1", "frequency", flags opcionais}
+#   POST /parametros        {"tensao_ca", ..., "tensao_alta"} (COLUNAS_ENSAIO)
+#   POST /carregamento      {"parametros": {...} ou os campos de ensaio,
+#                            "fator_potencia" (com sinal, + atrasado),
+#                            "potencia_carga_kVA" (opcional: nominal)}
+#   GET  /estatisticas, GET /saude
+#
+# O corpo pode ser um objeto ou uma lista de objetos (resposta na mesma
+# forma; um registro inválido rejeita a requisição inteira com 400). As
+# requisições que chegam dentro de --janela-ms são agrupadas em uma única
+# chamada vetorizada (no máximo --max-lote itens), executada em um pool de
+# processos; o laço de eventos só faz E/S e validação. No máximo duas
+# chamadas por processo ficam em andamento.
+#
+#   python servico.py --porta 8080                 # ou --unix /tmp/trafo.sock
+#   python carga_servico.py --iniciar              # teste de carga
+
+DEFAULT_PORTA = 8080
+DEFAULT_MAX_LOTE = 256
+DEFAULT_JANELA_MS = 2.0
+MAX_CORPO = 1 << 24
+
+# Parâmetros usados pela análise de carregamento (os demais de /parametros são opcionais)
+CAMPOS_CARREGAMENTO = ('resistencia_equivalente_alta', 'reatancia_equivalente_alta', 'relacao_transformacao',
+                       'tensao_baixa', 'tensao_alta', 'resistencia_nucleo_baixa', 'potencia_nominal')
+
+
+class ErroRequisicao(ValueError):
+    pass
+
+
+def _numero(registro, campo, obrigatorio=True, zero=False):
+    valor = registro.get(campo)
+    if valor is None and not obrigatorio:
+        return math.nan
+    if isinstance(valor, bool) or not isinstance(valor, (int, float)):
+        raise ErroRequisicao(f"{campo} deve ser numérico: {valor!r}")
+    if not math.isfinite(valor) or valor < 0 or (valor == 0 and not zero):
+        raise ErroRequisicao(f"{campo} deve ser um número {'não negativo' if zero else 'positivo'}: {valor!r}")
+    return float(valor)
+
+
+# Validação (no laço de eventos): cada função devolve o item já pronto para o lote
+
+def validar_dimensionamento(registro):
+    try:
+        return validate_spec(registro)
+    except SpecError as erro:
+        raise ErroRequisicao(str(erro)) from None
+
+
+def validar_parametros(registro):
+    if not isinstance(registro, dict):
+        raise ErroRequisicao("registro deve ser um objeto JSON")
+    return tuple(_numero(registro, campo) for campo in COLUNAS_ENSAIO)
+
+
+def validar_carregamento(registro):
+    if not isinstance(registro, dict):
+        raise ErroRequisicao("registro deve ser um objeto JSON")
+    fator_potencia = registro.get('fator_potencia', 0.92)
+    if isinstance(fator_potencia, bool) or not isinstance(fator_potencia, (int, float)) \
+            or not -1.0 <= fator_potencia <= 1.0:
+        raise ErroRequisicao(f"fator_potencia deve estar entre -1.0 e 1.0: {fator_potencia!r}")
+    potencia_carga = _numero(registro, 'potencia_carga_kVA', obrigatorio=False, zero=True)
+    parametros = registro.get('parametros')
+    if parametros is None:
+        return 'ensaio', validar_parametros(registro), float(fator_potencia), potencia_carga
+    if not isinstance(parametros, dict):
+        raise ErroRequisicao("parametros deve ser um objeto JSON")
+    faltando = [campo for campo in CAMPOS_CARREGAMENTO if campo not in parametros]
+    if faltando:
+        raise ErroRequisicao(f"parametros sem os campos {', '.join(faltando)}")
+    try:
+        # null (valor não finito na saída de /parametros) vira NaN
+        valores = tuple(math.nan if parametros[campo] is None else float(parametros[campo])
+                        for campo in CAMPOS_CARREGAMENTO)
+    except (TypeError, ValueError):
+        raise ErroRequisicao("parametros deve ter valores numéricos") from None
+    return 'parametros', valores, float(fator_potencia), potencia_carga
+
+
+# Lotes (nos processos do pool): uma lista de itens validados -> uma lista de textos JSON
+
+def _texto(registro):
+    # JSON padrão: valores não finitos viram null
+    return json.dumps({nome: valor if not isinstance(valor, float) or math.isfinite(valor) else None
+                       for nome, valor in registro.items()}, ensure_ascii=False)
+
+
+def lote_dimensionamento(itens, padrao_fio="fio"):
+    colunas = np.array(itens, dtype=float).T
+    resultado = size_transformers(*colunas[:4], is_long_cable=colunas[4].astype(bool),
+                                  is_two_primary_circuits=colunas[5].astype(bool),
+                                  is_two_secondary_circuits=colunas[6].astype(bool),
+                                  wire_standard=padrao_fio)
+    nomes = list(resultado)
+    linhas = zip(*(valores.tolist() for valores in resultado.values()))
+    return [_texto({**dict(zip(nomes, linha)), 'blade_type': blade_type(linha[nomes.index('a')])})
+            for linha in linhas]
+
+
+def _tabela_parametros(linhas):
+    return calcular_parametros_lote(dict(zip(COLUNAS_ENSAIO, np.array(linhas, dtype=float).T)))
+
+
+def lote_parametros(itens):
+    parametros = _tabela_parametros(itens)
+    nomes = parametros.dtype.names
+    return [_texto(dict(zip(nomes, linha))) for linha in parametros.tolist()]
+
+
+def lote_carregamento(itens):
+    parametros = np.zeros(len(itens), dtype=PARAMETROS_DTYPE)
+    de_ensaio = [posicao for posicao, item in enumerate(itens) if item[0] == 'ensaio']
+    if de_ensaio:
+        parametros[de_ensaio] = _tabela_parametros([itens[posicao][1] for posicao in de_ensaio])
+    diretos = [posicao for posicao, item in enumerate(itens) if item[0] == 'parametros']
+    if diretos:
+        valores = np.array([itens[posicao][1] for posicao in diretos], dtype=float)
+        for indice, campo in enumerate(CAMPOS_CARREGAMENTO):
+            parametros[campo][diretos] = valores[:, indice]
+
+    fator_potencia = np.array([item[2] for item in itens])
+    potencia_carga = np.array([item[3] for item in itens])
+    potencia_carga_kVA = np.where(np.isnan(potencia_carga), parametros['potencia_nominal'] / 1e3, potencia_carga)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        analise = AnaliseCarregamentoTransformadorVetorizada(parametros, fator_potencia, potencia_carga_kVA)
+        regulacao = analise.calcular_regulacao_tensao()
+        eficiencia = analise.calcular_eficiencia()
+        perdas_cobre, perdas_nucleo = calcular_perdas(parametros, analise.potencia_carga)
+    colunas = {'regulacao_percentual': regulacao, 'eficiencia_percentual': eficiencia,
+               'perdas_cobre_W': perdas_cobre, 'perdas_nucleo_W': perdas_nucleo,
+               'potencia_carga_kVA': potencia_carga_kVA, 'flags': parametros['flags']}
+    nomes = list(colunas)
+    return [_texto(dict(zip(nomes, linha))) for linha in zip(*(valores.tolist() for valores in colunas.values()))]
+
+
+class AgrupadorLotes:
+    """
+    Junta os itens submetidos dentro de janela_s (ou até max_lote itens) em
+    uma chamada funcao(itens, *argumentos) no executor, que devolve um
+    resultado por item. em_andamento limita as chamadas simultâneas.
+    """
+
+    def __init__(self, funcao, executor, max_lote=DEFAULT_MAX_LOTE, janela_s=DEFAULT_JANELA_MS / 1e3,
+                 em_andamento=2, argumentos=()):
+        self.funcao = funcao
+        self.executor = executor
+        self.max_lote = max_lote
+        self.janela_s = janela_s
+        self.argumentos = argumentos
+        self._semaforo = asyncio.Semaphore(em_andamento)
+        self._pendentes = []  # (item, future)
+        self._temporizador = None
+        self._tarefas = set()
+        self.estatisticas = {'itens': 0, 'lotes': 0, 'maior_lote': 0, 'tempo_lotes_s': 0.0, 'falhas': 0}
+
+    def submeter(self, item):
+        futuro = asyncio.get_running_loop().create_future()
+        self._pendentes.append((item, futuro))
+        if len(self._pendentes) >= self.max_lote:
+            self._despachar()
+        elif self._temporizador is None:
+            self._temporizador = asyncio.get_running_loop().call_later(self.janela_s, self._despachar)
+        return futuro
+
+    def _despachar(self):
+        if self._temporizador is not None:
+            self._temporizador.cancel()
+            self._temporizador = None
+        while self._pendentes:
+            lote, self._pendentes = self._pendentes[:self.max_lote], self._pendentes[self.max_lote:]
+            tarefa = asyncio.ensure_future(self._executar(lote))
+            self._tarefas.add(tarefa)
+            tarefa.add_done_callback(self._tarefas.discard)
+
+    async def _executar(self, lote):
+        async with self._semaforo:
+            inicio = time.perf_counter()
+            try:
+                resultados = await asyncio.get_running_loop().run_in_executor(
+                    self.executor, self.funcao, [item for item, _ in lote], *self.argumentos)
+            except Exception as erro:
+                self.estatisticas['falhas'] += 1
+                for _, futuro in lote:
+                    if not futuro.done():
+                        futuro.set_exception(erro)
+                return
+            finally:
+                self.estatisticas['tempo_lotes_s'] += time.perf_counter() - inicio
+        self.estatisticas['itens'] += len(lote)
+        self.estatisticas['lotes'] += 1
+        self.estatisticas['maior_lote'] = max(self.estatisticas['maior_lote'], len(lote))
+        for (_, futuro), resultado in zip(lote, resultados):
+            if not futuro.done():
+                futuro.set_result(resultado)
+
+
+_MOTIVOS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+            413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+class Servico:
+    """
+    Rotas, agrupadores e pool de processos do serviço. processes=0 executa
+    os lotes em uma thread do próprio processo (para depuração).
+    """
+
+    def __init__(self, max_lote=DEFAULT_MAX_LOTE, janela_ms=DEFAULT_JANELA_MS, processes=None,
+                 padrao_fio="fio"):
+        if processes is None:
+            processes = os.cpu_count() or 1
+        self.executor = None
+        if processes > 0:
+            # Os processos são criados sob demanda, depois do socket aberto: com fork
+            # herdariam o socket e o manteriam ocupado se o serviço morresse
+            metodos = multiprocessing.get_all_start_methods()
+            contexto = multiprocessing.get_context('forkserver' if 'forkserver' in metodos else 'spawn')
+            self.executor = ProcessPoolExecutor(max_workers=processes, mp_context=contexto)
+        em_andamento = 2 * max(processes, 1)
+        opcoes = dict(max_lote=max_lote, janela_s=janela_ms / 1e3, em_andamento=em_andamento)
+        self.rotas = {
+            '/dimensionamento': (validar_dimensionamento,
+                                 AgrupadorLotes(lote_dimensionamento, self.executor, argumentos=(padrao_fio,),
+                                                **opcoes)),
+            '/parametros': (validar_parametros, AgrupadorLotes(lote_parametros, self.executor, **opcoes)),
+            '/carregamento': (validar_carregamento, AgrupadorLotes(lote_carregamento, self.executor, **opcoes)),
+        }
+        self.requisicoes = 0
+        self.inicio = time.monotonic()
+
+    def estatisticas(self):
+        rotas = {}
+        for rota, (_, agrupador) in self.rotas.items():
+            dados = dict(agrupador.estatisticas)
+            dados['media_lote'] = dados['itens'] / dados['lotes'] if dados['lotes'] else 0.0
+            rotas[rota] = dados
+        return {'requisicoes': self.requisicoes, 'ativo_s': time.monotonic() - self.inicio, 'rotas': rotas}
+
+    async def responder(self, metodo, caminho, corpo):
+        # (status, texto JSON)
+        self.requisicoes += 1
+        if caminho == '/saude':
+            return 200, '{"ok": true}'
+        if caminho == '/estatisticas':
+            return 200, json.dumps(self.estatisticas())
+        if caminho not in self.rotas:
+            return 404, json.dumps({'erro': f'rota desconhecida: {caminho}'})
+        if metodo != 'POST':
+            return 405, json.dumps({'erro': 'use POST'})
+
+        validar, agrupador = self.rotas[caminho]
+        try:
+            registros = json.loads(corpo)
+            lista = isinstance(registros, list)
+            itens = [validar(registro) for registro in (registros if lista else [registros])]
+        except json.JSONDecodeError as erro:
+            return 400, json.dumps({'erro': f'JSON inválido: {erro.msg}'})
+        except ErroRequisicao as erro:
+            return 400, json.dumps({'erro': str(erro)}, ensure_ascii=False)
+        if not itens:
+            return 200, '[]'
+        try:
+            resultados = await asyncio.gather(*(agrupador.submeter(item) for item in itens))
+        except Exception as erro:
+            return 500, json.dumps({'erro': f'{type(erro).__name__}: {erro}'}, ensure_ascii=False)
+        return 200, '[' + ', '.join(resultados) + ']' if lista else resultados[0]
+
+    async def atender(self, leitor, escritor):
+        # HTTP/1.1 mínimo com conexões persistentes e Content-Length
+        try:
+            while True:
+                linha = await leitor.readline()
+                if not linha:
+                    break
+                metodo, alvo, versao = linha.decode('latin-1').split()
+                cabecalhos = {}
+                while True:
+                    linha = await leitor.readline()
+                    if linha in (b'\r\n', b'\n', b''):
+                        break
+                    nome, _, valor = linha.decode('latin-1').partition(':')
+                    cabecalhos[nome.strip().lower()] = valor.strip()
+                tamanho = int(cabecalhos.get('content-length', 0))
+                if tamanho > MAX_CORPO:
+                    status, resposta = 413, '{"erro": "corpo grande demais"}'
+                    cabecalhos['connection'] = 'close'
+                else:
+                    corpo = await leitor.readexactly(tamanho)
+                    status, resposta = await self.responder(metodo, urlsplit(alvo).path, corpo)
+
+                manter = versao == 'HTTP/1.1' and cabecalhos.get('connection', '').lower() != 'close'
+                dados = resposta.encode('utf-8')
+                escritor.write(f'HTTP/1.1 {status} {_MOTIVOS[status]}\r\n'
+                               f'Content-Type: application/json; charset=utf-8\r\n'
+                               f'Content-Length: {len(dados)}\r\n'
+                               f'Connection: {"keep-alive" if manter else "close"}\r\n\r\n'.encode('latin-1') + dados)
+                await escritor.drain()
+                if not manter:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            escritor.close()
+
+    def fechar(self):
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+
+
+async def servir(host='127.0.0.1', porta=DEFAULT_PORTA, unix=None, pronto=None, **opcoes):
+    """
+    Executa o serviço até ser cancelado. pronto(servidor), se dado, é
+    chamado quando o socket já está aceitando conexões.
+    """
+    servico = Servico(**opcoes)
+    try:
+        # SIGTERM encerra como Ctrl-C, fechando o pool
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    except (NotImplementedError, RuntimeError):
+        pass
+    try:
+        if unix:
+            servidor = await asyncio.start_unix_server(servico.atender, path=unix)
+        else:
+            servidor = await asyncio.start_server(servico.atender, host, porta)
+        if pronto is not None:
+            pronto(servidor)
+        async with servidor:
+            await servidor.serve_forever()
+    finally:
+        servico.fechar()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serviço HTTP de dimensionamento e análise de transformadores")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--porta', type=int, default=DEFAULT_PORTA)
+    parser.add_argument('--unix', help="caminho de um socket Unix (no lugar de host/porta)")
+    parser.add_argument('--max-lote', type=int, default=DEFAULT_MAX_LOTE, help="itens por chamada vetorizada")
+    parser.add_argument('--janela-ms', type=float, default=DEFAULT_JANELA_MS,
+                        help="espera máxima para completar um lote (ms)")
+    parser.add_argument('--processos', type=int, help="processos do pool (padrão: um por núcleo; 0: sem pool)")
+    parser.add_argument('--padrao-fio', default="fio", help="tabela de bitolas (ver WIRE_GAUGE_TABLES)")
+    args = parser.parse_args(argv)
+
+    def pronto(servidor):
+        enderecos = args.unix or ', '.join(f'{s.getsockname()[0]}:{s.getsockname()[1]}' for s in servidor.sockets)
+        print(f"servindo em {enderecos}", file=sys.stderr, flush=True)
+
+    try:
+        asyncio.run(servir(args.host, args.porta, args.unix, pronto, max_lote=args.max_lote,
+                           janela_ms=args.janela_ms, processes=args.processos, padrao_fio=args.padrao_fio))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
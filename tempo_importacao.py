@@ -0,0 +1,83 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Tempo de importação a frio dos módulos de cálculo, cada medida em um
+# interpretador novo (sem cache de módulos), e quais dependências pesadas
+# cada importação carrega. Uso:
+#
+#   python tempo_importacao.py [módulos ...] [--repeticoes N] [--json] [--verificar]
+#
+# --verificar termina com código 1 se algum módulo de cálculo carregar
+# matplotlib ou pandas; esses só devem ser importados ao desenhar ou ler
+# planilhas/CSV.
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+CAMINHOS = (RAIZ, os.path.join(RAIZ, 'Desafio_1_e_2'))
+
+MODULOS_CALCULO = (
+    'desafio_1', 'desafio_1_batch', 'core_optimizer', 'core_mesh', 'desafio_2', 'mag_curve', 'flux_interpolator',
+    'magnetizing_current', 'harmonics', 'hysteresis', 'inrush',
+    'desafio_3_e_desafio_4FINAL', 'desafio_3_e_desafio_4_batch', 'perfil_carga_frota', 'diagramas_fasoriais', 'instrumentacao',
+    'cache_resultados', 'analise_trifasica', 'incerteza_ensaios',
+)
+DEPENDENCIAS_PESADAS = ('matplotlib', 'mpl_toolkits', 'pandas', 'scipy')
+
+_MEDICAO = """
+import sys, time
+inicio = time.perf_counter()
+import {modulo}
+duracao = time.perf_counter() - inicio
+print(duracao, *[nome for nome in {pesadas!r} if nome in sys.modules])
+"""
+
+
+def medir(modulo, repeticoes=5):
+    """
+    Importa modulo em repeticoes interpretadores novos. Retorna um dicionário
+    com a mediana e o mínimo do tempo de importação (s) e as dependências
+    pesadas carregadas.
+    """
+    ambiente = dict(os.environ)
+    ambiente['PYTHONPATH'] = os.pathsep.join(CAMINHOS + tuple(filter(None, [ambiente.get('PYTHONPATH')])))
+    ambiente.setdefault('MPLBACKEND', 'Agg')
+    codigo = _MEDICAO.format(modulo=modulo, pesadas=DEPENDENCIAS_PESADAS)
+    tempos = []
+    for _ in range(repeticoes):
+        saida = subprocess.run([sys.executable, '-c', codigo], env=ambiente, cwd=RAIZ,
+                               capture_output=True, text=True, check=True).stdout.split()
+        tempos.append(float(saida[0]))
+        pesadas = saida[1:]
+    return {'modulo': modulo, 'mediana_s': statistics.median(tempos), 'minimo_s': min(tempos),
+            'dependencias_pesadas': pesadas}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tempo de importação a frio dos módulos de cálculo")
+    parser.add_argument('modulos', nargs='*', default=list(MODULOS_CALCULO))
+    parser.add_argument('--repeticoes', type=int, default=5)
+    parser.add_argument('--json', action='store_true', help="resultado em JSON")
+    parser.add_argument('--verificar', action='store_true',
+                        help="falha se algum módulo carregar matplotlib, pandas ou scipy")
+    args = parser.parse_args(argv)
+
+    referencia = medir('numpy', args.repeticoes)
+    resultados = [medir(modulo, args.repeticoes) for modulo in args.modulos]
+    if args.json:
+        print(json.dumps({'referencia': referencia, 'modulos': resultados}, indent=2))
+    else:
+        print(f"{'módulo':<30}{'mediana (ms)':>14}{'mínimo (ms)':>14}  dependências pesadas")
+        for resultado in [referencia] + resultados:
+            print(f"{resultado['modulo']:<30}{resultado['mediana_s'] * 1e3:>14.1f}"
+                  f"{resultado['minimo_s'] * 1e3:>14.1f}  {', '.join(resultado['dependencias_pesadas']) or '-'}")
+
+    if args.verificar and any(resultado['dependencias_pesadas'] for resultado in resultados):
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())